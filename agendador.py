@@ -0,0 +1,168 @@
+# agendador.py - Intervalo adaptativo entre varreduras de processos
+
+# Cada monitor pode definir "latencia" (segundos): o atraso máximo desejado
+# para detectar o início/fim do processo. Como uma varredura (cache
+# incremental) atende todos os monitores de uma vez, prazos próximos são
+# naturalmente agrupados: o próximo ciclo acontece no menor prazo efetivo.
+#
+# O prazo efetivo de cada monitor se adapta:
+#   - logo após um início/fim do próprio monitor: aperta (FATOR_APERTO)
+#   - sistema ocioso (CPU baixa) por ciclos seguidos: recua exponencialmente
+#   - na bateria: multiplica por FATOR_BATERIA
+# sempre limitado a [INTERVALO_MINIMO, INTERVALO_MAXIMO].
+
+import time
+
+import psutil
+
+# Latência padrão de detecção quando o monitor não define "latencia"
+LATENCIA_PADRAO = 2.0
+
+# Limites do intervalo entre varreduras (segundos)
+INTERVALO_MINIMO = 0.25
+INTERVALO_MAXIMO = 30.0
+
+# Após um início/fim, o monitor fica mais atento por este tempo (segundos)
+JANELA_ATIVIDADE_RECENTE = 60.0
+FATOR_APERTO = 0.5
+
+# Recuo em sistema ocioso: dobra a cada ciclo ocioso até FATOR_OCIOSO_MAXIMO
+LIMITE_CPU_OCIOSA = 10.0
+FATOR_OCIOSO_MAXIMO = 8.0
+
+# Na bateria as varreduras ficam mais espaçadas
+FATOR_BATERIA = 3.0
+
+# Intervalo entre consultas ao estado da bateria (segundos)
+INTERVALO_CONSULTA_BATERIA = 60.0
+
+
+def latencia_do_monitor(config_processo):
+    """
+    Lê a latência desejada de um monitor (campo opcional "latencia").
+
+    Args:
+        config_processo (dict): Monitor do config.json
+
+    Returns:
+        float: Latência em segundos (LATENCIA_PADRAO se ausente ou inválida)
+    """
+    latencia = config_processo.get('latencia', LATENCIA_PADRAO)
+    if isinstance(latencia, bool) or not isinstance(latencia, (int, float)) or latencia <= 0:
+        return LATENCIA_PADRAO
+    return float(latencia)
+
+
+def _na_bateria():
+    try:
+        bateria = psutil.sensors_battery()
+    except (AttributeError, NotImplementedError, OSError):
+        return False
+    return bateria is not None and bateria.power_plugged is False
+
+
+class AgendadorVarredura:
+    """
+    Calcula o intervalo até a próxima varredura a partir das latências
+    desejadas por monitor, da atividade recente, da ociosidade e da bateria.
+    """
+
+    def __init__(self, monitores=(), relogio=time.monotonic,
+                 ler_cpu=None, ler_bateria=_na_bateria):
+        """
+        Args:
+            monitores (iterable): Monitores do config.json
+            relogio (callable): Relógio monotônico (substituível em testes)
+            ler_cpu (callable): Uso de CPU (%) desde a última chamada
+                (padrão: psutil.cpu_percent)
+            ler_bateria (callable): True se o sistema está na bateria
+        """
+        self.relogio = relogio
+        self.ler_cpu = ler_cpu or (lambda: psutil.cpu_percent(interval=None))
+        self.ler_bateria = ler_bateria
+        self.latencias = {}
+        self.ultima_atividade = {}
+        self.fator_ocioso = 1.0
+        self.na_bateria = False
+        self.proxima_consulta_bateria = 0.0
+        self.intervalo_atual = LATENCIA_PADRAO
+        self.configurar(monitores)
+
+    def configurar(self, monitores):
+        """
+        Atualiza as latências desejadas (configuração recarregada).
+
+        Args:
+            monitores (iterable): Monitores do config.json
+        """
+        latencias = {}
+        for config_processo in monitores:
+            nome = config_processo['process'].lower()
+            latencia = latencia_do_monitor(config_processo)
+            latencias[nome] = min(latencia, latencias.get(nome, latencia))
+        self.latencias = latencias
+        self.ultima_atividade = {
+            nome: instante for nome, instante in self.ultima_atividade.items()
+            if nome in latencias
+        }
+
+    def registrar_ciclo(self, monitores_alterados=()):
+        """
+        Registra o resultado de uma varredura.
+
+        Args:
+            monitores_alterados (iterable): Monitores que iniciaram ou pararam
+        """
+        agora = self.relogio()
+        houve_atividade = False
+        for nome in monitores_alterados:
+            self.ultima_atividade[nome] = agora
+            houve_atividade = True
+
+        if houve_atividade or self.ler_cpu() >= LIMITE_CPU_OCIOSA:
+            self.fator_ocioso = 1.0
+        else:
+            self.fator_ocioso = min(self.fator_ocioso * 2, FATOR_OCIOSO_MAXIMO)
+
+        if agora >= self.proxima_consulta_bateria:
+            self.na_bateria = self.ler_bateria()
+            self.proxima_consulta_bateria = agora + INTERVALO_CONSULTA_BATERIA
+
+    def proximo_intervalo(self):
+        """
+        Returns:
+            float: Segundos até a próxima varredura
+        """
+        if not self.latencias:
+            # Nada a detectar: só a recarga da configuração acorda o laço
+            self.intervalo_atual = INTERVALO_MAXIMO
+            return self.intervalo_atual
+
+        agora = self.relogio()
+        fator_sistema = self.fator_ocioso * (FATOR_BATERIA if self.na_bateria else 1.0)
+        menor = INTERVALO_MAXIMO
+        for nome, latencia in self.latencias.items():
+            ultima = self.ultima_atividade.get(nome)
+            if ultima is not None and agora - ultima < JANELA_ATIVIDADE_RECENTE:
+                efetivo = latencia * FATOR_APERTO
+            else:
+                efetivo = latencia * fator_sistema
+            menor = min(menor, efetivo)
+
+        self.intervalo_atual = max(INTERVALO_MINIMO, min(menor, INTERVALO_MAXIMO))
+        return self.intervalo_atual
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Intervalo atual e fatores de adaptação
+        """
+        agora = self.relogio()
+        return {
+            'intervalo_s': self.intervalo_atual,
+            'fator_ocioso': self.fator_ocioso,
+            'na_bateria': self.na_bateria,
+            'monitores_recentes': sorted(
+                nome for nome, instante in self.ultima_atividade.items()
+                if agora - instante < JANELA_ATIVIDADE_RECENTE),
+        }
@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['turbo_atalho_modificado.py'],
-    pathex=[],
+    pathex=['..'],
     binaries=[],
     datas=[('icons', 'icons')],
     hiddenimports=['pynput.keyboard._win32', 'pynput.mouse._win32', 'PIL._tkinter_finder', 'pkg_resources.py2_warn'],
@@ -25,6 +25,7 @@ pyinstaller ^
     --hidden-import "pynput.mouse._win32" ^
     --hidden-import "PIL._tkinter_finder" ^
     --hidden-import "pkg_resources.py2_warn" ^
+    --paths ".." ^
     --distpath "dist" ^
     turbo_atalho_modificado.py
 
@@ -9,7 +9,7 @@ import ctypes
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
-from pynput.keyboard import Key, KeyCode, Listener, Controller
+from pynput.keyboard import Key, Listener, Controller
 from pystray import Icon, MenuItem, Menu
 from PIL import Image
 
@@ -22,6 +22,13 @@ else:
     # Rodando como script
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     SCRIPT_DIR = BASE_DIR
+    # Módulos compartilhados (teclas, despacho) ficam no diretório pai
+    sys.path.append(os.path.dirname(BASE_DIR))
+
+from backend_energia import criar_backend_energia
+from despacho_atalhos import AutomatoAtalhos, chave_evento, descrever_teclas_atalho
+from observador_config import salvar_configuracao_atomica
+from teclas import MODIFICADORES_POR_TECLA, tecla_de_evento_tk, validar_tecla
 
 APPDATA = os.environ.get('APPDATA', os.path.expanduser('~\\AppData\\Roaming'))
 CONFIG_DIR = os.path.join(APPDATA, 'TurboAtalho')
@@ -55,7 +62,6 @@ OPCOES_PLANOS_ENERGIA = [
 ]
 
 INTERVALO_MONITORAMENTO = 2
-TEMPO_DUPLO_CLIQUE = 0.5
 
 controlador_teclado = Controller()
 
@@ -106,8 +112,7 @@ def carregar_configuracoes(configuracao_padrao):
 
 def salvar_configuracoes(configuracoes):
     try:
-        with open(ARQUIVO_CONFIG, 'w', encoding='utf-8') as arquivo:
-            json.dump(configuracoes, arquivo, indent=4, ensure_ascii=False)
+        salvar_configuracao_atomica(ARQUIVO_CONFIG, configuracoes)
     except Exception:
         messagebox.showerror(
             "Erro", "Não foi possível salvar as configurações")
@@ -326,23 +331,23 @@ class InterfaceConfigurador(tk.Tk):
             self.bind_all("<KeyPress>", self._capturar_tecla_pressionada)
 
     def _ao_desfocar_campo_tecla(self, evento):
+        self.unbind_all("<KeyPress>")
         if not self.campo_tecla.get():
             self.campo_tecla.insert(0, self.PLACEHOLDER_TECLA)
 
     def _capturar_tecla_pressionada(self, evento):
-        if evento.char and len(evento.char) == 1:
-            representacao_tecla = evento.char
-        else:
-            representacao_tecla = f"Key.{evento.keysym.lower()}"
+        representacao_tecla = tecla_de_evento_tk(evento)
 
         self.campo_tecla.delete(0, tk.END)
         self.campo_tecla.insert(0, representacao_tecla)
+        if representacao_tecla[4:] in MODIFICADORES_POR_TECLA:
+            return
         self.unbind_all("<KeyPress>")
 
     def _atualizar_lista_atalhos(self):
         self.lista_widget_atalhos.delete(0, tk.END)
         for atalho in self.lista_atalhos:
-            texto_atalho = f"{atalho['tecla']} → {atalho['comando']}"
+            texto_atalho = f"{descrever_teclas_atalho(atalho)} → {atalho['comando']}"
             self.lista_widget_atalhos.insert(tk.END, texto_atalho)
 
     def _adicionar_atalho(self):
@@ -353,6 +358,11 @@ class InterfaceConfigurador(tk.Tk):
             messagebox.showwarning("Atenção", "Defina tecla e comando válidos")
             return
 
+        erro_tecla = validar_tecla(tecla)
+        if erro_tecla:
+            messagebox.showerror("Erro", erro_tecla)
+            return
+
         novo_atalho = {"tecla": tecla, "comando": comando}
         self.lista_atalhos.append(novo_atalho)
 
@@ -469,7 +479,15 @@ class GerenciadorAtalhos:
             "enable_calc_percent", True)
 
         self.timestamp_config = os.path.getmtime(ARQUIVO_CONFIG)
-        self.historico_teclas = {}
+        self.automato = AutomatoAtalhos()
+        self._compilar_atalhos()
+
+        self.modificadores_pressionados = frozenset()
+        self.listener = None
+
+    def _compilar_atalhos(self):
+        for erro in self.automato.compilar(self.atalhos_configurados):
+            print(f"Atalho ignorado: {erro}")
 
     def recarregar_se_necessario(self):
         try:
@@ -479,6 +497,7 @@ class GerenciadorAtalhos:
                 self.atalhos_configurados = configuracoes["atalhos"]
                 self.atalho_calculadora_ativo = configuracoes.get(
                     "enable_calc_percent", True)
+                self._compilar_atalhos()
                 self.timestamp_config = timestamp_atual
         except OSError:
             pass
@@ -495,34 +514,44 @@ class GerenciadorAtalhos:
             return
 
         self.recarregar_se_necessario()
-        tempo_atual = time.time()
-
-        for atalho in self.atalhos_configurados:
-            try:
-                tecla_configurada = eval(atalho['tecla'])
-            except (NameError, SyntaxError):
-                tecla_configurada = atalho['tecla']
-
-            tecla_corresponde = (
-                tecla == tecla_configurada or
-                (isinstance(tecla, KeyCode) and
-                 getattr(tecla, 'char', None) == tecla_configurada)
-            )
-
-            if not tecla_corresponde:
-                continue
-
-            chave_atalho = atalho['tecla']
-            tempo_anterior = self.historico_teclas.get(chave_atalho)
-
-            if tempo_anterior and (tempo_atual - tempo_anterior) < TEMPO_DUPLO_CLIQUE:
-                executar_comando(atalho['comando'])
-                self.historico_teclas[chave_atalho] = None
-            else:
-                self.historico_teclas[chave_atalho] = tempo_atual
+        tempo_atual = time.monotonic()
+
+        modificadores = self.modificadores_pressionados
+        if modificadores and self.listener is not None:
+            tecla = self.listener.canonical(tecla)
+
+        comandos, prazo_pendente = self.automato.processar(
+            chave_evento(tecla, modificadores), tempo_atual)
+        for comando in comandos:
+            executar_comando(comando)
+        if prazo_pendente is not None:
+            self._agendar_expiracao(prazo_pendente)
+
+        modificador = MODIFICADORES_POR_TECLA.get(getattr(tecla, 'name', None))
+        if modificador:
+            self.modificadores_pressionados = modificadores | {modificador}
+
+    def _agendar_expiracao(self, prazo):
+        def expirar():
+            for comando in self.automato.expirar(time.monotonic()):
+                executar_comando(comando)
+
+        temporizador = threading.Timer(
+            max(0.0, prazo - time.monotonic()) + 0.001, expirar)
+        temporizador.daemon = True
+        temporizador.start()
+
+    def ao_soltar_tecla(self, tecla):
+        modificador = MODIFICADORES_POR_TECLA.get(getattr(tecla, 'name', None))
+        if modificador:
+            self.modificadores_pressionados = (
+                self.modificadores_pressionados - {modificador})
 
     def iniciar_monitoramento(self):
-        Listener(on_press=self.ao_pressionar_tecla).start()
+        self.listener = Listener(
+            on_press=self.ao_pressionar_tecla,
+            on_release=self.ao_soltar_tecla)
+        self.listener.start()
 
 class GerenciadorPlanoEnergia:
     PRIORIDADE_PLANOS = {
@@ -534,6 +563,7 @@ class GerenciadorPlanoEnergia:
     def __init__(self):
         self.plano_atual = None
         self.processos_ativos = {}
+        self.backend = criar_backend_energia(PLANOS_ENERGIA_FIXOS)
 
     def adicionar_processo_ativo(self, nome_processo, config_processo):
         self.processos_ativos[nome_processo] = config_processo
@@ -570,22 +600,8 @@ class GerenciadorPlanoEnergia:
                 self.plano_atual = plano_necessario
 
     def _definir_plano_energia(self, nome_plano):
-        guid_plano = PLANOS_ENERGIA_FIXOS.get(nome_plano)
-
-        if not guid_plano:
-            return False
-
-        try:
-            subprocess.run(
-                ["powercfg", "-setactive", guid_plano],
-                check=True,
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            return True
-        except subprocess.CalledProcessError as e:
-            return False
+        # API nativa (powrprof) em vez de um processo powercfg por troca
+        return self.backend.ativar(nome_plano)
 
 class GerenciadorEnergia:
     def __init__(self):
@@ -687,16 +703,16 @@ class GerenciadorEnergia:
 
             time.sleep(INTERVALO_MONITORAMENTO)
 
+def executar_configurador():
+    aplicacao = InterfaceConfigurador(DEFAULT_CONFIG)
+    aplicacao.protocol("WM_DELETE_WINDOW", aplicacao.destroy)
+    aplicacao.mainloop()
+
 def abrir_configurador(icone, item):
+    # Tk em processo próprio (thread principal dele), em vez de uma nova
+    # thread com um interpretador Tk a cada clique em "Opções"
     try:
-        import threading
-        def criar_interface():
-            aplicacao = InterfaceConfigurador(DEFAULT_CONFIG)
-            aplicacao.protocol("WM_DELETE_WINDOW", aplicacao.destroy)
-            aplicacao.mainloop()
-        
-        thread_interface = threading.Thread(target=criar_interface, daemon=True)
-        thread_interface.start()
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--configurador'])
     except Exception:
         pass
 
@@ -724,7 +740,9 @@ def criar_icone_system_tray():
         print(f"Erro ao criar ícone da system tray: {e}")
         sys.exit(1)
 
-if __name__ == "__main__":
+if __name__ == "__main__" and '--configurador' in sys.argv[1:]:
+    executar_configurador()
+elif __name__ == "__main__":
     try:
         gerenciador_energia = GerenciadorEnergia()
         thread_energia = threading.Thread(
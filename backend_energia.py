@@ -0,0 +1,567 @@
+# backend_energia.py - Troca do plano de energia sem iniciar processos
+
+# Interface comum dos backends (usada pelo GerenciadorPlanoEnergia):
+#
+#   ativar(nome_plano) -> bool   aplica o plano ("Alto desempenho", ...)
+#   ler_ativo() -> str | None    plano ativo no sistema (None se desconhecido)
+#   observar(callback) -> bool   avisa trocas de plano feitas pelo sistema
+#                                (False: sem notificações, só releitura)
+#   leitura_custosa              True se ler_ativo() inicia um processo (a
+#                                releitura periódica fica bem mais espaçada)
+#   enumerar() -> dict           planos disponíveis {nome: identificador}
+#                                (inclui planos personalizados e o
+#                                "Desempenho máximo"; ver catalogo_planos.py)
+#   resumo() -> dict             trocas, falhas e latência das trocas
+#
+#   BackendPowrProf        Windows: PowerSetActiveScheme/PowerGetActiveScheme
+#                          (powrprof.dll via ctypes, microssegundos por troca)
+#   BackendPowerProfiles   Linux: power-profiles-daemon pelo D-Bus (pacote
+#                          opcional 'dbus')
+#   BackendSysfs           Linux: /sys/firmware/acpi/platform_profile ou a
+#                          preferência de energia (EPP) do cpufreq; requer
+#                          root. A raiz é configurável (árvore falsa em testes)
+#   BackendPowercfg        Fallback do Windows: um processo powercfg por troca
+#
+# Cada troca (com sucesso ou não) é medida em um histograma por backend.
+
+import ctypes
+import glob
+import os
+import re
+import subprocess
+import sys
+import uuid
+
+from metricas import Histograma, agora_ns
+
+# GUIDs dos 3 planos básicos do Windows: tabela usada antes da enumeração e
+# nomes canônicos desses planos (independentes do idioma do sistema)
+PLANOS_ENERGIA_FIXOS = {
+    "Alto desempenho":      "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
+    "Equilibrado":          "381b4222-f694-41f0-9685-ff5bb260df2e",
+    "Economia de energia":  "a1841308-3541-4fab-bc81-f71556f20b4a"
+}
+
+# Perfis equivalentes aos planos do Windows em cada mecanismo do Linux
+PERFIS_POWER_PROFILES = {
+    "Alto desempenho": "performance",
+    "Equilibrado": "balanced",
+    "Economia de energia": "power-saver",
+}
+PERFIS_PLATFORM_PROFILE = {
+    "Alto desempenho": "performance",
+    "Equilibrado": "balanced",
+    "Economia de energia": "low-power",
+}
+PERFIS_EPP = {
+    "Alto desempenho": "performance",
+    "Equilibrado": "balance_performance",
+    "Economia de energia": "power",
+}
+
+# Serviços D-Bus do power-profiles-daemon (nome atual e o antigo)
+SERVICOS_POWER_PROFILES = (
+    ('org.freedesktop.UPower.PowerProfiles', '/org/freedesktop/UPower/PowerProfiles'),
+    ('net.hadess.PowerProfiles', '/net/hadess/PowerProfiles'),
+)
+
+# Notificação de troca do plano ativo (Windows 8+)
+GUID_POWERSCHEME_PERSONALITY = "245d8541-3943-4422-b025-13a784f679b7"
+DEVICE_NOTIFY_CALLBACK = 2
+
+# PowerEnumerate: enumerar esquemas de energia
+ACCESS_SCHEME = 16
+ERROR_NO_MORE_ITEMS = 259
+
+_GUID_TEXTO = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+# Linha do "powercfg /list": GUID seguido do nome entre parênteses
+_PLANO_POWERCFG = re.compile(r'(' + _GUID_TEXTO.pattern + r')\s+\((.*)\)', re.IGNORECASE)
+
+
+def nomear_planos(pares):
+    """
+    Nomes dos planos enumerados no Windows. Os 3 planos básicos mantêm o
+    nome de PLANOS_ENERGIA_FIXOS (config.json existentes continuam válidos
+    em qualquer idioma) e nomes repetidos recebem o início do GUID.
+
+    Args:
+        pares (iterable): (GUID em texto, nome amigável) na ordem do sistema
+
+    Returns:
+        dict: {nome do plano: GUID em texto}
+    """
+    fixos = {guid: nome for nome, guid in PLANOS_ENERGIA_FIXOS.items()}
+    planos = {}
+    for guid, nome in pares:
+        guid = guid.lower()
+        nome = fixos.get(guid) or nome.strip() or guid
+        if nome in planos:
+            nome = f"{nome} ({guid[:8]})"
+        planos[nome] = guid
+    return planos
+
+
+def nomear_perfis(perfis, tabela):
+    """
+    Nomes dos perfis do Linux: os equivalentes aos planos do Windows usam o
+    nome do plano, os demais (ex: "balance_power", "quiet") o próprio perfil.
+
+    Args:
+        perfis (iterable): Perfis disponíveis
+        tabela (dict): {nome do plano: perfil} do mecanismo
+
+    Returns:
+        dict: {nome do plano: perfil}
+    """
+    planos_por_perfil = {perfil: plano for plano, perfil in tabela.items()}
+    return {planos_por_perfil.get(perfil, perfil): perfil for perfil in perfis}
+
+
+class BackendEnergia:
+    """
+    Base dos backends: mede cada troca e conta sucessos e falhas.
+    Subclasses implementam _ativar() e, se possível, ler_ativo().
+    """
+
+    nome = 'base'
+
+    # ler_ativo() inicia um processo a cada chamada
+    leitura_custosa = False
+
+    def __init__(self):
+        self.latencias = Histograma()
+        self.trocas = 0
+        self.falhas = 0
+
+    def _ativar(self, nome_plano):
+        raise NotImplementedError
+
+    def ativar(self, nome_plano):
+        """
+        Aplica um plano de energia.
+
+        Args:
+            nome_plano (str): Nome do plano (ex: "Alto desempenho")
+
+        Returns:
+            bool: True se sucesso, False se falhou
+        """
+        inicio = agora_ns()
+        try:
+            sucesso = self._ativar(nome_plano)
+        except OSError as erro:
+            print(f"❌ Erro ao aplicar plano '{nome_plano}' ({self.nome}): {erro}")
+            sucesso = False
+        self.latencias.registrar(agora_ns() - inicio)
+        if sucesso:
+            self.trocas += 1
+        else:
+            self.falhas += 1
+        return sucesso
+
+    def ler_ativo(self):
+        """
+        Returns:
+            str: Plano ativo no sistema, ou None se não for possível ler
+        """
+        return None
+
+    def observar(self, callback):
+        """
+        Registra uma função chamada (em thread do sistema) quando o plano
+        ativo muda, inclusive por outros programas.
+
+        Args:
+            callback (callable): Função sem argumentos
+
+        Returns:
+            bool: False se o backend não tem notificações
+        """
+        return False
+
+    def enumerar(self):
+        """
+        Relê os planos disponíveis no sistema e atualiza as tabelas do
+        backend (novos planos passam a ser aceitos por ativar()).
+
+        Returns:
+            dict: {nome do plano: identificador} na ordem do sistema
+
+        Raises:
+            OSError: Se não for possível enumerar
+        """
+        return {}
+
+    def fechar(self):
+        pass
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Backend, trocas, falhas e latência das trocas
+        """
+        return {
+            'backend': self.nome,
+            'trocas': self.trocas,
+            'falhas': self.falhas,
+            'latencia': self.latencias.resumo(),
+        }
+
+
+class _GUID(ctypes.Structure):
+    _fields_ = [('Data1', ctypes.c_uint32), ('Data2', ctypes.c_uint16),
+                ('Data3', ctypes.c_uint16), ('Data4', ctypes.c_ubyte * 8)]
+
+
+class BackendPowrProf(BackendEnergia):
+    """
+    Windows: API de energia (powrprof.dll) chamada diretamente.
+    """
+
+    nome = 'powrprof'
+
+    def __init__(self, planos):
+        """
+        Args:
+            planos (dict): {nome do plano: GUID em texto}
+        """
+        super().__init__()
+        self.powrprof = ctypes.WinDLL('powrprof')
+        self.kernel32 = ctypes.WinDLL('kernel32')
+        self.powrprof.PowerSetActiveScheme.argtypes = [ctypes.c_void_p, ctypes.POINTER(_GUID)]
+        self.powrprof.PowerSetActiveScheme.restype = ctypes.c_uint32
+        self.powrprof.PowerGetActiveScheme.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.POINTER(_GUID))]
+        self.powrprof.PowerGetActiveScheme.restype = ctypes.c_uint32
+        self.powrprof.PowerEnumerate.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32,
+            ctypes.c_uint32, ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32)]
+        self.powrprof.PowerEnumerate.restype = ctypes.c_uint32
+        self.powrprof.PowerReadFriendlyName.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(_GUID), ctypes.c_void_p, ctypes.c_void_p,
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32)]
+        self.powrprof.PowerReadFriendlyName.restype = ctypes.c_uint32
+        self.kernel32.LocalFree.argtypes = [ctypes.c_void_p]
+        self._definir_planos(planos)
+
+    def _definir_planos(self, planos):
+        # GUIDs convertidos uma única vez por enumeração
+        self.guids = {nome: _GUID.from_buffer_copy(uuid.UUID(guid).bytes_le)
+                      for nome, guid in planos.items()}
+        self.nomes = {guid.lower(): nome for nome, guid in planos.items()}
+
+    def _ativar(self, nome_plano):
+        guid = self.guids.get(nome_plano)
+        if guid is None:
+            print(f"❌ Plano '{nome_plano}' não está nos planos suportados")
+            return False
+        codigo = self.powrprof.PowerSetActiveScheme(None, ctypes.byref(guid))
+        if codigo:
+            raise ctypes.WinError(codigo)
+        return True
+
+    def ler_ativo(self):
+        ponteiro = ctypes.POINTER(_GUID)()
+        if self.powrprof.PowerGetActiveScheme(None, ctypes.byref(ponteiro)):
+            return None
+        try:
+            texto = str(uuid.UUID(bytes_le=bytes(ponteiro.contents)))
+        finally:
+            self.kernel32.LocalFree(ponteiro)
+        # Plano fora da tabela: devolve o GUID
+        return self.nomes.get(texto, texto)
+
+    def _nome_amigavel(self, guid):
+        tamanho = ctypes.c_uint32(0)
+        self.powrprof.PowerReadFriendlyName(
+            None, ctypes.byref(guid), None, None, None, ctypes.byref(tamanho))
+        if not tamanho.value:
+            return ''
+        buffer = ctypes.create_string_buffer(tamanho.value)
+        if self.powrprof.PowerReadFriendlyName(
+                None, ctypes.byref(guid), None, None, buffer, ctypes.byref(tamanho)):
+            return ''
+        return buffer.raw.decode('utf-16-le').rstrip('\0')
+
+    def enumerar(self):
+        pares = []
+        indice = 0
+        while True:
+            guid = _GUID()
+            tamanho = ctypes.c_uint32(ctypes.sizeof(guid))
+            codigo = self.powrprof.PowerEnumerate(
+                None, None, None, ACCESS_SCHEME, indice,
+                ctypes.byref(guid), ctypes.byref(tamanho))
+            if codigo == ERROR_NO_MORE_ITEMS:
+                break
+            if codigo:
+                raise ctypes.WinError(codigo)
+            pares.append((str(uuid.UUID(bytes_le=bytes(guid))), self._nome_amigavel(guid)))
+            indice += 1
+
+        planos = nomear_planos(pares)
+        self._definir_planos(planos)
+        return planos
+
+    def observar(self, callback):
+        prototipo = ctypes.WINFUNCTYPE(
+            ctypes.c_ulong, ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p)
+
+        class _Parametros(ctypes.Structure):
+            _fields_ = [('Callback', prototipo), ('Context', ctypes.c_void_p)]
+
+        def ao_notificar(contexto, tipo, dados):
+            callback()
+            return 0
+
+        # Referências mantidas enquanto o registro existir
+        self.funcao_notificacao = prototipo(ao_notificar)
+        self.parametros_notificacao = _Parametros(self.funcao_notificacao, None)
+        self.registro_notificacao = ctypes.c_void_p()
+        guid = _GUID.from_buffer_copy(uuid.UUID(GUID_POWERSCHEME_PERSONALITY).bytes_le)
+        try:
+            codigo = self.powrprof.PowerSettingRegisterNotification(
+                ctypes.byref(guid), DEVICE_NOTIFY_CALLBACK,
+                ctypes.byref(self.parametros_notificacao),
+                ctypes.byref(self.registro_notificacao))
+        except AttributeError:
+            # Anterior ao Windows 8
+            return False
+        return codigo == 0
+
+    def fechar(self):
+        registro = getattr(self, 'registro_notificacao', None)
+        if registro:
+            self.powrprof.PowerSettingUnregisterNotification(registro)
+            self.registro_notificacao = None
+
+
+class BackendPowercfg(BackendEnergia):
+    """
+    Fallback do Windows: powercfg -setactive (um processo por troca).
+    """
+
+    nome = 'powercfg'
+    leitura_custosa = True
+
+    def __init__(self, planos):
+        """
+        Args:
+            planos (dict): {nome do plano: GUID em texto}
+        """
+        super().__init__()
+        self.planos = dict(planos)
+        self.nomes = {guid.lower(): nome for nome, guid in planos.items()}
+        self.opcoes = {'creationflags': getattr(subprocess, 'CREATE_NO_WINDOW', 0)}
+
+    def _ativar(self, nome_plano):
+        guid_plano = self.planos.get(nome_plano)
+        if not guid_plano:
+            print(f"❌ Plano '{nome_plano}' não está nos planos suportados")
+            return False
+        try:
+            subprocess.run(["powercfg", "-setactive", guid_plano], check=True,
+                           capture_output=True, text=True, **self.opcoes)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Erro ao executar powercfg: {e}")
+            print(f"   stdout: {e.stdout}")
+            print(f"   stderr: {e.stderr}")
+            return False
+
+    def ler_ativo(self):
+        try:
+            saida = subprocess.run(["powercfg", "/getactivescheme"], capture_output=True,
+                                   text=True, **self.opcoes).stdout
+        except OSError:
+            return None
+        encontrado = _GUID_TEXTO.search(saida)
+        if encontrado is None:
+            return None
+        texto = encontrado.group(0).lower()
+        return self.nomes.get(texto, texto)
+
+    def enumerar(self):
+        try:
+            saida = subprocess.run(["powercfg", "/list"], capture_output=True,
+                                   text=True, **self.opcoes).stdout
+        except OSError as erro:
+            raise OSError(f"powercfg /list falhou: {erro}") from erro
+        planos = nomear_planos(_PLANO_POWERCFG.findall(saida))
+        if not planos:
+            raise OSError("powercfg /list sem planos reconhecidos")
+        self.planos = planos
+        self.nomes = {guid: nome for nome, guid in planos.items()}
+        return dict(planos)
+
+
+class BackendPowerProfiles(BackendEnergia):
+    """
+    Linux: perfil ativo do power-profiles-daemon, pelo D-Bus do sistema.
+    """
+
+    nome = 'power-profiles-daemon'
+
+    def __init__(self):
+        import dbus
+
+        super().__init__()
+        self.erro_dbus = dbus.DBusException
+        self.texto_dbus = dbus.String
+        try:
+            barramento = dbus.SystemBus()
+        except dbus.DBusException as erro:
+            raise OSError(f"D-Bus do sistema indisponível: {erro}") from erro
+        for servico, caminho in SERVICOS_POWER_PROFILES:
+            try:
+                objeto = barramento.get_object(servico, caminho)
+                self.propriedades = dbus.Interface(objeto, 'org.freedesktop.DBus.Properties')
+                perfis = self.propriedades.Get(servico, 'Profiles')
+            except dbus.DBusException:
+                continue
+            self.servico = servico
+            break
+        else:
+            raise OSError("power-profiles-daemon indisponível")
+        self._definir_perfis(perfis)
+
+    def _definir_perfis(self, perfis):
+        self.perfis = nomear_perfis(
+            (str(perfil['Profile']) for perfil in perfis), PERFIS_POWER_PROFILES)
+        self.planos = {perfil: plano for plano, perfil in self.perfis.items()}
+
+    def _ativar(self, nome_plano):
+        perfil = self.perfis.get(nome_plano)
+        if perfil is None:
+            print(f"❌ Plano '{nome_plano}' sem perfil equivalente no power-profiles-daemon")
+            return False
+        try:
+            self.propriedades.Set(self.servico, 'ActiveProfile', self.texto_dbus(perfil))
+            return True
+        except self.erro_dbus as erro:
+            print(f"❌ Erro ao trocar perfil do power-profiles-daemon: {erro}")
+            return False
+
+    def ler_ativo(self):
+        try:
+            perfil = str(self.propriedades.Get(self.servico, 'ActiveProfile'))
+        except self.erro_dbus:
+            return None
+        return self.planos.get(perfil, perfil)
+
+    def enumerar(self):
+        try:
+            self._definir_perfis(self.propriedades.Get(self.servico, 'Profiles'))
+        except self.erro_dbus as erro:
+            raise OSError(f"perfis do power-profiles-daemon indisponíveis: {erro}") from erro
+        return dict(self.perfis)
+
+
+class BackendSysfs(BackendEnergia):
+    """
+    Linux sem power-profiles-daemon: escreve o perfil do firmware
+    (platform_profile) ou, sem ele, a EPP de cada política do cpufreq.
+    """
+
+    nome = 'sysfs'
+
+    def __init__(self, raiz=os.sep):
+        """
+        Args:
+            raiz (str): Raiz do sistema de arquivos (substituível em testes)
+        """
+        super().__init__()
+        perfil_firmware = os.path.join(raiz, 'sys', 'firmware', 'acpi', 'platform_profile')
+        if os.path.exists(perfil_firmware):
+            self.arquivos = [perfil_firmware]
+            self.arquivo_escolhas = perfil_firmware + '_choices'
+            self.tabela = PERFIS_PLATFORM_PROFILE
+        else:
+            self.arquivos = sorted(glob.glob(os.path.join(
+                raiz, 'sys', 'devices', 'system', 'cpu', 'cpufreq', 'policy*',
+                'energy_performance_preference')))
+            if not self.arquivos:
+                raise OSError("sem platform_profile nem EPP no sysfs")
+            self.arquivo_escolhas = os.path.join(
+                os.path.dirname(self.arquivos[0]), 'energy_performance_available_preferences')
+            self.tabela = PERFIS_EPP
+
+        if not os.access(self.arquivos[0], os.W_OK):
+            raise PermissionError(f"sem permissão de escrita em {self.arquivos[0]}")
+        self.enumerar()
+
+    @staticmethod
+    def _ler(caminho):
+        try:
+            with open(caminho) as arquivo:
+                return arquivo.read().strip()
+        except OSError:
+            return ''
+
+    def _ativar(self, nome_plano):
+        perfil = self.perfis.get(nome_plano)
+        if perfil is None:
+            print(f"❌ Plano '{nome_plano}' sem perfil equivalente no sysfs")
+            return False
+        for caminho in self.arquivos:
+            with open(caminho, 'w') as arquivo:
+                arquivo.write(perfil)
+        return True
+
+    def ler_ativo(self):
+        perfil = self._ler(self.arquivos[0])
+        if not perfil:
+            return None
+        return self.planos.get(perfil, perfil)
+
+    def enumerar(self):
+        # "default" da EPP não é um perfil selecionável
+        escolhas = [perfil for perfil in self._ler(self.arquivo_escolhas).split()
+                    if perfil != 'default']
+        self.perfis = nomear_perfis(escolhas, self.tabela)
+        self.planos = {perfil: plano for plano, perfil in self.perfis.items()}
+        return dict(self.perfis)
+
+
+class BackendIndisponivel(BackendEnergia):
+    """
+    Plataforma sem mecanismo suportado: toda troca falha (avisando uma vez).
+    """
+
+    nome = 'indisponivel'
+
+    def _ativar(self, nome_plano):
+        if not self.falhas:
+            print("⚠️ Troca de plano de energia não suportada nesta plataforma")
+        return False
+
+
+def criar_backend_energia(planos):
+    """
+    Escolhe o melhor backend de troca de plano disponível.
+
+    Args:
+        planos (dict): {nome do plano: GUID em texto} (Windows)
+
+    Returns:
+        BackendEnergia: Backend pronto para uso
+    """
+    if sys.platform == "win32":
+        try:
+            return BackendPowrProf(planos)
+        except (OSError, AttributeError) as erro:
+            print(f"⚠️ powrprof.dll indisponível ({erro}); usando powercfg")
+            return BackendPowercfg(planos)
+    if sys.platform.startswith("linux"):
+        try:
+            return BackendPowerProfiles()
+        except (ImportError, OSError):
+            # Sem o pacote 'dbus' ou sem o daemon
+            pass
+        try:
+            return BackendSysfs()
+        except OSError:
+            pass
+    return BackendIndisponivel()
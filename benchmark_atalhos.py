@@ -0,0 +1,206 @@
+# benchmark_atalhos.py - Microbenchmark do despacho de atalhos
+
+import itertools
+import random
+import sys
+import time
+
+from despacho_atalhos import AutomatoAtalhos, chave_evento
+from executor_acoes import AcaoComando, ExecutorNucleo
+from nucleo import Nucleo
+from teclas import MODIFICADORES_POR_TECLA, NOMES_TECLAS_ESPECIAIS
+
+# Quantidades de atalhos configurados avaliadas
+QUANTIDADES_ATALHOS = [10, 1_000, 10_000]
+
+# Eventos simulados por medição
+EVENTOS_POR_MEDICAO = 200_000
+
+# Tempo máximo aceitável de um callback do hook (milissegundos)
+LIMITE_CALLBACK_MS = 5.0
+
+# Duração simulada de um Popen lento (disco lento / antivírus)
+TEMPO_ACAO_LENTA = 0.05
+
+
+class TeclaFalsa:
+    """
+    Substituto mínimo de Key/KeyCode do pynput, para rodar sem teclado real.
+    """
+
+    def __init__(self, char=None, name=None, vk=None):
+        self.char = char
+        self.name = name
+        self.vk = vk
+
+
+def gerar_teclas_distintas():
+    """
+    Gera especificações de tecla válidas e distintas: teclas especiais e
+    códigos virtuais com todas as combinações de modificadores e, depois,
+    caracteres únicos (ideogramas, que não aparecem no texto simulado).
+
+    Yields:
+        str: Especificação de tecla (ex: "ctrl+alt+Key.home", "vk:173")
+    """
+    bases = sorted(nome for nome in NOMES_TECLAS_ESPECIAIS
+                   if nome not in MODIFICADORES_POR_TECLA)
+    bases = [f"Key.{nome}" for nome in bases] + [f"vk:{codigo}" for codigo in range(1, 256)]
+    nomes_modificadores = ('ctrl', 'alt', 'shift', 'cmd')
+    for tamanho in range(len(nomes_modificadores) + 1):
+        for modificadores in itertools.combinations(nomes_modificadores, tamanho):
+            prefixo = ''.join(f"{nome}+" for nome in modificadores)
+            for base in bases:
+                yield prefixo + base
+    for codigo in itertools.count(0x4E00):
+        yield chr(codigo)
+
+
+def gerar_atalhos(quantidade):
+    """
+    Gera atalhos sintéticos válidos e distintos + um atalho em 'a'.
+
+    Args:
+        quantidade (int): Número de atalhos a gerar
+
+    Returns:
+        list: Lista de atalhos no formato do config.json
+    """
+    atalhos = [
+        {"tecla": tecla, "comando": f"cmd{indice}.exe"}
+        for indice, tecla in zip(range(quantidade - 1), gerar_teclas_distintas())
+    ]
+    atalhos.append({"tecla": "a", "comando": "notepad.exe"})
+    return atalhos
+
+
+def gerar_sequencias(quantidade, semente=42):
+    """
+    Gera sequências líderes sintéticas (2 a 4 teclas) sobre letras e F1-F12.
+
+    Args:
+        quantidade (int): Número de sequências a gerar
+        semente (int): Semente do gerador aleatório (resultados reprodutíveis)
+
+    Returns:
+        list: Lista de atalhos no formato do config.json
+    """
+    gerador = random.Random(semente)
+    teclas = [chr(codigo) for codigo in range(ord('a'), ord('z') + 1)]
+    teclas += [f"Key.f{numero}" for numero in range(1, 13)]
+    return [
+        {"sequencia": gerador.choices(teclas, k=gerador.randint(2, 4)),
+         "comando": f"cmd{indice}.exe"}
+        for indice in range(quantidade)
+    ]
+
+
+def medir_automato(atalhos, teclas, intervalo=0.06):
+    """
+    Mede o custo médio por evento do autômato de atalhos.
+
+    Args:
+        atalhos (list): Atalhos compilados no autômato
+        teclas (list): Fluxo de teclas repetido pelo autômato
+        intervalo (float): Tempo simulado entre as teclas (segundos)
+
+    Returns:
+        float: Nanossegundos por evento
+    """
+    automato = AutomatoAtalhos(atalhos)
+    # Atalhos rejeitados deixariam o autômato menor que a varredura linear
+    assert not automato.erros, automato.erros[:3]
+    chaves = [chave_evento(tecla) for tecla in teclas]
+    inicio = time.perf_counter_ns()
+    for indice, chave in enumerate(chaves):
+        automato.processar(chave, indice * intervalo)
+    return (time.perf_counter_ns() - inicio) / len(chaves)
+
+
+def medir_varredura_linear(atalhos, teclas):
+    """
+    Mede o custo da abordagem anterior (eval + comparação em cada atalho).
+
+    Returns:
+        float: Nanossegundos por evento
+    """
+    class Key:
+        pass
+
+    for atalho in atalhos:
+        if atalho['tecla'].startswith('Key.'):
+            setattr(Key, atalho['tecla'][4:], atalho['tecla'])
+
+    namespace = {'Key': Key}
+    inicio = time.perf_counter_ns()
+    for tecla in teclas:
+        for atalho in atalhos:
+            try:
+                tecla_configurada = eval(atalho['tecla'], namespace)
+            except (NameError, SyntaxError):
+                tecla_configurada = atalho['tecla']
+            if tecla.char == tecla_configurada:
+                break
+    return (time.perf_counter_ns() - inicio) / len(teclas)
+
+
+def medir_pior_caso_callback(eventos=2_000):
+    """
+    Mede o pior tempo do callback (despacho + enfileiramento) enquanto as
+    ações demoram TEMPO_ACAO_LENTA cada e a fila chega a encher, com o
+    ExecutorNucleo usado pelo daemon (o teste test_gerenciador_atalhos.py
+    cobre o callback completo do Listener).
+
+    Returns:
+        tuple: (pior caso em ms, ações descartadas)
+    """
+    nucleo = Nucleo()
+    nucleo.iniciar()
+    executor = ExecutorNucleo({AcaoComando: lambda acao: time.sleep(TEMPO_ACAO_LENTA)}, nucleo)
+    executor.iniciar()
+    automato = AutomatoAtalhos([{"tecla": "a", "comando": "lento.exe"}])
+    tecla = TeclaFalsa(char='a')
+
+    pior_caso = 0
+    for indice in range(eventos):
+        inicio = time.perf_counter_ns()
+        # Cada par de eventos forma um duplo-pressionamento
+        comandos, _ = automato.processar(chave_evento(tecla), indice * 0.3)
+        for comando in comandos:
+            executor.enfileirar(AcaoComando(comando))
+        pior_caso = max(pior_caso, time.perf_counter_ns() - inicio)
+
+    descartadas = executor.acoes_descartadas
+    executor.parar()
+    nucleo.parar()
+    return pior_caso / 1e6, descartadas
+
+
+if __name__ == "__main__":
+    # Texto comum: a maioria das teclas não corresponde a nenhum atalho
+    teclas = [TeclaFalsa(char=c) for c in "o rato roeu a roupa do rei "]
+    teclas = (teclas * (EVENTOS_POR_MEDICAO // len(teclas) + 1))[:EVENTOS_POR_MEDICAO]
+
+    print(f"{'atalhos':>8} | {'autômato (ns/evento)':>20} | {'linear (ns/evento)':>19}")
+    for quantidade in QUANTIDADES_ATALHOS:
+        atalhos = gerar_atalhos(quantidade)
+        custo_automato = medir_automato(atalhos, teclas)
+
+        # A varredura linear é lenta demais para todos os eventos
+        amostra = teclas[:max(10, EVENTOS_POR_MEDICAO // quantidade // 10)]
+        custo_linear = medir_varredura_linear(atalhos, amostra)
+
+        print(f"{quantidade:>8} | {custo_automato:>20.0f} | {custo_linear:>19.0f}")
+
+    # Digitação sintética passando por sequências líderes (trie + links de falha)
+    print(f"\n{'sequências':>10} | {'autômato (ns/evento)':>20}")
+    for quantidade in QUANTIDADES_ATALHOS:
+        custo_automato = medir_automato(gerar_sequencias(quantidade), teclas)
+        print(f"{quantidade:>10} | {custo_automato:>20.0f}")
+
+    pior_caso_ms, descartadas = medir_pior_caso_callback()
+    print(f"\npior caso do callback com ações lentas: {pior_caso_ms:.3f} ms "
+          f"({descartadas} ações descartadas com a fila cheia)")
+    if pior_caso_ms > LIMITE_CALLBACK_MS:
+        print(f"❌ Callback excedeu o limite de {LIMITE_CALLBACK_MS} ms")
+        sys.exit(1)
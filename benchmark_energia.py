@@ -0,0 +1,364 @@
+# benchmark_energia.py - Microbenchmark do ciclo de monitoramento de processos
+
+import os
+import random
+import re
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend_energia import (PLANOS_ENERGIA_FIXOS, BackendPowercfg, BackendSysfs,
+                             criar_backend_energia)
+from eventos_processos import criar_fonte_eventos
+from processos import CorrespondenteProcessos, TabelaProcessos, TrieProcessos, varrer_processos
+
+# Tamanho da tabela de processos sintética e quantidade de monitores
+QUANTIDADE_PROCESSOS = 5_000
+QUANTIDADE_MONITORES = 500
+
+# Ciclos medidos em cada abordagem
+CICLOS_POR_MEDICAO = 5
+
+# Processos trocados por ciclo no regime estável do cache incremental
+PROCESSOS_TROCADOS_POR_CICLO = 20
+
+# Processos reais iniciados para medir a detecção por eventos
+REPETICOES_DETECCAO = 5
+
+# Trocas de plano medidas por backend
+REPETICOES_TROCA_PLANO = 30
+
+# Processos comuns que aparecem várias vezes na tabela
+NOMES_COMUNS = [
+    'svchost.exe', 'chrome.exe', 'msedge.exe', 'RuntimeBroker.exe',
+    'conhost.exe', 'explorer.exe', 'Code.exe', 'steam.exe', 'Discord.exe',
+]
+
+
+class ProcessoFalso:
+    """
+    Substituto mínimo de psutil.Process (pid, info['name'], name(),
+    create_time(), exe(), cmdline()).
+    """
+
+    def __init__(self, pid, nome, criacao=0.0):
+        self.pid = pid
+        self.info = {'name': nome}
+        self.criacao = criacao
+        self.leituras_caras = 0
+
+    def name(self):
+        return self.info['name']
+
+    def create_time(self):
+        return self.criacao
+
+    def exe(self):
+        self.leituras_caras += 1
+        return os.path.join(os.sep, 'programas', self.info['name'])
+
+    def cmdline(self):
+        self.leituras_caras += 1
+        return [os.path.join(os.sep, 'programas', self.info['name']),
+                '--perfil', str(self.pid % 7)]
+
+
+def gerar_tabela_processos(quantidade=QUANTIDADE_PROCESSOS, semente=42):
+    """
+    Gera uma tabela de processos sintética (nomes comuns repetidos + únicos).
+
+    Returns:
+        list: Lista de ProcessoFalso
+    """
+    gerador = random.Random(semente)
+    processos = []
+    for pid in range(4, quantidade + 4):
+        if gerador.random() < 0.4:
+            nome = gerador.choice(NOMES_COMUNS)
+        else:
+            tamanho = gerador.randint(4, 14)
+            nome = ''.join(gerador.choices(string.ascii_letters, k=tamanho)) + '.exe'
+        processos.append(ProcessoFalso(pid, nome))
+    return processos
+
+
+def gerar_monitores(processos, quantidade=QUANTIDADE_MONITORES, semente=7):
+    """
+    Gera monitores sintéticos: metade são prefixos de processos existentes,
+    metade nomes que não estão rodando.
+
+    Returns:
+        list: Monitores no formato do config.json
+    """
+    gerador = random.Random(semente)
+    monitores = []
+    for indice in range(quantidade):
+        if indice % 2 == 0:
+            nome = gerador.choice(processos).info['name']
+            nome = nome[:gerador.randint(3, len(nome))]
+        else:
+            nome = f"jogo{indice}.exe"
+        monitores.append({"process": nome, "priority": "Alta",
+                          "power_on": "Alto desempenho", "power_off": "Equilibrado"})
+    return monitores
+
+
+def gerar_monitores_regras(processos, quantidade=QUANTIDADE_MONITORES, semente=11):
+    """
+    Gera monitores com todas as regras (prefixo, exato, glob, regex, exe,
+    cmdline), metade casando com processos existentes.
+
+    Returns:
+        list: Monitores no formato do config.json
+    """
+    gerador = random.Random(semente)
+    regras = ['prefixo', 'exato', 'glob', 'regex', 'exe', 'cmdline']
+    monitores = []
+    for indice in range(quantidade):
+        regra = regras[indice % len(regras)]
+        nome = (gerador.choice(processos).info['name'] if indice % 2 == 0
+                else f"jogo{indice}.exe")
+        padrao = {
+            'prefixo': nome[:4], 'exato': nome, 'exe': nome,
+            'glob': nome[:3] + '*.exe', 'regex': '^' + re.escape(nome[:3]) + r'\w*\.exe$',
+            'cmdline': '--perfil 3' if indice % 2 == 0 else f'--perfil {indice}',
+        }[regra]
+        monitores.append({"process": padrao, "regra": regra, "priority": "Alta",
+                          "power_on": "Alto desempenho", "power_off": "Equilibrado"})
+    return monitores
+
+
+def ciclo_anterior(monitores, processos):
+    """
+    Ciclo como era antes: uma enumeração completa (e lower() de todos os
+    nomes) para cada monitor.
+
+    Returns:
+        dict: {nome monitorado: quantidade de processos encontrados}
+    """
+    ativos = {}
+    for config_processo in monitores:
+        nome_processo = config_processo['process'].lower()
+        processos_encontrados = [
+            processo for processo in iter(processos)
+            if (processo.info['name'] and
+                processo.info['name'].lower().startswith(nome_processo))
+        ]
+        ativos[nome_processo] = len(processos_encontrados)
+    return ativos
+
+
+def ciclo_trie(trie, monitores, processos):
+    """
+    Ciclo atual: uma enumeração + trie de prefixos.
+
+    Returns:
+        dict: {nome monitorado: quantidade de processos encontrados}
+    """
+    varredura = varrer_processos(trie, lambda: iter(processos))
+    return {
+        config_processo['process'].lower():
+            len(varredura.pids_por_monitor[config_processo['process'].lower()])
+        for config_processo in monitores
+    }
+
+
+def medir_cache_incremental(correspondente, processos, trocados=PROCESSOS_TROCADOS_POR_CICLO,
+                            ciclos=CICLOS_POR_MEDICAO):
+    """
+    Mede o ciclo da TabelaProcessos em regime estável: a cada ciclo alguns
+    processos terminam e outros iniciam com PIDs novos.
+
+    Returns:
+        tuple: (CPU por ciclo em ms, contadores do último ciclo)
+    """
+    tabela_sintetica = {processo.pid: processo for processo in processos}
+    tabela = TabelaProcessos(correspondente, listar_pids=lambda: tabela_sintetica.keys(),
+                             abrir_processo=tabela_sintetica.__getitem__)
+    tabela.atualizar()
+
+    proximo_pid = max(tabela_sintetica) + 1
+    gerador = random.Random(3)
+    custo_total = 0
+    for _ in range(ciclos):
+        for pid in gerador.sample(sorted(tabela_sintetica), trocados):
+            nome = tabela_sintetica.pop(pid).info['name']
+            tabela_sintetica[proximo_pid] = ProcessoFalso(proximo_pid, nome)
+            proximo_pid += 1
+        inicio = time.process_time_ns()
+        tabela.atualizar()
+        custo_total += time.process_time_ns() - inicio
+    return custo_total / ciclos / 1e6, tabela.ultimo_ciclo
+
+
+def medir_regras(monitores, processos):
+    """
+    Mede a primeira varredura (todos os processos são novos) com as regras
+    compiladas e conta as leituras de exe/cmdline.
+
+    Returns:
+        tuple: (CPU em ms, processos casados, leituras de exe/cmdline)
+    """
+    for processo in processos:
+        processo.leituras_caras = 0
+    tabela_sintetica = {processo.pid: processo for processo in processos}
+    inicio = time.process_time_ns()
+    tabela = TabelaProcessos(CorrespondenteProcessos(monitores),
+                             listar_pids=lambda: tabela_sintetica.keys(),
+                             abrir_processo=tabela_sintetica.__getitem__)
+    tabela.atualizar()
+    custo = (time.process_time_ns() - inicio) / 1e6
+    leituras = sum(processo.leituras_caras for processo in processos)
+    return custo, len(tabela.processos_casados), leituras
+
+
+def medir_cpu(funcao, ciclos=CICLOS_POR_MEDICAO):
+    """
+    Tempo de CPU médio por ciclo (milissegundos).
+    """
+    inicio = time.process_time_ns()
+    for _ in range(ciclos):
+        funcao()
+    return (time.process_time_ns() - inicio) / ciclos / 1e6
+
+
+def medir_deteccao(fonte, repeticoes=REPETICOES_DETECCAO, duracao=0.3):
+    """
+    Inicia processos reais ('sleep') e mede quanto tempo a fonte de eventos
+    leva para acordar o laço no início e no fim de cada um.
+
+    Args:
+        fonte: Fonte de eventos já iniciada (ver eventos_processos)
+        repeticoes (int): Processos iniciados
+        duracao (float): Tempo de vida de cada processo (segundos)
+
+    Returns:
+        tuple: (latências de início em ms, latências de fim em ms)
+    """
+    correspondente = CorrespondenteProcessos([{'process': 'sleep'}])
+    inicios, fins = [], []
+    for _ in range(repeticoes):
+        fonte.configurar(correspondente, frozenset())
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(['sleep', str(duracao)])
+        fonte.aguardar()
+        inicios.append((time.perf_counter() - inicio) * 1000)
+
+        fonte.configurar(correspondente, frozenset([processo.pid]))
+        fonte.aguardar()
+        fins.append(max(0.0, (time.perf_counter() - inicio - duracao) * 1000))
+        processo.wait()
+    return inicios, fins
+
+
+def criar_sysfs_falso(raiz, politicas=4, firmware=False):
+    """
+    Monta uma árvore sysfs falsa: platform_profile do firmware ou a EPP de
+    `politicas` políticas do cpufreq.
+
+    Args:
+        raiz (str): Diretório (temporário) usado como raiz
+        politicas (int): Políticas do cpufreq (sem firmware)
+        firmware (bool): Cria platform_profile em vez da EPP
+    """
+    def escrever(caminho, conteudo):
+        caminho = os.path.join(raiz, caminho)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'w') as arquivo:
+            arquivo.write(conteudo + '\n')
+
+    if firmware:
+        escrever('sys/firmware/acpi/platform_profile', 'balanced')
+        escrever('sys/firmware/acpi/platform_profile_choices',
+                 'low-power balanced performance')
+        return
+    for indice in range(politicas):
+        politica = f'sys/devices/system/cpu/cpufreq/policy{indice}'
+        escrever(f'{politica}/energy_performance_preference', 'balance_performance')
+        escrever(f'{politica}/energy_performance_available_preferences',
+                 'default performance balance_performance balance_power power')
+
+
+def medir_troca_plano(backend, repeticoes=REPETICOES_TROCA_PLANO):
+    """
+    Alterna entre os planos fixos, conferindo com ler_ativo() quando o
+    backend sabe ler o plano ativo.
+
+    Returns:
+        dict: Resumo do backend (trocas, falhas e latência)
+    """
+    planos = list(PLANOS_ENERGIA_FIXOS)
+    for indice in range(repeticoes):
+        plano = planos[indice % len(planos)]
+        if backend.ativar(plano):
+            lido = backend.ler_ativo()
+            assert lido in (None, plano), f"{backend.nome}: ativou {plano}, leu {lido}"
+    return backend.resumo()
+
+
+def imprimir_troca_plano(descricao, resumo):
+    latencia = resumo['latencia']
+    print(f"{descricao:>28} | {latencia['p50_us']:>9.0f}µs | {latencia['p99_us']:>9.0f}µs | "
+          f"{resumo['trocas']:>6} | {resumo['falhas']:>6}")
+
+
+if __name__ == "__main__":
+    processos = gerar_tabela_processos()
+    monitores = gerar_monitores(processos)
+    trie = TrieProcessos(monitor['process'] for monitor in monitores)
+
+    # As duas abordagens precisam encontrar os mesmos processos
+    assert ciclo_anterior(monitores, processos) == ciclo_trie(trie, monitores, processos)
+
+    custo_anterior = medir_cpu(lambda: ciclo_anterior(monitores, processos), ciclos=1)
+    custo_trie = medir_cpu(lambda: ciclo_trie(trie, monitores, processos))
+
+    print(f"{len(processos)} processos × {len(monitores)} monitores")
+    print(f"{'abordagem':>22} | {'CPU por ciclo (ms)':>18}")
+    print(f"{'enumeração por monitor':>22} | {custo_anterior:>18.1f}")
+    print(f"{'varredura única + trie':>22} | {custo_trie:>18.1f}")
+
+    # Cache incremental (pid, create_time): só PIDs novos são consultados
+    custo_cache, contadores = medir_cache_incremental(
+        CorrespondenteProcessos(monitores), processos)
+    print(f"{'cache incremental':>22} | {custo_cache:>18.1f}   "
+          f"({contadores['acertos']} acertos, {contadores['novos']} novos, "
+          f"{contadores['encerrados']} encerrados por ciclo)")
+    print(f"\nganho: {custo_anterior / custo_trie:.0f}× (trie), "
+          f"{custo_anterior / custo_cache:.0f}× (cache incremental)")
+
+    # Regras compiladas: exe/cmdline só são lidos se alguma regra precisar
+    for descricao, lista in (("só prefixos", monitores),
+                             ("todas as regras", gerar_monitores_regras(processos))):
+        custo, casados, leituras = medir_regras(lista, processos)
+        print(f"primeira varredura ({descricao}): {custo:.1f} ms, "
+              f"{casados} casados, {leituras} leituras de exe/cmdline")
+
+    # Detecção de início/fim com processos reais (Linux)
+    if sys.platform.startswith("linux"):
+        fonte = criar_fonte_eventos()
+        fonte.iniciar()
+        time.sleep(0.1)
+        inicios, fins = medir_deteccao(fonte)
+        fonte.fechar()
+        print(f"\nfonte de eventos: {type(fonte).__name__}")
+        print(f"  início detectado em: {max(inicios):.1f} ms (pior de {len(inicios)})")
+        print(f"  fim detectado em:    {max(fins):.1f} ms (pior de {len(fins)})")
+
+    # Latência da troca de plano por backend (sysfs contra uma árvore falsa;
+    # no Windows a API nativa contra o powercfg, restaurando o plano original)
+    print(f"\n{'troca de plano':>28} | {'p50':>11} | {'p99':>11} | {'trocas':>6} | {'falhas':>6}")
+    for descricao, firmware in (("sysfs (EPP, 4 políticas)", False),
+                                ("sysfs (platform_profile)", True)):
+        with tempfile.TemporaryDirectory() as raiz:
+            criar_sysfs_falso(raiz, firmware=firmware)
+            imprimir_troca_plano(descricao, medir_troca_plano(BackendSysfs(raiz)))
+    if sys.platform == "win32":
+        nativo = criar_backend_energia(PLANOS_ENERGIA_FIXOS)
+        original = nativo.ler_ativo()
+        for backend in (nativo, BackendPowercfg(PLANOS_ENERGIA_FIXOS)):
+            imprimir_troca_plano(backend.nome, medir_troca_plano(backend, repeticoes=10))
+        if original in PLANOS_ENERGIA_FIXOS:
+            nativo.ativar(original)
@@ -0,0 +1,565 @@
+# benchmark_reproducao.py - Replay de traços de teclas no GerenciadorAtalhos (sem teclado real)
+
+# Alimenta ao_pressionar_tecla/ao_soltar_tecla diretamente com traços de
+# eventos gerados (digitação a 200 WPM, auto-repetição, rajadas de duplo-
+# pressionamento) ou gravados em arquivo. Listener, Controller, bandeja e o
+# executor de ações são substituídos por versões falsas, então roda headless
+# no Linux. Com --comparar funciona como teste de regressão do caminho do hook.
+#
+# Formato de um traço gravado (JSON): [[segundos, "press"|"release", "tecla"], ...]
+# onde "tecla" segue a gramática de teclas.py sem modificadores
+# (ex: "Key.home", "a", "vk:179").
+
+import argparse
+import enum
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+from benchmark_atalhos import LIMITE_CALLBACK_MS, gerar_sequencias
+from teclas import NOMES_TECLAS_ESPECIAIS
+
+# Palavras por minuto da digitação sintética (5 caracteres por palavra)
+PALAVRAS_POR_MINUTO = 200
+
+# Auto-repetição típica do sistema: atraso inicial e taxa (segundos)
+ATRASO_AUTORREPETICAO = 0.5
+INTERVALO_AUTORREPETICAO = 1 / 30
+
+# Eventos de tecla pressionada por cenário gerado
+EVENTOS_POR_CENARIO = 20_000
+
+# Sequências líderes sintéticas somadas aos atalhos padrão
+QUANTIDADE_SEQUENCIAS = 1_000
+
+# Variação aceita em relação à linha de base (--comparar); o p99 tem ainda
+# uma folga absoluta, já que na casa dos µs o ruído do sistema domina
+TOLERANCIA_PADRAO = 0.25
+FOLGA_P99_US = 2.0
+
+# Repetições de cada medição de tempo (usa a melhor, menos ruído)
+REPETICOES = 3
+
+# Memória retida por evento acima disso indica vazamento no hook (bytes)
+LIMITE_BYTES_RETIDOS = 1.0
+
+TEXTO_DIGITACAO = (
+    "O rato roeu a roupa do Rei de Roma. A rainha, com raiva, resolveu "
+    "remendar; enquanto isso Pedro pagou 15% de juros em 2024 pelo pedido. "
+)
+
+
+# --- Substitutos de pynput, pystray e PIL -----------------------------------
+
+class KeyCodeFalso:
+    """
+    Substituto de pynput.keyboard.KeyCode (caractere e/ou código virtual).
+    """
+
+    def __init__(self, vk=None, char=None):
+        self.vk = vk
+        self.char = char
+
+    @classmethod
+    def from_char(cls, char):
+        return cls(char=char)
+
+    @classmethod
+    def from_vk(cls, vk):
+        return cls(vk=vk)
+
+    def __eq__(self, outro):
+        return isinstance(outro, KeyCodeFalso) and (self.vk, self.char) == (outro.vk, outro.char)
+
+    def __hash__(self):
+        return hash((self.vk, self.char))
+
+    def __repr__(self):
+        return f"KeyCode(vk={self.vk}, char={self.char!r})"
+
+
+# Enum com os mesmos nomes do pynput.keyboard.Key
+KeyFalso = enum.Enum('Key', {
+    nome: KeyCodeFalso(vk=0x1000 + indice)
+    for indice, nome in enumerate(sorted(NOMES_TECLAS_ESPECIAIS))
+})
+
+
+class ListenerFalso:
+    """
+    Substituto do Listener: não instala hook; os eventos vêm do traço.
+    """
+
+    def __init__(self, on_press=None, on_release=None, **_opcoes):
+        self.on_press = on_press
+        self.on_release = on_release
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def canonical(self, tecla):
+        # Os traços já trazem a tecla sem o efeito dos modificadores
+        return tecla
+
+
+class ControllerFalso:
+    """
+    Substituto do Controller: apenas conta as teclas injetadas.
+    """
+
+    def __init__(self):
+        self.injetadas = 0
+
+    def press(self, tecla):
+        self.injetadas += 1
+
+    def release(self, tecla):
+        self.injetadas += 1
+
+
+def instalar_modulos_falsos():
+    """
+    Registra pynput, pystray e PIL falsos em sys.modules. Deve ser chamada
+    antes de importar main_atalhos.
+    """
+    pynput = types.ModuleType('pynput')
+    teclado = types.ModuleType('pynput.keyboard')
+    teclado.Key = KeyFalso
+    teclado.KeyCode = KeyCodeFalso
+    teclado.Listener = ListenerFalso
+    teclado.Controller = ControllerFalso
+    pynput.keyboard = teclado
+
+    pystray = types.ModuleType('pystray')
+    pystray.Icon = pystray.MenuItem = pystray.Menu = lambda *argumentos, **opcoes: None
+
+    pil = types.ModuleType('PIL')
+    imagem = types.ModuleType('PIL.Image')
+    imagem.open = lambda *argumentos, **opcoes: None
+    pil.Image = imagem
+
+    sys.modules.update({
+        'pynput': pynput, 'pynput.keyboard': teclado,
+        'pystray': pystray, 'PIL': pil, 'PIL.Image': imagem,
+    })
+
+
+class ExecutorFalso:
+    """
+    Substituto do lançador/executor: conta as ações sem executá-las, para
+    medir apenas o caminho do hook.
+    """
+
+    def __init__(self):
+        self.acoes = 0
+
+    def enfileirar(self, acao):
+        self.acoes += 1
+        return True
+
+
+class RelogioSimulado:
+    """
+    Relógio monotônico controlado pelo replay (tempo do traço).
+    """
+
+    def __init__(self):
+        self.tempo = 0.0
+
+    def __call__(self):
+        return self.tempo
+
+
+# --- Traços ------------------------------------------------------------------
+
+def tecla_do_texto(texto):
+    """
+    Converte uma tecla em texto ("Key.home", "a", "vk:179") no objeto falso.
+
+    Args:
+        texto (str): Tecla sem modificadores
+
+    Returns:
+        KeyFalso ou KeyCodeFalso
+    """
+    if texto.startswith('Key.'):
+        return KeyFalso[texto[4:]]
+    if texto[:3].lower() == 'vk:':
+        return KeyCodeFalso(vk=int(texto[3:], 0))
+    return KeyCodeFalso(char=texto)
+
+
+def _ordenar(eventos):
+    # Ordena por tempo preservando a ordem de press/release simultâneos
+    return [evento for _, evento in sorted(enumerate(eventos),
+                                           key=lambda par: (par[1][0], par[0]))]
+
+
+def gerar_traco_digitacao(eventos=EVENTOS_POR_CENARIO, ppm=PALAVRAS_POR_MINUTO, semente=42):
+    """
+    Digitação contínua de texto (maiúsculas com Shift) a ppm palavras/minuto.
+
+    Returns:
+        list: [(segundos, 'press' | 'release', tecla)]
+    """
+    gerador = random.Random(semente)
+    intervalo = 60 / (ppm * 5)
+    traco = []
+    tempo = 0.0
+    indice = 0
+    pressionadas = 0
+    while pressionadas < eventos:
+        caractere = TEXTO_DIGITACAO[indice % len(TEXTO_DIGITACAO)]
+        indice += 1
+        segurar = intervalo * gerador.uniform(0.4, 0.8)
+        if caractere.isupper() or caractere == '%':
+            shift = KeyFalso.shift_r if gerador.random() < 0.3 else KeyFalso.shift_l
+            traco.append((tempo - intervalo * 0.3, 'press', shift))
+            traco.append((tempo + segurar, 'release', shift))
+            pressionadas += 1
+        tecla = KeyFalso.space if caractere == ' ' else KeyCodeFalso(char=caractere)
+        traco.append((tempo, 'press', tecla))
+        traco.append((tempo + segurar * 0.9, 'release', tecla))
+        pressionadas += 1
+        tempo += intervalo * gerador.uniform(0.7, 1.3)
+    return _ordenar(traco)
+
+
+def gerar_traco_autorrepeticao(eventos=EVENTOS_POR_CENARIO):
+    """
+    Teclas mantidas pressionadas (auto-repetição do sistema), alternando uma
+    tecla sem atalho (seta) e uma tecla configurada para duplo-pressionamento.
+
+    Returns:
+        list: [(segundos, 'press' | 'release', tecla)]
+    """
+    traco = []
+    tempo = 0.0
+    repeticoes = 60
+    teclas = [KeyFalso.down, KeyFalso.home]
+    indice = 0
+    while len(traco) < eventos:
+        tecla = teclas[indice % len(teclas)]
+        indice += 1
+        traco.append((tempo, 'press', tecla))
+        tempo += ATRASO_AUTORREPETICAO
+        for _ in range(repeticoes - 1):
+            traco.append((tempo, 'press', tecla))
+            tempo += INTERVALO_AUTORREPETICAO
+        traco.append((tempo, 'release', tecla))
+        tempo += 0.3
+    return traco
+
+
+def gerar_traco_rajadas(eventos=EVENTOS_POR_CENARIO, semente=42):
+    """
+    Rajadas de duplo-pressionamento das teclas configuradas e combinações
+    com modificadores, separadas por pausas maiores que a janela.
+
+    Returns:
+        list: [(segundos, 'press' | 'release', tecla)]
+    """
+    gerador = random.Random(semente)
+    duplas = [KeyFalso.home, KeyFalso.menu, KeyFalso.num_lock]
+    traco = []
+    tempo = 0.0
+    pressionadas = 0
+    while pressionadas < eventos:
+        if gerador.random() < 0.25:
+            # Combinação Ctrl+Alt+X
+            for modificador in (KeyFalso.ctrl_l, KeyFalso.alt_l):
+                traco.append((tempo, 'press', modificador))
+                tempo += 0.02
+            traco.append((tempo, 'press', KeyCodeFalso(char='x')))
+            traco.append((tempo + 0.05, 'release', KeyCodeFalso(char='x')))
+            traco.append((tempo + 0.08, 'release', KeyFalso.alt_l))
+            traco.append((tempo + 0.09, 'release', KeyFalso.ctrl_l))
+            pressionadas += 3
+        else:
+            tecla = gerador.choice(duplas)
+            for _ in range(2):
+                traco.append((tempo, 'press', tecla))
+                traco.append((tempo + 0.04, 'release', tecla))
+                tempo += gerador.uniform(0.08, 0.2)
+            pressionadas += 2
+        tempo += gerador.uniform(0.6, 1.0)
+    return _ordenar(traco)
+
+
+def carregar_traco(caminho):
+    """
+    Carrega um traço gravado em JSON (ver formato no topo do arquivo).
+
+    Args:
+        caminho (str): Arquivo do traço
+
+    Returns:
+        list: [(segundos, 'press' | 'release', tecla)]
+    """
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        eventos = json.load(arquivo)
+    return [(float(tempo), tipo, tecla_do_texto(texto)) for tempo, tipo, texto in eventos]
+
+
+# --- Medição -----------------------------------------------------------------
+
+def criar_gerenciador(main_atalhos, configuracao):
+    """
+    Monta um GerenciadorAtalhos com backends falsos e relógio simulado.
+
+    Returns:
+        tuple: (gerenciador, relógio, executor, expirações pendentes)
+    """
+    from janela_ativa import BackendJanelaFalso, InfoJanela, RastreadorJanelaAtiva
+    from observador_config import ObservadorConfiguracao
+
+    # Caminho inexistente: o observador publica a configuração recebida
+    caminho = os.path.join(tempfile.mkdtemp(), 'config.json')
+    observador = ObservadorConfiguracao(caminho, configuracao)
+
+    rastreador = RastreadorJanelaAtiva(BackendJanelaFalso(
+        InfoJanela(titulo='Sem título - Bloco de Notas', processo='notepad.exe', pid=1)))
+    rastreador.iniciar()
+
+    executor = ExecutorFalso()
+    gerenciador = main_atalhos.GerenciadorAtalhos(observador, executor, rastreador)
+    gerenciador.iniciar_monitoramento()
+
+    relogio = RelogioSimulado()
+    gerenciador.relogio = relogio
+
+    # Disparos pendentes expiram pelo tempo do traço, sem threading.Timer
+    pendentes = []
+    gerenciador._agendar_expiracao = lambda automato, prazo: pendentes.append((prazo, automato))
+    return gerenciador, relogio, executor, pendentes
+
+
+def reproduzir(main_atalhos, contexto, traco, medir=None):
+    """
+    Reproduz um traço completo no gerenciador do contexto.
+
+    Args:
+        main_atalhos: Módulo main_atalhos (importado após os módulos falsos)
+        contexto (tuple): Retorno de criar_gerenciador
+        traco (list): [(segundos, 'press' | 'release', tecla)]
+        medir (callable): Envolve cada ao_pressionar_tecla (None = sem medição)
+
+    Returns:
+        int: Ações enfileiradas até o fim do replay
+    """
+    gerenciador, relogio, executor, pendentes = contexto
+    ao_pressionar = gerenciador.ao_pressionar_tecla
+    ao_soltar = gerenciador.ao_soltar_tecla
+
+    for tempo, tipo, tecla in traco:
+        relogio.tempo = tempo
+        if pendentes and min(prazo for prazo, _ in pendentes) <= tempo:
+            for prazo, automato in [item for item in pendentes if item[0] <= tempo]:
+                for comando in automato.expirar(prazo):
+                    executor.enfileirar(main_atalhos.AcaoComando(comando))
+            pendentes[:] = [item for item in pendentes if item[0] > tempo]
+
+        if tipo == 'release':
+            ao_soltar(tecla)
+        elif medir is None:
+            ao_pressionar(tecla)
+        else:
+            medir(ao_pressionar, tecla)
+    return executor.acoes
+
+
+def _percentil(ordenadas, fracao):
+    return ordenadas[min(len(ordenadas) - 1, int(fracao * len(ordenadas)))]
+
+
+def medir_cenario(main_atalhos, configuracao, traco):
+    """
+    Mede vazão, distribuição de latência e alocações por evento.
+
+    Cada medição usa um gerenciador novo, aquecido com uma passada do
+    próprio traço (caches de teclas, autômato, histogramas).
+
+    Returns:
+        dict: Resultados do cenário
+    """
+    pressionadas = sum(1 for _, tipo, _ in traco if tipo == 'press')
+
+    def preparar():
+        contexto = criar_gerenciador(main_atalhos, configuracao)
+        reproduzir(main_atalhos, contexto, traco)
+        contexto[2].acoes = 0
+        return contexto
+
+    # Vazão: sem cronômetro por evento
+    melhor_tempo = None
+    for _ in range(REPETICOES):
+        contexto = preparar()
+        inicio = time.perf_counter_ns()
+        acoes = reproduzir(main_atalhos, contexto, traco)
+        decorrido = time.perf_counter_ns() - inicio
+        melhor_tempo = decorrido if melhor_tempo is None else min(melhor_tempo, decorrido)
+    eventos_por_segundo = len(traco) / (melhor_tempo / 1e9)
+
+    # Distribuição de latência de cada ao_pressionar_tecla (repetição com
+    # menor p99)
+    relogio_ns = time.perf_counter_ns
+    duracoes = None
+    for _ in range(REPETICOES):
+        medidas = []
+
+        def cronometrar(funcao, tecla):
+            inicio = relogio_ns()
+            funcao(tecla)
+            medidas.append(relogio_ns() - inicio)
+
+        reproduzir(main_atalhos, preparar(), traco, cronometrar)
+        medidas.sort()
+        if duracoes is None or _percentil(medidas, 0.99) < _percentil(duracoes, 0.99):
+            duracoes = medidas
+
+    # Alocações (tracemalloc): pico transitório de cada evento e memória
+    # retida ao fim da passada (aquecida já com o rastreamento ligado, para
+    # não contar objetos antigos substituídos)
+    picos = [0]
+
+    def rastrear(funcao, tecla):
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        funcao(tecla)
+        picos[0] += tracemalloc.get_traced_memory()[1] - antes
+
+    tracemalloc.start()
+    try:
+        contexto = preparar()
+        reproduzir(main_atalhos, contexto, traco, rastrear)
+        picos[0] = 0
+        memoria_antes = tracemalloc.get_traced_memory()[0]
+        reproduzir(main_atalhos, contexto, traco, rastrear)
+        retido = tracemalloc.get_traced_memory()[0] - memoria_antes
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'eventos': len(traco),
+        'pressionadas': pressionadas,
+        'acoes': acoes,
+        'eventos_por_segundo': eventos_por_segundo,
+        'p50_us': _percentil(duracoes, 0.50) / 1000,
+        'p90_us': _percentil(duracoes, 0.90) / 1000,
+        'p99_us': _percentil(duracoes, 0.99) / 1000,
+        'p999_us': _percentil(duracoes, 0.999) / 1000,
+        'max_us': duracoes[-1] / 1000,
+        'bytes_pico_por_evento': picos[0] / pressionadas,
+        'bytes_retidos_por_evento': max(0, retido) / pressionadas,
+    }
+
+
+def comparar_com_base(resultados, base, tolerancia):
+    """
+    Compara os resultados com uma linha de base salva.
+
+    Returns:
+        list: Descrição das regressões encontradas
+    """
+    regressoes = []
+    for cenario, atual in resultados.items():
+        anterior = base.get(cenario)
+        if anterior is None:
+            continue
+        if atual['eventos_por_segundo'] < anterior['eventos_por_segundo'] * (1 - tolerancia):
+            regressoes.append(
+                f"{cenario}: vazão {atual['eventos_por_segundo']:.0f} eventos/s "
+                f"(base {anterior['eventos_por_segundo']:.0f})")
+        if atual['p99_us'] > anterior['p99_us'] * (1 + tolerancia) + FOLGA_P99_US:
+            regressoes.append(
+                f"{cenario}: p99 {atual['p99_us']:.1f}µs (base {anterior['p99_us']:.1f}µs)")
+        if atual['bytes_pico_por_evento'] > anterior['bytes_pico_por_evento'] * (1 + tolerancia) + 8:
+            regressoes.append(
+                f"{cenario}: {atual['bytes_pico_por_evento']:.0f} bytes/evento "
+                f"(base {anterior['bytes_pico_por_evento']:.0f})")
+    return regressoes
+
+
+def configuracao_replay(quantidade_sequencias=QUANTIDADE_SEQUENCIAS):
+    """
+    Atalhos padrão + combinação Ctrl+Alt+X + sequências líderes sintéticas.
+    """
+    from defaults import DEFAULT_CONFIG
+
+    configuracao = json.loads(json.dumps(DEFAULT_CONFIG))
+    configuracao['atalhos'].append(
+        {"tecla": "ctrl+alt+x", "pressionamentos": 1, "comando": "explorer.exe"})
+    configuracao['atalhos'].extend(gerar_sequencias(quantidade_sequencias))
+    return configuracao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay de traços de teclas no GerenciadorAtalhos")
+    parser.add_argument('--traco', action='append', default=[],
+                        help="Traço gravado em JSON (pode repetir)")
+    parser.add_argument('--eventos', type=int, default=EVENTOS_POR_CENARIO,
+                        help="Teclas pressionadas por cenário gerado")
+    parser.add_argument('--sequencias', type=int, default=QUANTIDADE_SEQUENCIAS,
+                        help="Sequências líderes sintéticas configuradas")
+    parser.add_argument('--salvar-base', help="Grava os resultados como linha de base")
+    parser.add_argument('--comparar', help="Linha de base para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO)
+    argumentos = parser.parse_args()
+
+    # Config do daemon isolada em diretório temporário
+    os.environ['APPDATA'] = tempfile.mkdtemp()
+    instalar_modulos_falsos()
+    import main_atalhos
+
+    cenarios = {
+        'digitacao_200ppm': gerar_traco_digitacao(argumentos.eventos),
+        'autorrepeticao': gerar_traco_autorrepeticao(argumentos.eventos),
+        'rajadas_duplas': gerar_traco_rajadas(argumentos.eventos),
+    }
+    for caminho in argumentos.traco:
+        cenarios[os.path.splitext(os.path.basename(caminho))[0]] = carregar_traco(caminho)
+
+    configuracao = configuracao_replay(argumentos.sequencias)
+    resultados = {}
+    print(f"{'cenário':>18} | {'eventos/s':>10} | {'p50':>7} | {'p99':>7} | "
+          f"{'p99.9':>7} | {'max':>8} | {'bytes/ev':>8} | {'retido':>6} | {'ações':>6}")
+    for nome, traco in cenarios.items():
+        resultado = medir_cenario(main_atalhos, configuracao, traco)
+        resultados[nome] = resultado
+        print(f"{nome:>18} | {resultado['eventos_por_segundo']:>10.0f} | "
+              f"{resultado['p50_us']:>5.1f}µs | {resultado['p99_us']:>5.1f}µs | "
+              f"{resultado['p999_us']:>5.1f}µs | {resultado['max_us']:>6.0f}µs | "
+              f"{resultado['bytes_pico_por_evento']:>8.0f} | "
+              f"{resultado['bytes_retidos_por_evento']:>6.2f} | {resultado['acoes']:>6}")
+
+    falhas = []
+    for nome, resultado in resultados.items():
+        if resultado['p99_us'] > LIMITE_CALLBACK_MS * 1000:
+            falhas.append(f"{nome}: p99 acima de {LIMITE_CALLBACK_MS} ms")
+        if resultado['bytes_retidos_por_evento'] > LIMITE_BYTES_RETIDOS:
+            falhas.append(f"{nome}: {resultado['bytes_retidos_por_evento']:.2f} "
+                          f"bytes retidos por evento (possível vazamento)")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, 'r', encoding='utf-8') as arquivo:
+            falhas += comparar_com_base(resultados, json.load(arquivo), argumentos.tolerancia)
+
+    if argumentos.salvar_base:
+        with open(argumentos.salvar_base, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"💾 Linha de base salva em {argumentos.salvar_base}")
+
+    if falhas:
+        for falha in falhas:
+            print(f"❌ {falha}")
+        sys.exit(1)
+    print("✅ Sem regressões no caminho do hook")
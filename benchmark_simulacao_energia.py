@@ -0,0 +1,452 @@
+# benchmark_simulacao_energia.py - GerenciadorEnergia contra uma tabela de processos simulada
+
+# Roda o GerenciadorEnergia e o GerenciadorPlanoEnergia reais contra um
+# provedor de processos falso (milhares de processos, centenas de monitores,
+# processos iniciando e terminando a cada ciclo) e um backend de energia
+# falso no lugar do powercfg. Mede a latência de cada ciclo (o mesmo
+# ciclo_medido do daemon), a memória retida por ciclo e as trocas de plano,
+# com e sem a histerese da troca (politica_troca.py) sobre um relógio
+# simulado que avança SEGUNDOS_POR_CICLO a cada ciclo.
+# Tudo é semeado, então duas execuções geram a mesma sequência de ciclos;
+# com --salvar-base/--comparar funciona como teste de regressão entre branches.
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import tracemalloc
+from collections import namedtuple
+
+import psutil
+
+from benchmark_energia import (NOMES_COMUNS, ProcessoFalso, gerar_monitores,
+                               gerar_monitores_regras)
+from backend_energia import BackendEnergia
+from benchmark_reproducao import _percentil, instalar_modulos_falsos
+from politica_troca import POLITICA_PADRAO, SEM_HISTERESE
+
+# Tamanho da tabela simulada e quantidade de monitores
+QUANTIDADE_PROCESSOS = 5_000
+QUANTIDADE_MONITORES = 500
+
+# Ciclos medidos por cenário (após o aquecimento)
+CICLOS_POR_CENARIO = 300
+
+# Ciclos de aquecimento: preenchem o histórico de ciclos (256) e os caches
+CICLOS_AQUECIMENTO = 300
+
+# Fração dos processos novos que recebe o nome de um monitor
+FRACAO_MONITORADOS = 0.05
+
+# Cenário de alternância de planos: poucos monitores e alvos raros, para que
+# o plano necessário mude conforme os processos iniciam e terminam
+MONITORES_ALTERNANCIA = 12
+FRACAO_ALTERNANCIA = 0.0005
+
+# Cenário de auxiliares de vida curta (atualizadores, relatórios de falha):
+# chance por ciclo de um auxiliar iniciar, vivendo só até o ciclo seguinte
+AUXILIARES = ["updater.exe", "crashreporter.exe", "helper.exe"]
+PROBABILIDADE_AUXILIAR = 0.3
+
+# Tempo simulado entre ciclos (relógio da histerese)
+SEGUNDOS_POR_CICLO = 1.0
+
+# Repetições da medição de latência (usa a de menor p99)
+REPETICOES = 3
+
+# Variação aceita em relação à linha de base (--comparar) e folga absoluta
+# do p99, dominado por ruído abaixo de 1 ms
+TOLERANCIA_PADRAO = 0.25
+FOLGA_P99_MS = 0.5
+
+# Memória retida por ciclo acima disso indica vazamento (bytes)
+LIMITE_BYTES_RETIDOS = 64
+
+PLANOS = ["Alto desempenho", "Equilibrado", "Economia de energia"]
+
+# Um cenário: monitores configurados, nomes dos quais foram gerados, fração
+# dos processos com esses nomes, processos trocados por ciclo e nomes dos
+# auxiliares de vida curta
+Cenario = namedtuple('Cenario', ['monitores', 'nomes_alvo', 'fracao_alvo', 'trocados',
+                                 'auxiliares'], defaults=((),))
+
+
+class ProcessoSimulado(ProcessoFalso):
+    """
+    ProcessoFalso com nice() (leitura sem argumento, como no psutil).
+    """
+
+    prioridade = 0
+
+    def nice(self, prioridade=None):
+        if prioridade is None:
+            return self.prioridade
+        self.prioridade = prioridade
+
+
+class TabelaSimulada:
+    """
+    Provedor de processos falso: pids() e Process(pid) sobre um dicionário,
+    com rotatividade semeada a cada ciclo.
+    """
+
+    def __init__(self, quantidade, nomes_alvo, fracao_alvo=FRACAO_MONITORADOS, semente=42,
+                 auxiliares=()):
+        """
+        Args:
+            quantidade (int): Processos na tabela
+            nomes_alvo (iterable): Nomes dos quais os monitores foram gerados
+            fracao_alvo (float): Fração dos processos com um desses nomes
+            semente (int): Semente da rotatividade
+            auxiliares (iterable): Nomes de processos que vivem um ciclo só
+        """
+        self.gerador = random.Random(semente)
+        self.nomes_alvo = list(nomes_alvo)
+        self.fracao_alvo = fracao_alvo
+        self.auxiliares = list(auxiliares)
+        self.auxiliares_vivos = []
+        self.processos = {}
+        self.proximo_pid = 4
+        for _ in range(quantidade):
+            self._iniciar()
+
+    def _nome(self):
+        sorteio = self.gerador.random()
+        if sorteio < self.fracao_alvo:
+            return self.gerador.choice(self.nomes_alvo)
+        if sorteio < 0.4:
+            return self.gerador.choice(NOMES_COMUNS)
+        tamanho = self.gerador.randint(4, 14)
+        return ''.join(self.gerador.choices(string.ascii_letters, k=tamanho)) + '.exe'
+
+    def _iniciar(self, nome=None):
+        pid = self.proximo_pid
+        self.proximo_pid += 1
+        self.processos[pid] = ProcessoSimulado(pid, nome or self._nome(), criacao=float(pid))
+        return pid
+
+    def trocar(self, quantidade):
+        """
+        Encerra `quantidade` processos aleatórios e inicia outros tantos
+        (e, com auxiliares, encerra os do ciclo anterior e talvez inicie um).
+        """
+        for pid in self.auxiliares_vivos:
+            self.processos.pop(pid, None)
+        self.auxiliares_vivos.clear()
+        if self.auxiliares and self.gerador.random() < PROBABILIDADE_AUXILIAR:
+            self.auxiliares_vivos.append(self._iniciar(self.gerador.choice(self.auxiliares)))
+
+        for pid in self.gerador.sample(list(self.processos), quantidade):
+            del self.processos[pid]
+        for _ in range(quantidade):
+            self._iniciar()
+
+    def listar_pids(self):
+        return self.processos.keys()
+
+    def abrir_processo(self, pid):
+        try:
+            return self.processos[pid]
+        except KeyError:
+            raise psutil.NoSuchProcess(pid) from None
+
+
+class BackendEnergiaFalso(BackendEnergia):
+    """
+    Backend de energia falso: registra os planos aplicados.
+    """
+
+    nome = 'falso'
+
+    def __init__(self):
+        super().__init__()
+        self.aplicados = []
+
+    def _ativar(self, nome_plano):
+        self.aplicados.append(nome_plano)
+        return True
+
+    def ler_ativo(self):
+        return self.aplicados[-1] if self.aplicados else None
+
+
+class RelogioSimulado:
+    """
+    Relógio monotônico avançado manualmente (um passo por ciclo).
+    """
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, segundos):
+        self.agora += segundos
+
+
+class ObservadorFixo:
+    """
+    Observador de configuração que publica sempre o mesmo instantâneo.
+    """
+
+    def __init__(self, instantaneo):
+        self.instantaneo = instantaneo
+
+    def inscrever(self, callback):
+        pass
+
+
+def criar_gerenciador(main_atalhos, cenario, quantidade_processos, semente,
+                      politica=POLITICA_PADRAO):
+    """
+    Monta um GerenciadorEnergia real sobre a tabela simulada, com backend de
+    energia falso, fonte de eventos por polling (nunca aguardada),
+    agendador sem leituras de CPU/bateria do sistema e relógio simulado no
+    gerenciador de planos.
+
+    Args:
+        main_atalhos: Módulo main_atalhos (importado após os módulos falsos)
+        cenario (Cenario): Monitores, nomes alvo e rotatividade
+        quantidade_processos (int): Processos na tabela simulada
+        semente (int): Semente da tabela simulada
+        politica (PoliticaTroca): Histerese da troca de plano (publicada
+            como "troca_plano" no instantâneo)
+
+    Returns:
+        tuple: (gerenciador, tabela simulada, backend de energia, relógio)
+    """
+    from eventos_processos import FontePolling
+    from observador_config import InstantaneoConfiguracao, congelar
+
+    instantaneo = InstantaneoConfiguracao(
+        versao=1, enable_calc_percent=True, atalhos=(),
+        monitores=congelar(cenario.monitores),
+        dados=congelar({'troca_plano': politica._asdict()}))
+    tabela = TabelaSimulada(quantidade_processos, cenario.nomes_alvo,
+                            cenario.fracao_alvo, semente, cenario.auxiliares)
+    backend = BackendEnergiaFalso()
+    relogio = RelogioSimulado()
+
+    plano = main_atalhos.GerenciadorPlanoEnergia(backend, relogio, politica)
+    gerenciador = main_atalhos.GerenciadorEnergia(
+        ObservadorFixo(instantaneo), fonte_eventos=FontePolling(),
+        gerenciador_plano=plano, listar_pids=tabela.listar_pids,
+        abrir_processo=tabela.abrir_processo)
+    gerenciador.agendador.ler_cpu = lambda: 50.0
+    gerenciador.agendador.ler_bateria = lambda: False
+    return gerenciador, tabela, backend, relogio
+
+
+def executar_ciclos(contexto, ciclos, trocados):
+    """
+    Roda `ciclos` ciclos trocando `trocados` processos antes de cada um.
+
+    Returns:
+        list: Registros dos ciclos (ver HistoricoCiclos)
+    """
+    gerenciador, tabela, _, relogio = contexto
+    registros = []
+    for _ in range(ciclos):
+        relogio.avancar(SEGUNDOS_POR_CICLO)
+        tabela.trocar(trocados)
+        registros.append(gerenciador.ciclo_medido())
+    return registros
+
+
+def contar_trocas_plano(main_atalhos, cenario, processos, ciclos, politica, semente=42):
+    """
+    Conta as trocas de plano nos ciclos medidos (após o aquecimento) com a
+    política de histerese dada.
+
+    Returns:
+        int: Planos aplicados pelo backend falso
+    """
+    contexto = criar_gerenciador(main_atalhos, cenario, processos, semente, politica)
+    executar_ciclos(contexto, CICLOS_AQUECIMENTO, cenario.trocados)
+    aplicados_antes = len(contexto[2].aplicados)
+    executar_ciclos(contexto, ciclos, cenario.trocados)
+    return len(contexto[2].aplicados) - aplicados_antes
+
+
+def medir_cenario(main_atalhos, cenario, processos, ciclos, semente=42):
+    """
+    Mede latência por ciclo, memória retida e trocas de plano (com a
+    histerese padrão e, para comparação, sem histerese).
+
+    Returns:
+        dict: Resultados do cenário
+    """
+    trocados = cenario.trocados
+
+    # A saída do daemon (um print por início/fim) não entra na medição nem
+    # na memória retida
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        duracoes = None
+        for _ in range(REPETICOES):
+            contexto = criar_gerenciador(main_atalhos, cenario, processos, semente)
+            executar_ciclos(contexto, CICLOS_AQUECIMENTO, trocados)
+            aplicados_antes = len(contexto[2].aplicados)
+            registros = executar_ciclos(contexto, ciclos, trocados)
+            medidas = sorted(registro['parede_ms'] for registro in registros)
+            if duracoes is None or _percentil(medidas, 0.99) < _percentil(duracoes, 0.99):
+                duracoes = medidas
+                melhores = registros
+                trocas_plano = len(contexto[2].aplicados) - aplicados_antes
+
+        # Memória retida: aquecido já com o rastreamento ligado, para não
+        # contar objetos antigos substituídos. Conjuntos e dicionários
+        # crescem em degraus conforme os PIDs mudam (e não encolhem), então
+        # vale a menor de duas janelas seguidas: um vazamento cresce nas duas
+        tracemalloc.start()
+        try:
+            contexto = criar_gerenciador(main_atalhos, cenario, processos, semente)
+            executar_ciclos(contexto, CICLOS_AQUECIMENTO, trocados)
+            janelas = []
+            for _ in range(2):
+                memoria_antes = tracemalloc.get_traced_memory()[0]
+                executar_ciclos(contexto, ciclos, trocados)
+                janelas.append(tracemalloc.get_traced_memory()[0] - memoria_antes)
+            retido = min(janelas)
+        finally:
+            tracemalloc.stop()
+
+        trocas_sem_histerese = contar_trocas_plano(
+            main_atalhos, cenario, processos, ciclos, SEM_HISTERESE, semente)
+
+    def somar(contador):
+        return sum(registro['contadores'].get(contador, 0) for registro in melhores)
+
+    etapas = {}
+    for registro in melhores:
+        etapas[registro['etapa_mais_longa']] = etapas.get(registro['etapa_mais_longa'], 0) + 1
+
+    return {
+        'ciclos': ciclos,
+        'p50_ms': _percentil(duracoes, 0.50),
+        'p99_ms': _percentil(duracoes, 0.99),
+        'max_ms': duracoes[-1],
+        'cpu_ms_por_ciclo': sum(registro['cpu_ms'] for registro in melhores) / ciclos,
+        'chamadas_psutil_por_ciclo': somar('chamadas_psutil') / ciclos,
+        'trocas_plano': trocas_plano,
+        'trocas_plano_sem_histerese': trocas_sem_histerese,
+        'ajustes_prioridade': somar('ajustes_prioridade'),
+        'estourados': sum(registro['estourou'] for registro in melhores),
+        'etapa_mais_longa': max(etapas, key=etapas.get),
+        'bytes_retidos_por_ciclo': max(0, retido) / ciclos,
+    }
+
+
+def comparar_com_base(resultados, base, tolerancia):
+    """
+    Compara os resultados com uma linha de base salva.
+
+    Returns:
+        list: Descrição das regressões encontradas
+    """
+    regressoes = []
+    for cenario, atual in resultados.items():
+        anterior = base.get(cenario)
+        if anterior is None:
+            continue
+        if atual['p99_ms'] > anterior['p99_ms'] * (1 + tolerancia) + FOLGA_P99_MS:
+            regressoes.append(
+                f"{cenario}: p99 {atual['p99_ms']:.2f}ms (base {anterior['p99_ms']:.2f}ms)")
+        if atual['chamadas_psutil_por_ciclo'] > anterior['chamadas_psutil_por_ciclo'] * (1 + tolerancia):
+            regressoes.append(
+                f"{cenario}: {atual['chamadas_psutil_por_ciclo']:.0f} chamadas psutil/ciclo "
+                f"(base {anterior['chamadas_psutil_por_ciclo']:.0f})")
+        if atual['trocas_plano'] > anterior['trocas_plano']:
+            regressoes.append(
+                f"{cenario}: {atual['trocas_plano']} trocas de plano "
+                f"(base {anterior['trocas_plano']})")
+    return regressoes
+
+
+def variar_planos(monitores):
+    """
+    Distribui os planos entre os monitores para que o plano necessário
+    mude conforme os processos iniciam e terminam.
+    """
+    for indice, monitor in enumerate(monitores):
+        monitor['power_on'] = PLANOS[indice % len(PLANOS)]
+    return monitores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="GerenciadorEnergia contra uma tabela de processos simulada")
+    parser.add_argument('--processos', type=int, default=QUANTIDADE_PROCESSOS)
+    parser.add_argument('--monitores', type=int, default=QUANTIDADE_MONITORES)
+    parser.add_argument('--ciclos', type=int, default=CICLOS_POR_CENARIO)
+    parser.add_argument('--salvar-base', help="Grava os resultados como linha de base")
+    parser.add_argument('--comparar', help="Linha de base para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO)
+    argumentos = parser.parse_args()
+
+    # Config do daemon isolada em diretório temporário
+    os.environ['APPDATA'] = tempfile.mkdtemp()
+    instalar_modulos_falsos()
+    import main_atalhos
+
+    # Base de nomes para os monitores (mesma semente em todas as execuções)
+    nomes_alvo = [*NOMES_COMUNS, *(f"app{indice}.exe" for indice in range(200))]
+    amostra = [ProcessoFalso(pid, nome) for pid, nome in enumerate(nomes_alvo)]
+    monitores_prefixo = variar_planos(gerar_monitores(amostra, argumentos.monitores))
+    monitores_regras = variar_planos(gerar_monitores_regras(amostra, argumentos.monitores))
+    jogos = [f"jogo{indice}.exe" for indice in range(MONITORES_ALTERNANCIA)]
+    monitores_jogos = variar_planos([
+        {"process": nome, "priority": "Alta", "power_off": "Equilibrado"} for nome in jogos])
+    monitores_auxiliares = [
+        {"process": nome, "priority": "Normal", "power_on": "Alto desempenho",
+         "power_off": "Equilibrado"} for nome in AUXILIARES]
+
+    cenarios = {
+        'estavel': Cenario(monitores_prefixo, nomes_alvo, FRACAO_MONITORADOS, 20),
+        'rotatividade_alta': Cenario(monitores_prefixo, nomes_alvo, FRACAO_MONITORADOS, 250),
+        'regras_mistas': Cenario(monitores_regras, nomes_alvo, FRACAO_MONITORADOS, 250),
+        'alternancia_planos': Cenario(monitores_jogos, jogos, FRACAO_ALTERNANCIA, 100),
+        'auxiliares_curtos': Cenario(monitores_auxiliares, AUXILIARES, 0.0, 100, AUXILIARES),
+    }
+
+    resultados = {}
+    print(f"{argumentos.processos} processos × {argumentos.monitores} monitores, "
+          f"{argumentos.ciclos} ciclos por cenário")
+    print(f"{'cenário':>18} | {'troca/ciclo':>11} | {'p50':>8} | {'p99':>8} | {'max':>8} | "
+          f"{'CPU/ciclo':>9} | {'psutil':>6} | {'planos':>6} | {'sem hist.':>9} | "
+          f"{'retido/ciclo':>12}")
+    for nome, cenario in cenarios.items():
+        resultado = medir_cenario(main_atalhos, cenario, argumentos.processos, argumentos.ciclos)
+        resultados[nome] = resultado
+        print(f"{nome:>18} | {cenario.trocados:>11} | {resultado['p50_ms']:>6.2f}ms | "
+              f"{resultado['p99_ms']:>6.2f}ms | {resultado['max_ms']:>6.2f}ms | "
+              f"{resultado['cpu_ms_por_ciclo']:>7.2f}ms | "
+              f"{resultado['chamadas_psutil_por_ciclo']:>6.0f} | "
+              f"{resultado['trocas_plano']:>6} | "
+              f"{resultado['trocas_plano_sem_histerese']:>9} | "
+              f"{resultado['bytes_retidos_por_ciclo']:>10.0f} B")
+
+    falhas = []
+    for nome, resultado in resultados.items():
+        if resultado['bytes_retidos_por_ciclo'] > LIMITE_BYTES_RETIDOS:
+            falhas.append(f"{nome}: {resultado['bytes_retidos_por_ciclo']:.0f} "
+                          f"bytes retidos por ciclo (possível vazamento)")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, 'r', encoding='utf-8') as arquivo:
+            falhas += comparar_com_base(resultados, json.load(arquivo), argumentos.tolerancia)
+
+    if argumentos.salvar_base:
+        with open(argumentos.salvar_base, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"💾 Linha de base salva em {argumentos.salvar_base}")
+
+    if falhas:
+        for falha in falhas:
+            print(f"❌ {falha}")
+        sys.exit(1)
+    print("✅ Sem regressões no ciclo de monitoramento")
@@ -0,0 +1,147 @@
+# catalogo_planos.py - Planos de energia disponíveis no sistema e ranking do usuário
+
+# O daemon enumera os planos pelo backend (BackendEnergia.enumerar) na
+# inicialização e de novo quando o sistema notifica uma troca de plano ou
+# aparece um plano desconhecido (criado ou importado depois). A lista, com
+# os identificadores, é gravada em planos.json no diretório de configuração;
+# o configurador usa o mesmo arquivo para as opções de plano, então planos
+# personalizados e o "Desempenho máximo" podem ser escolhidos nos monitores.
+#
+# Com vários monitores ativos vale o plano mais bem colocado no ranking:
+#
+#   "ranking_planos": ["Desempenho máximo", "Alto desempenho", ...]
+#
+# no config.json, do mais prioritário para o menos. Planos básicos fora da
+# lista seguem a ordem de RANKING_PADRAO depois dela; os demais ficam abaixo
+# de todos os ranqueados.
+
+import json
+
+from backend_energia import PLANOS_ENERGIA_FIXOS, criar_backend_energia
+from observador_config import salvar_configuracao_atomica
+
+# Arquivo do catálogo, no mesmo diretório do config.json
+NOME_ARQUIVO_CATALOGO = 'planos.json'
+
+# Ranking usado quando o config.json não define "ranking_planos"
+RANKING_PADRAO = ("Alto desempenho", "Equilibrado", "Economia de energia")
+
+
+def ler_ranking_planos(dados):
+    """
+    Lê o ranking opcional "ranking_planos" do config.json.
+
+    Args:
+        dados (Mapping): Configuração (instantaneo.dados ou o dict do
+            configurador)
+
+    Returns:
+        tuple: Nomes dos planos, do mais prioritário para o menos (os
+            planos de RANKING_PADRAO ausentes completam o final)
+    """
+    ranking = dados.get('ranking_planos') if dados else None
+    if not isinstance(ranking, (list, tuple)):
+        return RANKING_PADRAO
+    nomes = [nome for nome in ranking if isinstance(nome, str)]
+    return tuple(dict.fromkeys([*nomes, *RANKING_PADRAO]))
+
+
+def prioridades_por_ranking(ranking):
+    """
+    Returns:
+        dict: {nome do plano: prioridade} (maior vence; planos fora do
+            ranking valem 0)
+    """
+    return {nome: len(ranking) - indice for indice, nome in enumerate(ranking)}
+
+
+def ordenar_por_ranking(nomes, ranking):
+    """
+    Ordena nomes de planos pelo ranking (os de fora mantêm a ordem do
+    sistema, no final).
+    """
+    posicoes = {nome: indice for indice, nome in enumerate(ranking)}
+    return sorted(nomes, key=lambda nome: posicoes.get(nome, len(posicoes)))
+
+
+def carregar_catalogo(arquivo):
+    """
+    Lê o catálogo gravado pelo daemon.
+
+    Returns:
+        dict: {nome do plano: identificador}, ou None se ausente ou inválido
+    """
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as conteudo:
+            dados = json.load(conteudo)
+    except (OSError, ValueError):
+        return None
+    planos = dados.get('planos') if isinstance(dados, dict) else None
+    if not isinstance(planos, dict) or not planos:
+        return None
+    return {str(nome): str(identificador) for nome, identificador in planos.items()}
+
+
+def planos_disponiveis(arquivo):
+    """
+    Nomes dos planos para o configurador: o catálogo do daemon ou, sem ele,
+    uma enumeração pelo backend (gravada no mesmo arquivo). Sem nenhum
+    mecanismo, os 3 planos básicos.
+
+    Returns:
+        list: Nomes dos planos na ordem do sistema
+    """
+    planos = carregar_catalogo(arquivo)
+    if planos is None:
+        catalogo = CatalogoPlanos(criar_backend_energia(PLANOS_ENERGIA_FIXOS), arquivo)
+        catalogo.atualizar()
+        planos = catalogo.planos
+    return list(planos or PLANOS_ENERGIA_FIXOS)
+
+
+class CatalogoPlanos:
+    """
+    Última enumeração dos planos de um backend, espelhada em planos.json.
+    """
+
+    def __init__(self, backend, arquivo=None):
+        """
+        Args:
+            backend (BackendEnergia): Backend que enumera os planos
+            arquivo (str): planos.json compartilhado com o configurador
+                (None: apenas em memória)
+        """
+        self.backend = backend
+        self.arquivo = arquivo
+        self.planos = {}
+        self.enumeracoes = 0
+
+    def atualizar(self):
+        """
+        Enumera os planos de novo. Falhas mantêm a lista anterior.
+
+        Returns:
+            bool: True se a lista mudou
+        """
+        try:
+            planos = self.backend.enumerar()
+        except OSError as erro:
+            print(f"⚠️ Não foi possível enumerar os planos de energia "
+                  f"({self.backend.nome}): {erro}")
+            return False
+        self.enumeracoes += 1
+        if not planos or planos == self.planos:
+            return False
+
+        self.planos = planos
+        print(f"📋 Planos de energia disponíveis ({self.backend.nome}):")
+        for nome, identificador in planos.items():
+            print(f"  {nome} → {identificador}")
+
+        if self.arquivo:
+            try:
+                salvar_configuracao_atomica(
+                    self.arquivo, {'backend': self.backend.nome, 'planos': planos})
+            except OSError as erro:
+                print(f"⚠️ Não foi possível gravar {self.arquivo}: {erro}")
+        return True
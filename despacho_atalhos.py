@@ -0,0 +1,421 @@
+# despacho_atalhos.py - Autômato de despacho dos atalhos de teclado
+
+# Compila os atalhos uma vez por carregamento de configuração em um trie com
+# links de falha (Aho-Corasick). Cada evento do hook avança o estado com uma
+# consulta em dicionário, independente da quantidade de atalhos/sequências.
+#
+# Formas aceitas em cada atalho do config.json:
+#   {"tecla": "Key.home", "comando": ...}                      duplo-pressionamento
+#   {"tecla": "Key.home", "pressionamentos": 3, ...}           triplo-pressionamento
+#   {"tecla": "ctrl+alt+x", "pressionamentos": 1, ...}         combinação (chord)
+#   {"sequencia": ["Key.home", "Key.home", "c"], ...}          sequência líder
+#   "janela": segundos máximos entre as teclas (padrão TEMPO_DUPLO_CLIQUE)
+#   "processo": "chrome.exe" ou lista       restringe ao processo em primeiro plano
+#   "classe_janela": "Notepad" ou lista      restringe à classe da janela em foco
+#
+# Atalhos com escopo têm precedência sobre atalhos globais com as mesmas
+# teclas; os demais atalhos globais continuam valendo em todos os aplicativos.
+# Se o processo e a classe da janela têm atalhos próprios, vale o do processo.
+
+import threading
+
+from teclas import ErroEspecificacaoTecla, identidade_tecla, interpretar_tecla
+
+SEM_MODIFICADORES = frozenset()
+
+# Janela padrão entre pressionamentos (segundos)
+TEMPO_DUPLO_CLIQUE = 0.5
+
+# Pressionamentos padrão quando o atalho define só "tecla"
+PRESSIONAMENTOS_PADRAO = 2
+
+RAIZ = 0
+
+
+def chave_evento(tecla, modificadores=SEM_MODIFICADORES):
+    """
+    Monta a chave de busca para uma tecla pressionada.
+
+    Caracteres digitados apenas com Shift já chegam como o caractere
+    resultante, então o Shift não entra na chave nesse caso.
+
+    Args:
+        tecla: Objeto Key ou KeyCode recebido pelo Listener
+        modificadores (frozenset): Modificadores pressionados no momento
+
+    Returns:
+        tuple: (modificadores, identidade da tecla)
+    """
+    identidade = identidade_tecla(tecla)
+    if identidade[0] == 'char':
+        if modificadores and modificadores != {'shift'}:
+            return (modificadores, ('char', identidade[1].lower()))
+        return (SEM_MODIFICADORES, identidade)
+    return (modificadores, identidade)
+
+
+def descrever_teclas_atalho(atalho):
+    """
+    Representação legível das teclas de um atalho (para listas e mensagens).
+
+    Args:
+        atalho (dict): Atalho do config.json
+
+    Returns:
+        str: Ex: "Key.home", "Key.home ×3", "Key.home, Key.home, c"
+    """
+    if atalho.get('sequencia'):
+        return ', '.join(atalho['sequencia'])
+    pressionamentos = atalho.get('pressionamentos', PRESSIONAMENTOS_PADRAO)
+    if pressionamentos == PRESSIONAMENTOS_PADRAO:
+        return atalho['tecla']
+    return f"{atalho['tecla']} ×{pressionamentos}"
+
+
+def sequencia_do_atalho(atalho):
+    """
+    Converte um atalho da configuração na sequência de chaves do autômato.
+
+    Args:
+        atalho (dict): Atalho do config.json
+
+    Returns:
+        tuple: (lista de chaves, janela em segundos)
+
+    Raises:
+        ErroEspecificacaoTecla: Se alguma tecla ou parâmetro for inválido
+    """
+    janela = atalho.get('janela', TEMPO_DUPLO_CLIQUE)
+    if (isinstance(janela, bool) or not isinstance(janela, (int, float))
+            or janela <= 0):
+        raise ErroEspecificacaoTecla(f"Janela inválida: {janela!r}")
+
+    if atalho.get('sequencia'):
+        textos = atalho['sequencia']
+        if not isinstance(textos, (list, tuple)):
+            raise ErroEspecificacaoTecla("'sequencia' deve ser uma lista de teclas")
+    else:
+        pressionamentos = atalho.get('pressionamentos', PRESSIONAMENTOS_PADRAO)
+        if (isinstance(pressionamentos, bool) or not isinstance(pressionamentos, int)
+                or pressionamentos < 1):
+            raise ErroEspecificacaoTecla(
+                f"Pressionamentos inválido: {pressionamentos!r}")
+        textos = [atalho.get('tecla')] * pressionamentos
+
+    chaves = [tuple(interpretar_tecla(texto)) for texto in textos]
+    return chaves, float(janela)
+
+
+def escopos_do_atalho(atalho):
+    """
+    Lista os escopos (processo / classe de janela) de um atalho.
+
+    Nomes de processo valem com e sem '.exe', para que o mesmo config.json
+    funcione no Windows ('chrome.exe') e no Linux ('chrome').
+
+    Args:
+        atalho (dict): Atalho do config.json
+
+    Returns:
+        list: [('processo', nome) | ('classe', nome)] em minúsculas; vazia
+        para atalhos globais
+    """
+    escopos = []
+    for campo, tipo in (('processo', 'processo'), ('classe_janela', 'classe')):
+        valores = atalho.get(campo) or ()
+        if isinstance(valores, str):
+            valores = (valores,)
+        for valor in valores:
+            nome = valor.strip().lower()
+            escopos.append((tipo, nome))
+            if tipo == 'processo':
+                alternativo = nome[:-4] if nome.endswith('.exe') else nome + '.exe'
+                escopos.append((tipo, alternativo))
+    return escopos
+
+
+class AutomatoAtalhos:
+    """
+    Trie de sequências de teclas com links de falha e janelas de tempo.
+
+    Estado de cada nó:
+    - transicoes[nó]: {chave: (filho, janela máxima desde a tecla anterior)}
+    - falha[nó]: maior sufixo próprio que também é prefixo de alguma sequência
+    - saida[nó]: (comando, janela, tamanho) de cada atalho que termina no
+      nó (ou None); o comando só dispara se nenhum intervalo entre as suas
+      teclas passou da janela do próprio atalho, mesmo que o prefixo seja
+      compartilhado com atalhos de janela maior
+
+    Quando um nó tem saída e também continuações (ex: duplo e triplo na
+    mesma tecla), o disparo fica pendente até a janela expirar ou chegar
+    uma tecla que não continue a sequência, mesmo que a sequência mais
+    longa já tenha passado por nós intermediários sem saída.
+    """
+
+    def __init__(self, atalhos=()):
+        self.trava = threading.Lock()
+        self.erros = []
+        self.compilar(atalhos)
+
+    def compilar(self, atalhos):
+        """
+        Recompila o autômato a partir da lista de atalhos da configuração.
+
+        Atalhos inválidos são ignorados e descritos em self.erros, para que
+        sejam reportados uma única vez no carregamento.
+
+        Args:
+            atalhos (list): Lista de atalhos do config.json
+
+        Returns:
+            list: Mensagens de erro dos atalhos ignorados
+        """
+        transicoes = [{}]
+        saidas = [[]]
+        erros = []
+
+        for atalho in atalhos:
+            try:
+                chaves, janela = sequencia_do_atalho(atalho)
+            except ErroEspecificacaoTecla as erro:
+                erros.append(f"{erro} (comando: {atalho.get('comando')})")
+                continue
+
+            no = RAIZ
+            for chave in chaves:
+                filho, janela_atual = transicoes[no].get(chave, (None, 0.0))
+                if filho is None:
+                    filho = len(transicoes)
+                    transicoes.append({})
+                    saidas.append([])
+                transicoes[no][chave] = (filho, max(janela, janela_atual))
+                no = filho
+            saidas[no].append((atalho['comando'], janela, len(chaves)))
+
+        # Links de falha em largura (Aho-Corasick); a saída de um nó sem
+        # comandos próprios herda a do maior sufixo que seja um atalho
+        falha = [RAIZ] * len(transicoes)
+        saida = [tuple(comandos) or None for comandos in saidas]
+        fila = [filho for filho, _ in transicoes[RAIZ].values()]
+        for no in fila:
+            for chave, (filho, _) in transicoes[no].items():
+                candidato = falha[no]
+                while candidato != RAIZ and chave not in transicoes[candidato]:
+                    candidato = falha[candidato]
+                destino = transicoes[candidato].get(chave, (RAIZ, 0))[0]
+                falha[filho] = destino if destino != filho else RAIZ
+                if saida[filho] is None:
+                    saida[filho] = saida[falha[filho]]
+                fila.append(filho)
+
+        # Maior janela de continuação a partir de cada nó
+        janela_no = [
+            max((janela for _, janela in saindo.values()), default=0.0)
+            for saindo in transicoes
+        ]
+
+        with self.trava:
+            self.transicoes = transicoes
+            self.falha = falha
+            self.saida = saida
+            self.janela_no = janela_no
+            self.tamanho_maximo = max(
+                (tamanho for saindo in saida if saindo for _, _, tamanho in saindo), default=1)
+            # Caminho rápido: (todos os comandos, menor janela, maior tamanho)
+            self.resumo_saida = [
+                (tuple(comando for comando, _, _ in saindo),
+                 min(janela for _, janela, _ in saindo),
+                 max(tamanho for _, _, tamanho in saindo)) if saindo else None
+                for saindo in saida
+            ]
+            self.estado = RAIZ
+            self.ultimo_evento = 0.0
+            self.tempos = []  # instantes das últimas teclas (até tamanho_maximo)
+            self.pendente = None  # (comandos, nó, prazo)
+        self.erros = erros
+        return erros
+
+    def _avancar(self, estado, chave, tempo_atual):
+        """
+        Segue transições/links de falha até consumir a chave.
+        """
+        decorrido = tempo_atual - self.ultimo_evento
+        while True:
+            transicao = self.transicoes[estado].get(chave)
+            if transicao is not None and (estado == RAIZ or decorrido <= transicao[1]):
+                return transicao[0]
+            if estado == RAIZ:
+                return RAIZ
+            estado = self.falha[estado]
+
+    def _comandos_validos(self, estado):
+        """
+        Comandos do nó cujos atalhos respeitam a própria janela em todos os
+        intervalos entre as suas teclas (as últimas 'tamanho' registradas).
+
+        Returns:
+            tuple: Comandos a disparar, ou None se nenhum vale
+        """
+        resumo = self.resumo_saida[estado]
+        if resumo is None:
+            return None
+        tempos = self.tempos
+        todos, janela_minima, tamanho = resumo
+        anterior = tempos[-tamanho]
+        for instante in tempos[len(tempos) - tamanho + 1:]:
+            if instante - anterior > janela_minima:
+                break
+            anterior = instante
+        else:
+            return todos
+        comandos = tuple(
+            comando for comando, janela, tamanho in self.saida[estado]
+            if all(tempos[indice] - tempos[indice - 1] <= janela
+                   for indice in range(len(tempos) - tamanho + 1, len(tempos))))
+        return comandos or None
+
+    def processar(self, chave, tempo_atual):
+        """
+        Avança o autômato com uma tecla pressionada.
+
+        Args:
+            chave (tuple): Chave do evento (ver chave_evento)
+            tempo_atual (float): Relógio monotônico em segundos
+
+        Returns:
+            tuple: (comandos a executar, prazo do disparo pendente ou None)
+        """
+        disparados = ()
+        herdados = None
+        with self.trava:
+            estado = self.estado
+
+            if self.pendente is not None:
+                comandos, no_pendente, prazo = self.pendente
+                transicao = self.transicoes[no_pendente].get(chave)
+                continua = (tempo_atual <= prazo and transicao is not None and
+                            tempo_atual - self.ultimo_evento <= transicao[1])
+                self.pendente = None
+                if continua:
+                    # O atalho mais curto segue pendente até a sequência
+                    # mais longa chegar a uma saída ou se quebrar
+                    herdados = comandos
+                else:
+                    # Sequência encerrada: dispara o atalho mais curto
+                    disparados = comandos
+                    estado = RAIZ
+            elif (estado != RAIZ and
+                  tempo_atual - self.ultimo_evento > self.janela_no[estado]):
+                # Janela expirada: recomeça do início
+                estado = RAIZ
+
+            estado = self._avancar(estado, chave, tempo_atual)
+            self.ultimo_evento = tempo_atual
+            self.tempos.append(tempo_atual)
+            if len(self.tempos) > self.tamanho_maximo:
+                del self.tempos[0]
+
+            prazo_pendente = None
+            # Uma saída válida do nó substitui o atalho mais curto herdado;
+            # sem ela (nó intermediário ou janela própria excedida) o
+            # herdado continua pendente
+            comandos = self._comandos_validos(estado) or herdados
+            if comandos is not None:
+                if self.transicoes[estado]:
+                    prazo_pendente = tempo_atual + self.janela_no[estado]
+                    self.pendente = (comandos, estado, prazo_pendente)
+                else:
+                    disparados = disparados + comandos
+                    estado = RAIZ
+
+            self.estado = estado
+        return disparados, prazo_pendente
+
+    def expirar(self, tempo_atual):
+        """
+        Dispara o atalho pendente cuja janela já expirou.
+
+        Args:
+            tempo_atual (float): Relógio monotônico em segundos
+
+        Returns:
+            tuple: Comandos a executar (vazio se nada expirou)
+        """
+        with self.trava:
+            if self.pendente is None or tempo_atual < self.pendente[2]:
+                return ()
+            comandos = self.pendente[0]
+            self.pendente = None
+            self.estado = RAIZ
+            return comandos
+
+
+class IndiceAtalhos:
+    """
+    Índice de dois níveis: aplicativo em primeiro plano → autômato de teclas.
+
+    Cada escopo (processo ou classe de janela) recebe um autômato próprio com
+    seus atalhos e os globais não sobrepostos; o autômato global atende os
+    demais aplicativos. No hook, a escolha são duas consultas em dicionário
+    sobre a janela em cache, e o passo do autômato continua O(1).
+    """
+
+    def __init__(self, atalhos=()):
+        self.erros = []
+        self.compilar(atalhos)
+
+    def compilar(self, atalhos):
+        """
+        Recompila o índice a partir da lista de atalhos da configuração.
+
+        Args:
+            atalhos (list): Lista de atalhos do config.json
+
+        Returns:
+            list: Mensagens de erro dos atalhos ignorados
+        """
+        erros = []
+        globais = []
+        por_escopo = {}
+        for atalho in atalhos:
+            try:
+                chaves, _ = sequencia_do_atalho(atalho)
+            except ErroEspecificacaoTecla as erro:
+                erros.append(f"{erro} (comando: {atalho.get('comando')})")
+                continue
+
+            escopos = escopos_do_atalho(atalho)
+            if not escopos:
+                globais.append((tuple(chaves), atalho))
+            for escopo in escopos:
+                por_escopo.setdefault(escopo, []).append((tuple(chaves), atalho))
+
+        automatos = {}
+        for escopo, proprios in por_escopo.items():
+            sobrepostas = {chaves for chaves, _ in proprios}
+            automatos[escopo] = AutomatoAtalhos(
+                [atalho for _, atalho in proprios] +
+                [atalho for chaves, atalho in globais if chaves not in sobrepostas])
+
+        self.automato_global = AutomatoAtalhos([atalho for _, atalho in globais])
+        self.por_processo = {nome: automato for (tipo, nome), automato in automatos.items()
+                             if tipo == 'processo'}
+        self.por_classe = {nome: automato for (tipo, nome), automato in automatos.items()
+                           if tipo == 'classe'}
+        self.erros = erros
+        return erros
+
+    def automato_para(self, janela):
+        """
+        Escolhe o autômato do aplicativo em primeiro plano.
+
+        Args:
+            janela (InfoJanela): Janela em foco (cache do RastreadorJanelaAtiva)
+
+        Returns:
+            AutomatoAtalhos: Autômato do processo, da classe ou o global
+        """
+        automato = self.por_processo.get(janela.processo)
+        if automato is None:
+            automato = self.por_classe.get(janela.classe, self.automato_global)
+        return automato
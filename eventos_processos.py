@@ -0,0 +1,440 @@
+# eventos_processos.py - Fontes de eventos de início/fim de processos para o GerenciadorEnergia
+
+# O GerenciadorEnergia chama fonte.aguardar() entre as varreduras. Cada fonte
+# retorna assim que algo relevante acontece (processo monitorado iniciou ou
+# terminou), quando a configuração muda (despertar) ou no intervalo máximo:
+#
+#   FontePolling     aguarda sempre INTERVALO_MONITORAMENTO (comportamento antigo)
+#   FonteNetlink     Linux: proc connector (exec/exit/comm de todo o sistema; root)
+#   FontePidfd       Linux sem permissão para o netlink: pidfd dos PIDs
+#                    monitorados (fim imediato) + polling para os inícios
+#   FonteWmi         Windows: Win32_ProcessStartTrace/StopTrace (pacote 'wmi')
+#
+# Fontes orientadas a eventos ainda fazem uma varredura de segurança a cada
+# INTERVALO_SEGURANCA, para recuperar eventos perdidos.
+#
+# No núcleo asyncio (ver nucleo.py) a fonte é iniciada com o loop e o laço
+# usa aguardar_async(); o FonteNetlink então lê o soquete pelo próprio loop
+# (add_reader), sem thread dedicada.
+
+import asyncio
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+
+# Intervalo de varredura quando não há fonte de eventos (segundos)
+INTERVALO_MONITORAMENTO = 2
+
+# Varredura de segurança das fontes orientadas a eventos (segundos)
+INTERVALO_SEGURANCA = 30
+
+# Tamanho de comm no Linux: nomes com 15 caracteres podem estar truncados
+TAMANHO_MAXIMO_COMM = 15
+
+# Constantes do proc connector (linux/connector.h, linux/cn_proc.h)
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_COMM = 0x00000200
+PROC_EVENT_EXIT = 0x80000000
+
+# nlmsghdr (16 bytes) + cn_msg (20 bytes) + proc_event (what, cpu, timestamp)
+_CABECALHO_NETLINK = struct.Struct('=IHHII')
+_CABECALHO_CONECTOR = struct.Struct('=IIIIHH')
+_CABECALHO_EVENTO = struct.Struct('=IIQ')
+_DESLOCAMENTO_EVENTO = _CABECALHO_NETLINK.size + _CABECALHO_CONECTOR.size
+_DESLOCAMENTO_DADOS = _DESLOCAMENTO_EVENTO + _CABECALHO_EVENTO.size
+
+
+class FontePolling:
+    """
+    Sem eventos: a varredura roda a cada INTERVALO_MONITORAMENTO.
+    """
+
+    orientada_a_eventos = False
+
+    # True se a fonte informa trocas de executável (exec/comm) e reuso de
+    # PID (coletar_pids_alterados); sem isso a TabelaProcessos revalida o
+    # cache por amostragem
+    reporta_alteracoes = False
+
+    def __init__(self, intervalo=INTERVALO_MONITORAMENTO):
+        self.intervalo = intervalo
+        self.sinal = threading.Event()
+        self.correspondente = None
+        self.pids_observados = frozenset()
+        self.loop = None
+        self.sinal_nucleo = None
+
+        # PIDs que trocaram de executável (exec) desde a última coleta
+        self.trava_alterados = threading.Lock()
+        self.pids_alterados = set()
+
+    def configurar(self, correspondente, pids_observados):
+        """
+        Informa as regras dos monitores e os PIDs ativos após cada varredura.
+
+        Args:
+            correspondente (CorrespondenteProcessos): Regras dos monitores
+            pids_observados (frozenset): PIDs que casaram com algum monitor
+        """
+        self.correspondente = correspondente
+        self.pids_observados = pids_observados
+
+    def iniciar(self, loop=None):
+        """
+        Args:
+            loop: Loop asyncio do núcleo; se informado, iniciar() deve ser
+                chamado nele e o laço deve usar aguardar_async()
+        """
+        self.loop = loop
+        if loop is not None:
+            self.sinal_nucleo = asyncio.Event()
+
+    def coletar_pids_alterados(self):
+        """
+        Retorna e limpa os PIDs vistos trocando de nome/executável, para que
+        o cache da tabela de processos os releia.
+
+        Returns:
+            set: PIDs alterados desde a última chamada
+        """
+        with self.trava_alterados:
+            pids, self.pids_alterados = self.pids_alterados, set()
+        return pids
+
+    def _registrar_alterado(self, pid):
+        with self.trava_alterados:
+            self.pids_alterados.add(pid)
+
+    def despertar(self):
+        """
+        Faz aguardar() retornar imediatamente (ex: configuração recarregada).
+        """
+        self.sinalizar()
+
+    def sinalizar(self):
+        # Chamado de qualquer thread (leitores de eventos, observador da
+        # configuração ou o próprio núcleo)
+        self.sinal.set()
+        if self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.sinal_nucleo.set)
+            except RuntimeError:
+                # Núcleo já encerrado
+                pass
+
+    def aguardar(self):
+        """
+        Bloqueia até um evento relevante, despertar() ou o intervalo máximo.
+
+        Returns:
+            bool: True se retornou por evento/despertar, False por tempo
+        """
+        ocorreu = self.sinal.wait(self.intervalo)
+        self.sinal.clear()
+        return ocorreu
+
+    async def aguardar_async(self):
+        """
+        Equivalente a aguardar() para o núcleo asyncio (requer iniciar(loop)).
+
+        Returns:
+            bool: True se retornou por evento/despertar, False por tempo
+        """
+        try:
+            await asyncio.wait_for(self.sinal_nucleo.wait(), self.intervalo)
+            ocorreu = True
+        except asyncio.TimeoutError:
+            ocorreu = False
+        self.sinal_nucleo.clear()
+        self.sinal.clear()
+        return ocorreu
+
+    def fechar(self):
+        self.despertar()
+
+    def _nome_relevante(self, nome):
+        # Processo novo que pode casar com algum monitor (o comm do Linux
+        # corta o nome em 15 caracteres)
+        correspondente = self.correspondente
+        if correspondente is None or not nome:
+            return True
+        return correspondente.pode_corresponder(
+            nome.lower(),
+            truncado=sys.platform != "win32" and len(nome) >= TAMANHO_MAXIMO_COMM)
+
+
+class FonteNetlink(FontePolling):
+    """
+    Linux: assina o proc connector do kernel (requer CAP_NET_ADMIN).
+
+    Cada exec/comm é filtrado pelas regras dos monitores (lendo /proc/<pid>/comm) e cada exit
+    pelos PIDs observados, então processos irrelevantes não geram varredura.
+    """
+
+    orientada_a_eventos = True
+    reporta_alteracoes = True
+
+    def __init__(self, intervalo=INTERVALO_SEGURANCA):
+        super().__init__(intervalo)
+        self.soquete = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.soquete.bind((0, CN_IDX_PROC))
+            self._enviar_operacao(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self.soquete.close()
+            raise
+        self.parado = False
+        self.eventos_recebidos = 0
+        self.eventos_relevantes = 0
+
+    def _enviar_operacao(self, operacao):
+        porta = self.soquete.getsockname()[0]
+        corpo = struct.pack('=I', operacao)
+        conector = _CABECALHO_CONECTOR.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(corpo), 0)
+        tamanho = _CABECALHO_NETLINK.size + len(conector) + len(corpo)
+        self.soquete.send(
+            _CABECALHO_NETLINK.pack(tamanho, NLMSG_DONE, 0, 0, porta) + conector + corpo)
+
+    def _evento_relevante(self, dados, deslocamento):
+        tipo = _CABECALHO_EVENTO.unpack_from(dados, deslocamento + _DESLOCAMENTO_EVENTO)[0]
+        inicio_dados = deslocamento + _DESLOCAMENTO_DADOS
+        if tipo == PROC_EVENT_EXIT:
+            pid, tgid = struct.unpack_from('=ii', dados, inicio_dados)
+            # Fim de threads não interessa; apenas do processo observado
+            return pid == tgid and pid in self.pids_observados
+        if tipo == PROC_EVENT_COMM:
+            pid, tgid = struct.unpack_from('=ii', dados, inicio_dados)
+            comm = dados[inicio_dados + 8:inicio_dados + 24].split(b'\0', 1)[0]
+            if pid != tgid or not (pid in self.pids_observados or
+                                   self._nome_relevante(comm.decode('utf-8', 'replace'))):
+                return False
+            self._registrar_alterado(pid)
+            return True
+        if tipo == PROC_EVENT_EXEC:
+            pid = struct.unpack_from('=i', dados, inicio_dados)[0]
+            try:
+                with open(f'/proc/{pid}/comm', 'rb') as arquivo:
+                    comm = arquivo.read().rstrip(b'\n')
+            except OSError:
+                # Já terminou antes de ser lido
+                return False
+            # Relevante se o novo nome casa ou se um processo monitorado
+            # trocou de executável
+            if not (pid in self.pids_observados or
+                    self._nome_relevante(comm.decode('utf-8', 'replace'))):
+                return False
+            self._registrar_alterado(pid)
+            return True
+        return False
+
+    def _processar_datagrama(self, dados):
+        deslocamento = 0
+        while deslocamento + _DESLOCAMENTO_DADOS <= len(dados):
+            tamanho = _CABECALHO_NETLINK.unpack_from(dados, deslocamento)[0]
+            if tamanho < _DESLOCAMENTO_DADOS:
+                break
+            self.eventos_recebidos += 1
+            if self._evento_relevante(dados, deslocamento):
+                self.eventos_relevantes += 1
+                self.sinalizar()
+            deslocamento += (tamanho + 3) & ~3
+
+    def _eventos_perdidos(self):
+        # Buffer estourou (ENOBUFS): varre tudo; execs podem voltar a se
+        # perder sob carga, então o cache volta a revalidar por amostragem
+        if self.reporta_alteracoes:
+            self.reporta_alteracoes = False
+            print("⚠️ Eventos de processos perdidos; revalidando o cache por amostragem")
+        self.sinalizar()
+
+    def _ler_eventos(self):
+        while not self.parado:
+            try:
+                dados = self.soquete.recv(8192)
+            except OSError:
+                if self.parado:
+                    break
+                self._eventos_perdidos()
+                continue
+            self._processar_datagrama(dados)
+
+    def _ler_disponiveis(self):
+        # Leitor do núcleo: esvazia o soquete sem bloquear
+        while not self.parado:
+            try:
+                dados = self.soquete.recv(8192)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._eventos_perdidos()
+                return
+            self._processar_datagrama(dados)
+
+    def iniciar(self, loop=None):
+        super().iniciar(loop)
+        if loop is not None:
+            self.soquete.setblocking(False)
+            loop.add_reader(self.soquete.fileno(), self._ler_disponiveis)
+        else:
+            threading.Thread(target=self._ler_eventos, daemon=True).start()
+
+    def fechar(self):
+        self.parado = True
+        if self.loop is not None:
+            self.loop.remove_reader(self.soquete.fileno())
+        try:
+            self._enviar_operacao(PROC_CN_MCAST_IGNORE)
+            self.soquete.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.soquete.close()
+        super().fechar()
+
+
+class FontePidfd(FontePolling):
+    """
+    Linux sem permissão para o netlink: um pidfd por processo monitorado
+    ativo avisa o fim em milissegundos; inícios continuam por polling.
+    """
+
+    def __init__(self, intervalo=INTERVALO_MONITORAMENTO):
+        super().__init__(intervalo)
+        self.leitura_aviso, self.escrita_aviso = os.pipe()
+        self.pidfds = {}
+        self.parado = False
+
+    def configurar(self, correspondente, pids_observados):
+        mudou = pids_observados != self.pids_observados
+        super().configurar(correspondente, pids_observados)
+        if mudou:
+            # Acorda o select para trocar o conjunto de pidfds
+            os.write(self.escrita_aviso, b'\0')
+
+    def _atualizar_pidfds(self):
+        pids = self.pids_observados
+        for pid in [pid for pid in self.pidfds if pid not in pids]:
+            os.close(self.pidfds.pop(pid))
+        for pid in pids:
+            if pid not in self.pidfds:
+                try:
+                    self.pidfds[pid] = os.pidfd_open(pid)
+                except OSError:
+                    # Já terminou: a próxima varredura percebe
+                    self.sinalizar()
+
+    def _vigiar(self):
+        while not self.parado:
+            self._atualizar_pidfds()
+            descritores = list(self.pidfds.values()) + [self.leitura_aviso]
+            prontos, _, _ = select.select(descritores, [], [])
+            if self.leitura_aviso in prontos:
+                os.read(self.leitura_aviso, 4096)
+            if any(descritor != self.leitura_aviso for descritor in prontos):
+                self.sinalizar()
+                # Evita laço ocupado até a varredura remover o PID encerrado
+                encerrados = [pid for pid, descritor in self.pidfds.items()
+                              if descritor in prontos]
+                for pid in encerrados:
+                    os.close(self.pidfds.pop(pid))
+                self.pids_observados = self.pids_observados.difference(encerrados)
+
+    def iniciar(self, loop=None):
+        super().iniciar(loop)
+        threading.Thread(target=self._vigiar, daemon=True).start()
+
+    def fechar(self):
+        self.parado = True
+        os.write(self.escrita_aviso, b'\0')
+        super().fechar()
+
+
+class FonteWmi(FontePolling):
+    """
+    Windows: Win32_ProcessStartTrace e Win32_ProcessStopTrace via WMI
+    (pacote opcional 'wmi'; requer privilégio de administrador). Se a
+    assinatura falhar, passa a funcionar como polling.
+    """
+
+    orientada_a_eventos = True
+    # Sem exec no Windows: o nome só muda com um processo novo, e os inícios
+    # registram o PID (reuso)
+    reporta_alteracoes = True
+
+    def __init__(self, intervalo=INTERVALO_SEGURANCA):
+        import wmi  # noqa: F401 - falha cedo se o pacote não estiver instalado
+
+        super().__init__(intervalo)
+        self.parado = False
+
+    def _vigiar(self, classe, inicio):
+        import pythoncom
+        import wmi
+
+        pythoncom.CoInitialize()
+        try:
+            vigia = getattr(wmi.WMI(), classe).watch_for()
+        except Exception as erro:
+            print(f"⚠️ WMI indisponível ({classe}): {erro}; usando polling")
+            self.orientada_a_eventos = False
+            self.reporta_alteracoes = False
+            self.intervalo = INTERVALO_MONITORAMENTO
+            return
+
+        while not self.parado:
+            try:
+                evento = vigia(timeout_ms=1000)
+            except wmi.x_wmi_timed_out:
+                continue
+            pid = int(evento.ProcessID)
+            if inicio:
+                relevante = self._nome_relevante(evento.ProcessName)
+                if relevante:
+                    # PID pode ter sido reutilizado desde o último ciclo
+                    self._registrar_alterado(pid)
+            else:
+                relevante = pid in self.pids_observados
+            if relevante:
+                self.sinalizar()
+
+    def iniciar(self, loop=None):
+        super().iniciar(loop)
+        for classe, inicio in (('Win32_ProcessStartTrace', True),
+                               ('Win32_ProcessStopTrace', False)):
+            threading.Thread(target=self._vigiar, args=(classe, inicio), daemon=True).start()
+
+    def fechar(self):
+        self.parado = True
+        super().fechar()
+
+
+def criar_fonte_eventos():
+    """
+    Escolhe a melhor fonte de eventos de processos disponível.
+
+    Returns:
+        FontePolling ou subclasse (ainda não iniciada)
+    """
+    if sys.platform == "win32":
+        try:
+            return FonteWmi()
+        except ImportError:
+            pass
+    elif sys.platform.startswith("linux"):
+        try:
+            return FonteNetlink()
+        except OSError:
+            # Sem CAP_NET_ADMIN (ou kernel sem proc connector)
+            pass
+        if hasattr(os, 'pidfd_open'):
+            return FontePidfd()
+    return FontePolling()
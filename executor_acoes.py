@@ -0,0 +1,208 @@
+# executor_acoes.py - Execução das ações dos atalhos fora da thread do hook
+
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import SECAO_ACAO, agora_ns, registro_metricas
+
+# Capacidade da fila de ações pendentes (excedente é descartado)
+TAMANHO_FILA_ACOES = 64
+
+# Número de threads que executam as ações
+NUMERO_TRABALHADORES = 2
+
+# Espera máxima, no encerramento, pelas ações já entregues ao núcleo (segundos)
+TEMPO_LIMITE_ENTREGA = 1.0
+
+# Ações tipadas enfileiradas pelo callback do Listener
+AcaoComando = namedtuple('AcaoComando', ['comando'])
+AcaoTeclas = namedtuple('AcaoTeclas', ['sequencia'])  # [('press'|'release', tecla)]
+
+
+class ExecutorAcoes:
+    """
+    Fila limitada + pequeno pool de threads para executar ações.
+
+    O callback do hook de teclado só chama enfileirar(), que nunca bloqueia:
+    disco lento, antivírus ou um Popen demorado não atrasam o hook (o Windows
+    remove hooks que excedem o LowLevelHooksTimeout).
+    """
+
+    def __init__(self, executores, tamanho_fila=TAMANHO_FILA_ACOES,
+                 numero_trabalhadores=NUMERO_TRABALHADORES):
+        """
+        Args:
+            executores (dict): {tipo da ação: função que recebe a ação}
+            tamanho_fila (int): Capacidade máxima da fila
+            numero_trabalhadores (int): Threads de execução
+        """
+        self.executores = executores
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.numero_trabalhadores = numero_trabalhadores
+        self.trabalhadores = []
+
+        # Injeções de teclas não podem se intercalar entre threads
+        self.trava_teclas = threading.Lock()
+
+        # Contadores (leitura para diagnóstico)
+        self.acoes_executadas = 0
+        self.acoes_descartadas = 0
+        self.acoes_com_erro = 0
+
+    def enfileirar(self, acao):
+        """
+        Enfileira uma ação sem bloquear. Chamado na thread do hook.
+
+        Args:
+            acao: AcaoComando, AcaoTeclas ou outro tipo registrado
+
+        Returns:
+            bool: False se a fila estava cheia e a ação foi descartada
+        """
+        try:
+            self.fila.put_nowait(acao)
+            return True
+        except queue.Full:
+            self.acoes_descartadas += 1
+            return False
+
+    def _executar(self, acao):
+        executor = self.executores[type(acao)]
+        inicio = agora_ns()
+        if isinstance(acao, AcaoTeclas):
+            with self.trava_teclas:
+                executor(acao)
+        else:
+            executor(acao)
+        registro_metricas.registrar(SECAO_ACAO, agora_ns() - inicio)
+
+    def _executar_contando(self, acao):
+        try:
+            self._executar(acao)
+            self.acoes_executadas += 1
+        except Exception as erro:
+            self.acoes_com_erro += 1
+            print(f"⚠️ Erro ao executar ação {acao}: {erro}")
+
+    def _trabalhar(self):
+        while True:
+            acao = self.fila.get()
+            if acao is None:
+                break
+            self._executar_contando(acao)
+
+    def iniciar(self):
+        """
+        Inicia as threads de execução.
+        """
+        for _ in range(self.numero_trabalhadores):
+            trabalhador = threading.Thread(target=self._trabalhar, daemon=True)
+            trabalhador.start()
+            self.trabalhadores.append(trabalhador)
+
+    def parar(self):
+        """
+        Encerra as threads depois de esvaziar a fila.
+        """
+        for _ in self.trabalhadores:
+            self.fila.put(None)
+        for trabalhador in self.trabalhadores:
+            trabalhador.join()
+        self.trabalhadores = []
+
+
+class ExecutorNucleo(ExecutorAcoes):
+    """
+    Ações despachadas pelo núcleo asyncio (ver nucleo.py) para um pool
+    limitado de threads (loop.run_in_executor).
+
+    O trabalho bloqueante (Popen lento durante uma varredura do antivírus,
+    injeção de teclas do pynput) não roda na thread do núcleo, então não
+    atrasa o monitoramento de processos, a troca de plano, a recarga da
+    configuração nem as expirações dos atalhos. enfileirar() continua sem
+    bloquear e com o mesmo limite de ações pendentes (entregues e ainda não
+    concluídas); injeções de teclas seguem serializadas por trava_teclas.
+    """
+
+    def __init__(self, executores, nucleo, tamanho_fila=TAMANHO_FILA_ACOES,
+                 numero_trabalhadores=NUMERO_TRABALHADORES):
+        """
+        Args:
+            executores (dict): {tipo da ação: função que recebe a ação}
+            nucleo (Nucleo): Runtime asyncio que despacha as ações
+            tamanho_fila (int): Máximo de ações pendentes
+            numero_trabalhadores (int): Threads do pool de execução
+        """
+        super().__init__(executores, tamanho_fila, numero_trabalhadores=0)
+        self.nucleo = nucleo
+        self.tamanho_fila = tamanho_fila
+        self.numero_trabalhadores_pool = numero_trabalhadores
+        self.pool = None
+
+        # Incrementado no hook e decrementado no núcleo
+        self.trava_pendentes = threading.Lock()
+        self.pendentes = 0
+
+    def enfileirar(self, acao):
+        """
+        Entrega uma ação ao núcleo sem bloquear. Chamado na thread do hook.
+
+        Args:
+            acao: AcaoComando, AcaoTeclas ou outro tipo registrado
+
+        Returns:
+            bool: False se havia ações demais pendentes (ou o núcleo parou)
+        """
+        with self.trava_pendentes:
+            if self.pendentes >= self.tamanho_fila:
+                self.acoes_descartadas += 1
+                return False
+            self.pendentes += 1
+        if not self.nucleo.chamar(self._executar_pendente, acao):
+            with self.trava_pendentes:
+                self.pendentes -= 1
+            self.acoes_descartadas += 1
+            return False
+        return True
+
+    def _concluir(self, acao):
+        # Thread do pool
+        try:
+            self._executar_contando(acao)
+        finally:
+            with self.trava_pendentes:
+                self.pendentes -= 1
+
+    def _executar_pendente(self, acao):
+        # Núcleo: só despacha para o pool
+        try:
+            self.nucleo.loop.run_in_executor(self.pool, self._concluir, acao)
+        except RuntimeError:
+            # Pool já encerrado (encerramento em andamento)
+            with self.trava_pendentes:
+                self.pendentes -= 1
+            self.acoes_descartadas += 1
+
+    def iniciar(self):
+        """
+        Cria o pool de execução.
+        """
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.numero_trabalhadores_pool, thread_name_prefix='acoes')
+
+    def parar(self):
+        """
+        Encerra o pool depois das ações em execução. Chamado fora do núcleo,
+        antes de encerrá-lo.
+        """
+        if self.pool is None:
+            return
+        # As entregas ao núcleo são FIFO: quando esta marca roda, as ações
+        # enfileiradas antes já foram passadas ao pool
+        entregues = threading.Event()
+        if not self.nucleo.no_nucleo() and self.nucleo.chamar(entregues.set):
+            entregues.wait(TEMPO_LIMITE_ENTREGA)
+        self.pool.shutdown(wait=True)
+        self.pool = None
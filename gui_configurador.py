@@ -2,14 +2,21 @@
 
 import json
 import os
+import re
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from catalogo_planos import (NOME_ARQUIVO_CATALOGO, ler_ranking_planos,
+                             ordenar_por_ranking, planos_disponiveis)
 from defaults import DEFAULT_CONFIG
+from despacho_atalhos import descrever_teclas_atalho
+from observador_config import REGRAS_PROCESSO, salvar_configuracao_atomica
+from teclas import MODIFICADORES_POR_TECLA, tecla_de_evento_tk, validar_tecla
 
 # Configuração do diretório de config no %APPDATA%
 APPDATA = os.environ.get('APPDATA', os.path.expanduser('~\\AppData\\Roaming'))
 CONFIG_DIR = os.path.join(APPDATA, 'TurboAtalho')
 ARQUIVO_CONFIG = os.path.join(CONFIG_DIR, 'config.json')
+ARQUIVO_CATALOGO_PLANOS = os.path.join(CONFIG_DIR, NOME_ARQUIVO_CATALOGO)
 
 # Garante que o diretório existe
 os.makedirs(CONFIG_DIR, exist_ok=True)
@@ -23,12 +30,9 @@ PRIORIDADE_EXIBICAO_PARA_INTERNO = {
 PRIORIDADE_INTERNO_PARA_EXIBICAO = {
     valor: chave for chave, valor in PRIORIDADE_EXIBICAO_PARA_INTERNO.items()}
 
-# Opções de planos de energia disponíveis (apenas 3 planos que funcionam sempre)
-OPCOES_PLANOS_ENERGIA = [
-    "Alto desempenho",
-    "Equilibrado",
-    "Economia de energia"
-]
+# Planos sugeridos por padrão nos combos (se existirem no catálogo)
+PLANO_PADRAO_INICIAR = "Alto desempenho"
+PLANO_PADRAO_PARAR = "Equilibrado"
 
 
 def carregar_configuracoes(configuracao_padrao):
@@ -58,14 +62,14 @@ def carregar_configuracoes(configuracao_padrao):
 
 def salvar_configuracoes(configuracoes):
     """
-    Salva configurações no arquivo JSON.
+    Salva configurações no arquivo JSON (gravação atômica, o daemon
+    nunca enxerga o arquivo pela metade).
 
     Args:
         configuracoes (dict): Configurações a serem salvas
     """
     try:
-        with open(ARQUIVO_CONFIG, 'w', encoding='utf-8') as arquivo:
-            json.dump(configuracoes, arquivo, indent=4, ensure_ascii=False)
+        salvar_configuracao_atomica(ARQUIVO_CONFIG, configuracoes)
     except Exception:
         # Se falhar ao salvar, mostra erro ao usuário
         messagebox.showerror(
@@ -129,43 +133,52 @@ class InterfaceConfigurador(tk.Tk):
         # Listas de dados
         self.lista_atalhos = self.configuracoes["atalhos"]
         self.lista_monitores = self.configuracoes["monitores"]
-        
-        # Limpa monitores com planos não suportados
-        self._limpar_monitores_invalidos()
+
+        # Planos do catálogo do daemon (planos.json), na ordem do ranking
+        self.opcoes_planos = ordenar_por_ranking(
+            planos_disponiveis(ARQUIVO_CATALOGO_PLANOS),
+            ler_ranking_planos(self.configuracoes))
+
+        # Avisa sobre monitores com planos que não existem nesta máquina
+        self._avisar_planos_desconhecidos()
 
         # Variável para checkbox da calculadora
         self.atalho_calculadora_ativo = tk.BooleanVar(
             value=self.configuracoes.get("enable_calc_percent", True)
         )
 
-    def _limpar_monitores_invalidos(self):
+    def _avisar_planos_desconhecidos(self):
         """
-        Remove monitores que usam planos de energia não suportados
+        Avisa sobre monitores que usam planos ausentes do catálogo. Os
+        monitores são mantidos: o plano pode existir em outra máquina ou ser
+        criado depois.
         """
-        monitores_validos = []
+        desconhecidos = []
         for monitor in self.lista_monitores:
-            power_on = monitor.get('power_on', '')
-            power_off = monitor.get('power_off', '')
-            
-            # Verifica se os planos são suportados
-            if power_on in OPCOES_PLANOS_ENERGIA and power_off in OPCOES_PLANOS_ENERGIA:
-                monitores_validos.append(monitor)
-            else:
-                print(f"⚠️ Removendo monitor inválido: {monitor.get('process', 'desconhecido')} "
-                      f"(planos não suportados: {power_on}, {power_off})")
-        
-        if len(monitores_validos) != len(self.lista_monitores):
-            self.lista_monitores = monitores_validos
-            self.configuracoes["monitores"] = monitores_validos
-            salvar_configuracoes(self.configuracoes)
-            
-            messagebox.showinfo(
-                "Limpeza de Configuração",
-                f"Alguns monitores com planos não suportados foram removidos.\n"
-                f"Suporta apenas:\n"
-                f"• Alto desempenho\n• Equilibrado\n• Economia de energia"
+            planos = {monitor.get('power_on', ''), monitor.get('power_off', '')}
+            ausentes = sorted(planos - set(self.opcoes_planos))
+            if ausentes:
+                print(f"⚠️ Monitor {monitor.get('process', 'desconhecido')} usa planos "
+                      f"não encontrados: {', '.join(ausentes)}")
+                desconhecidos.append(monitor.get('process', 'desconhecido'))
+
+        if desconhecidos:
+            messagebox.showwarning(
+                "Planos de energia",
+                f"Alguns monitores usam planos que não existem neste computador:\n"
+                f"{', '.join(desconhecidos)}\n\n"
+                f"Eles foram mantidos, mas o plano só é aplicado se existir."
             )
 
+    def _plano_padrao(self, nome_plano):
+        """
+        Returns:
+            str: nome_plano se estiver no catálogo, senão o primeiro plano
+        """
+        if nome_plano in self.opcoes_planos:
+            return nome_plano
+        return self.opcoes_planos[0]
+
     def _construir_interface(self):
         """
         Constrói toda a interface gráfica da aplicação.
@@ -201,7 +214,7 @@ class InterfaceConfigurador(tk.Tk):
         notebook.add(aba, text="Gerenciar Atalhos")
         # Configura expansão das colunas e linhas
         aba.columnconfigure(1, weight=1)
-        aba.rowconfigure(4, weight=1)
+        aba.rowconfigure(5, weight=1)
 
         # Campo de entrada para tecla
         ttk.Label(aba, text="Tecla:")\
@@ -225,11 +238,19 @@ class InterfaceConfigurador(tk.Tk):
         ttk.Button(aba, text="…", width=3, command=self._procurar_arquivo)\
             .grid(row=1, column=2, padx=2, pady=1)
 
+        # Campo opcional: processo onde o atalho vale (vazio = global)
+        ttk.Label(aba, text="Somente em:")\
+            .grid(row=2, column=0, sticky='w', padx=2, pady=1)
+
+        self.campo_escopo = ttk.Entry(aba)
+        self.campo_escopo.grid(row=2, column=1, columnspan=2,
+                               sticky='ew', padx=2, pady=1)
+
         # Botões de ação
         ttk.Button(aba, text="Remover", command=self._remover_atalho)\
-            .grid(row=2, column=0, padx=2, pady=3, sticky='w')
+            .grid(row=3, column=0, padx=2, pady=3, sticky='w')
         ttk.Button(aba, text="Adicionar", command=self._adicionar_atalho)\
-            .grid(row=2, column=1, columnspan=2, padx=2, pady=3, sticky='e')
+            .grid(row=3, column=1, columnspan=2, padx=2, pady=3, sticky='e')
 
         # Checkbox para atalho especial da calculadora
         checkbox_calculadora = ttk.Checkbutton(
@@ -239,12 +260,12 @@ class InterfaceConfigurador(tk.Tk):
             command=self._alternar_atalho_calculadora
         )
         checkbox_calculadora.grid(
-            row=3, column=0, columnspan=3, sticky='w', padx=2, pady=3)
+            row=4, column=0, columnspan=3, sticky='w', padx=2, pady=3)
 
         # Lista de atalhos configurados
         self.lista_widget_atalhos = tk.Listbox(aba, height=6)
         self.lista_widget_atalhos.grid(
-            row=4, column=0, columnspan=3, sticky='nsew', padx=2, pady=1)
+            row=5, column=0, columnspan=3, sticky='nsew', padx=2, pady=1)
 
         # Carrega atalhos na lista
         self._atualizar_lista_atalhos()
@@ -260,7 +281,7 @@ class InterfaceConfigurador(tk.Tk):
         notebook.add(aba, text="Gerenciar Energia")
         # Configura expansão das colunas e linhas
         aba.columnconfigure(1, weight=1)
-        aba.rowconfigure(6, weight=1)
+        aba.rowconfigure(8, weight=1)
 
         # Campo para nome do processo
         ttk.Label(aba, text="Processo:")\
@@ -269,9 +290,21 @@ class InterfaceConfigurador(tk.Tk):
         self.campo_processo = ttk.Entry(aba)
         self.campo_processo.grid(row=1, column=1, sticky='ew', padx=2, pady=1)
 
+        # Combo para a regra de correspondência do processo
+        ttk.Label(aba, text="Regra:")\
+            .grid(row=2, column=0, sticky='w', padx=2, pady=1)
+
+        self.combo_regra = ttk.Combobox(
+            aba,
+            values=REGRAS_PROCESSO,
+            state='readonly'
+        )
+        self.combo_regra.grid(row=2, column=1, sticky='ew', padx=2, pady=1)
+        self.combo_regra.set(REGRAS_PROCESSO[0])  # "prefixo" como padrão
+
         # Combo para prioridade
         ttk.Label(aba, text="Prioridade:")\
-            .grid(row=2, column=0, sticky='w', padx=2, pady=1)
+            .grid(row=3, column=0, sticky='w', padx=2, pady=1)
 
         self.combo_prioridade = ttk.Combobox(
             aba,
@@ -279,47 +312,54 @@ class InterfaceConfigurador(tk.Tk):
             state='readonly'
         )
         self.combo_prioridade.grid(
-            row=2, column=1, sticky='ew', padx=2, pady=1)
+            row=3, column=1, sticky='ew', padx=2, pady=1)
         self.combo_prioridade.set(
             OPCOES_PRIORIDADE_EXIBICAO[2])  # "Alta" como padrão
 
         # Combo para plano ao iniciar processo
         ttk.Label(aba, text="Ao Iniciar:")\
-            .grid(row=3, column=0, sticky='w', padx=2, pady=1)
+            .grid(row=4, column=0, sticky='w', padx=2, pady=1)
 
         self.combo_plano_iniciar = ttk.Combobox(
             aba,
-            values=OPCOES_PLANOS_ENERGIA,
+            values=self.opcoes_planos,
             state='readonly'
         )
         self.combo_plano_iniciar.grid(
-            row=3, column=1, sticky='ew', padx=2, pady=1)
-        self.combo_plano_iniciar.set(
-            OPCOES_PLANOS_ENERGIA[0])  # "Alto desempenho"
+            row=4, column=1, sticky='ew', padx=2, pady=1)
+        self.combo_plano_iniciar.set(self._plano_padrao(PLANO_PADRAO_INICIAR))
 
         # Combo para plano ao parar processo
         ttk.Label(aba, text="Ao Parar:")\
-            .grid(row=4, column=0, sticky='w', padx=2, pady=1)
+            .grid(row=5, column=0, sticky='w', padx=2, pady=1)
 
         self.combo_plano_parar = ttk.Combobox(
             aba,
-            values=OPCOES_PLANOS_ENERGIA,
+            values=self.opcoes_planos,
             state='readonly'
         )
         self.combo_plano_parar.grid(
-            row=4, column=1, sticky='ew', padx=2, pady=1)
-        self.combo_plano_parar.set(OPCOES_PLANOS_ENERGIA[1])  # "Equilibrado"
+            row=5, column=1, sticky='ew', padx=2, pady=1)
+        self.combo_plano_parar.set(self._plano_padrao(PLANO_PADRAO_PARAR))
+
+        # Checkbox para estender a prioridade aos processos filhos
+        self.aplicar_filhos = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            aba,
+            text="Prioridade também nos processos filhos",
+            variable=self.aplicar_filhos
+        ).grid(row=6, column=0, columnspan=2, sticky='w', padx=2, pady=1)
 
         # Botões de ação
         ttk.Button(aba, text="Remover", command=self._remover_monitor)\
-            .grid(row=5, column=0, padx=2, pady=3, sticky='w')
+            .grid(row=7, column=0, padx=2, pady=3, sticky='w')
         ttk.Button(aba, text="Adicionar", command=self._adicionar_monitor)\
-            .grid(row=5, column=1, padx=2, pady=3, sticky='e')
+            .grid(row=7, column=1, padx=2, pady=3, sticky='e')
 
         # Lista de monitores configurados
         self.lista_widget_monitores = tk.Listbox(aba, height=6)
         self.lista_widget_monitores.grid(
-            row=6, column=0, columnspan=3, sticky='nsew', padx=2, pady=1)
+            row=8, column=0, columnspan=3, sticky='nsew', padx=2, pady=1)
 
         # Carrega monitores na lista
         self._atualizar_lista_monitores()
@@ -339,6 +379,9 @@ class InterfaceConfigurador(tk.Tk):
         Handler chamado quando campo de tecla perde foco.
         Restaura placeholder se campo estiver vazio.
         """
+        # Encerra captura pendente (ex: só um modificador foi pressionado)
+        self.unbind_all("<KeyPress>")
+
         if not self.campo_tecla.get():
             self.campo_tecla.insert(0, self.PLACEHOLDER_TECLA)
 
@@ -349,18 +392,17 @@ class InterfaceConfigurador(tk.Tk):
         Args:
             evento: Evento de tecla pressionada
         """
-        # Determina representação da tecla
-        if evento.char and len(evento.char) == 1:
-            # Caractere imprimível
-            representacao_tecla = evento.char
-        else:
-            # Tecla especial (ex: F1, Ctrl, etc)
-            representacao_tecla = f"Key.{evento.keysym.lower()}"
+        # Determina representação da tecla (mesma gramática do daemon)
+        representacao_tecla = tecla_de_evento_tk(evento)
 
         # Insere tecla no campo
         self.campo_tecla.delete(0, tk.END)
         self.campo_tecla.insert(0, representacao_tecla)
 
+        # Modificador sozinho: continua capturando para permitir combinações
+        if representacao_tecla[4:] in MODIFICADORES_POR_TECLA:
+            return
+
         # Para captura de teclas
         self.unbind_all("<KeyPress>")
 
@@ -370,7 +412,12 @@ class InterfaceConfigurador(tk.Tk):
         """
         self.lista_widget_atalhos.delete(0, tk.END)
         for atalho in self.lista_atalhos:
-            texto_atalho = f"{atalho['tecla']} → {atalho['comando']}"
+            texto_atalho = f"{descrever_teclas_atalho(atalho)} → {atalho['comando']}"
+            escopo = atalho.get('processo') or atalho.get('classe_janela')
+            if escopo:
+                if not isinstance(escopo, str):
+                    escopo = ', '.join(escopo)
+                texto_atalho += f"  [{escopo}]"
             self.lista_widget_atalhos.insert(tk.END, texto_atalho)
 
     def _adicionar_atalho(self):
@@ -385,8 +432,17 @@ class InterfaceConfigurador(tk.Tk):
             messagebox.showwarning("Atenção", "Defina tecla e comando válidos")
             return
 
-        # Adiciona atalho à lista
+        # Valida a tecla com o mesmo interpretador usado pelo daemon
+        erro_tecla = validar_tecla(tecla)
+        if erro_tecla:
+            messagebox.showerror("Erro", erro_tecla)
+            return
+
+        # Adiciona atalho à lista (com escopo, se informado)
         novo_atalho = {"tecla": tecla, "comando": comando}
+        processo = self.campo_escopo.get().strip().lower()
+        if processo:
+            novo_atalho["processo"] = processo
         self.lista_atalhos.append(novo_atalho)
 
         # Salva configurações
@@ -397,6 +453,7 @@ class InterfaceConfigurador(tk.Tk):
         self.campo_tecla.delete(0, tk.END)
         self.campo_tecla.insert(0, self.PLACEHOLDER_TECLA)
         self.campo_comando.delete(0, tk.END)
+        self.campo_escopo.delete(0, tk.END)
 
         # Atualiza lista visual
         self._atualizar_lista_atalhos()
@@ -457,9 +514,11 @@ class InterfaceConfigurador(tk.Tk):
                 monitor['priority']
             )
 
-            # Formata texto do monitor
+            # Formata texto do monitor (regra só aparece se não for a padrão)
+            regra = monitor.get('regra')
             texto_monitor = (
-                f"{monitor['process']} | {prioridade_exibicao} | "
+                f"{monitor['process']}{f' [{regra}]' if regra else ''} | "
+                f"{prioridade_exibicao}{' +filhos' if monitor.get('filhos') else ''} | "
                 f"On:{monitor['power_on']} | Off:{monitor['power_off']}"
             )
             self.lista_widget_monitores.insert(tk.END, texto_monitor)
@@ -480,15 +539,23 @@ class InterfaceConfigurador(tk.Tk):
         plano_iniciar = self.combo_plano_iniciar.get()
         plano_parar = self.combo_plano_parar.get()
 
-        # Validação adicional - só permite planos suportados
-        if plano_iniciar not in OPCOES_PLANOS_ENERGIA:
+        # Validação adicional - só permite planos do catálogo
+        if plano_iniciar not in self.opcoes_planos:
             messagebox.showerror("Erro", f"Plano '{plano_iniciar}' não é suportado.")
             return
-        
-        if plano_parar not in OPCOES_PLANOS_ENERGIA:
+
+        if plano_parar not in self.opcoes_planos:
             messagebox.showerror("Erro", f"Plano '{plano_parar}' não é suportado.")
             return
 
+        regra = self.combo_regra.get()
+        if regra == "regex":
+            try:
+                re.compile(nome_processo)
+            except re.error as erro:
+                messagebox.showerror("Erro", f"Expressão regular inválida: {erro}")
+                return
+
         # Cria novo monitor
         novo_monitor = {
             "process": nome_processo,
@@ -496,6 +563,10 @@ class InterfaceConfigurador(tk.Tk):
             "power_on": plano_iniciar,
             "power_off": plano_parar
         }
+        if regra != REGRAS_PROCESSO[0]:
+            novo_monitor["regra"] = regra
+        if self.aplicar_filhos.get():
+            novo_monitor["filhos"] = True
 
         # Adiciona à lista
         self.lista_monitores.append(novo_monitor)
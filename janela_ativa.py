@@ -0,0 +1,342 @@
+# janela_ativa.py - Rastreamento da janela em primeiro plano (orientado a eventos)
+
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import psutil
+
+# processo e classe em minúsculas (ex: 'chrome.exe', 'chrome_widgetwin_1')
+InfoJanela = namedtuple('InfoJanela', ['titulo', 'processo', 'pid', 'classe'],
+                        defaults=('',))
+
+JANELA_DESCONHECIDA = InfoJanela(titulo='', processo='', pid=0, classe='')
+
+# Executáveis da Calculadora (nome do processo não depende do idioma)
+PROCESSOS_CALCULADORA = frozenset([
+    'calculatorapp.exe', 'calculator.exe', 'calc.exe', 'win32calc.exe',
+    'gnome-calculator', 'kcalc', 'galculator', 'qalculate-gtk',
+])
+
+# Fallback pelo título, para quando o processo não puder ser identificado
+TITULOS_CALCULADORA = frozenset([
+    'Calculadora', 'Calculator', 'Rechner', 'Calculatrice', 'Calcolatrice',
+    'Kalkulator', 'Rekenmachine', 'Калькулятор', '电卓', '計算機', '计算器',
+])
+
+
+def eh_calculadora(info):
+    """
+    Verifica se a janela é a Calculadora (independente do idioma do sistema).
+
+    Args:
+        info (InfoJanela): Janela em primeiro plano
+
+    Returns:
+        bool: True se a janela pertence à Calculadora
+    """
+    return info.processo in PROCESSOS_CALCULADORA or info.titulo in TITULOS_CALCULADORA
+
+
+class BackendJanelaFalso:
+    """
+    Backend para testes e plataformas sem suporte: a janela ativa é definida
+    manualmente por definir_janela().
+    """
+
+    def __init__(self, info=JANELA_DESCONHECIDA):
+        self.info = info
+        self.ao_mudar = None
+
+    def iniciar(self, ao_mudar):
+        self.ao_mudar = ao_mudar
+        ao_mudar(self.info)
+
+    def definir_janela(self, info):
+        self.info = info
+        if self.ao_mudar is not None:
+            self.ao_mudar(info)
+
+    def parar(self):
+        self.ao_mudar = None
+
+
+class BackendJanelaWindows:
+    """
+    Windows: SetWinEventHook(EVENT_SYSTEM_FOREGROUND) em uma thread com laço
+    de mensagens. Um segundo hook (EVENT_OBJECT_NAMECHANGE), restrito ao
+    processo em primeiro plano, mantém o título atualizado.
+
+    As DLLs e os buffers são criados uma única vez.
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        from ctypes import wintypes
+        import ctypes
+
+        self.ctypes = ctypes
+        self.wintypes = wintypes
+        self.user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+        self.user32.SetWinEventHook.restype = wintypes.HANDLE
+        self.user32.GetForegroundWindow.restype = wintypes.HWND
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+
+        self.PROCEDIMENTO_EVENTO = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self.PROCEDIMENTO_FILHAS = ctypes.WINFUNCTYPE(
+            wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+        # Buffers reutilizados em todas as consultas
+        self.buffer_titulo = ctypes.create_unicode_buffer(512)
+        self.buffer_classe = ctypes.create_unicode_buffer(256)
+        self.buffer_caminho = ctypes.create_unicode_buffer(1024)
+        self.pid_janela = wintypes.DWORD()
+
+        self.ao_mudar = None
+        self.thread = None
+        self.id_thread = None
+        self.hwnd_atual = None
+        self.gancho_nome = None
+        self.info = JANELA_DESCONHECIDA
+
+    def _pid_da_janela(self, hwnd):
+        self.user32.GetWindowThreadProcessId(hwnd, self.ctypes.byref(self.pid_janela))
+        return self.pid_janela.value
+
+    def _nome_processo(self, pid):
+        handle = self.kernel32.OpenProcess(
+            self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ''
+        try:
+            tamanho = self.wintypes.DWORD(len(self.buffer_caminho))
+            if not self.kernel32.QueryFullProcessImageNameW(
+                    handle, 0, self.buffer_caminho, self.ctypes.byref(tamanho)):
+                return ''
+            return os.path.basename(self.buffer_caminho.value).lower()
+        finally:
+            self.kernel32.CloseHandle(handle)
+
+    def _processo_real_uwp(self, hwnd, pid_moldura):
+        """
+        Apps UWP (ex: Calculadora) rodam dentro do ApplicationFrameHost.exe;
+        o processo real é dono de uma janela filha.
+        """
+        encontrado = []
+
+        def verificar_filha(hwnd_filha, _):
+            pid = self._pid_da_janela(hwnd_filha)
+            if pid != pid_moldura:
+                encontrado.append(pid)
+                return False
+            return True
+
+        self.user32.EnumChildWindows(hwnd, self.PROCEDIMENTO_FILHAS(verificar_filha), 0)
+        return encontrado[0] if encontrado else pid_moldura
+
+    def _ler_janela(self, hwnd):
+        if not hwnd:
+            return JANELA_DESCONHECIDA
+        self.user32.GetWindowTextW(hwnd, self.buffer_titulo, len(self.buffer_titulo))
+        self.user32.GetClassNameW(hwnd, self.buffer_classe, len(self.buffer_classe))
+        pid = self._pid_da_janela(hwnd)
+        processo = self._nome_processo(pid)
+        if processo == 'applicationframehost.exe':
+            pid = self._processo_real_uwp(hwnd, pid)
+            processo = self._nome_processo(pid) or processo
+        return InfoJanela(titulo=self.buffer_titulo.value, processo=processo, pid=pid,
+                          classe=self.buffer_classe.value.lower())
+
+    def _rastrear_titulo(self, pid):
+        # Re-registra o hook de título apenas para o processo em foco
+        if self.gancho_nome:
+            self.user32.UnhookWinEvent(self.gancho_nome)
+        self.gancho_nome = self.user32.SetWinEventHook(
+            self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE, None,
+            self._callback, pid, 0, self.WINEVENT_OUTOFCONTEXT)
+
+    def _ao_evento(self, _gancho, evento, hwnd, id_objeto, _id_filho, _thread, _tempo):
+        if evento == self.EVENT_SYSTEM_FOREGROUND:
+            self.hwnd_atual = hwnd
+            self.info = self._ler_janela(hwnd)
+            self._rastrear_titulo(self._pid_da_janela(hwnd))
+        elif hwnd == self.hwnd_atual and id_objeto == self.OBJID_WINDOW:
+            self.user32.GetWindowTextW(hwnd, self.buffer_titulo, len(self.buffer_titulo))
+            self.info = self.info._replace(titulo=self.buffer_titulo.value)
+        else:
+            return
+        self.ao_mudar(self.info)
+
+    def _executar(self, pronto):
+        self.id_thread = self.kernel32.GetCurrentThreadId()
+
+        # Callback mantido em atributo para não ser coletado pelo GC
+        self._callback = self.PROCEDIMENTO_EVENTO(self._ao_evento)
+        gancho_foco = self.user32.SetWinEventHook(
+            self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND, None,
+            self._callback, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+
+        # Estado inicial
+        self._ao_evento(None, self.EVENT_SYSTEM_FOREGROUND,
+                        self.user32.GetForegroundWindow(), 0, 0, 0, 0)
+        pronto.set()
+
+        mensagem = self.wintypes.MSG()
+        while self.user32.GetMessageW(self.ctypes.byref(mensagem), None, 0, 0) > 0:
+            self.user32.TranslateMessage(self.ctypes.byref(mensagem))
+            self.user32.DispatchMessageW(self.ctypes.byref(mensagem))
+
+        self.user32.UnhookWinEvent(gancho_foco)
+        if self.gancho_nome:
+            self.user32.UnhookWinEvent(self.gancho_nome)
+
+    def iniciar(self, ao_mudar):
+        self.ao_mudar = ao_mudar
+        pronto = threading.Event()
+        self.thread = threading.Thread(target=self._executar, args=(pronto,), daemon=True)
+        self.thread.start()
+        pronto.wait(2)
+
+    def parar(self):
+        if self.id_thread is not None:
+            self.user32.PostThreadMessageW(self.id_thread, self.WM_QUIT, 0, 0)
+
+
+class BackendJanelaX11:
+    """
+    Linux/X11: escuta PropertyNotify de _NET_ACTIVE_WINDOW na janela raiz
+    (python-xlib, já instalado como dependência do pynput no Linux).
+    """
+
+    def __init__(self):
+        from Xlib import X, display
+
+        self.X = X
+        self.display = display.Display()
+        self.raiz = self.display.screen().root
+        self.ATOMO_ATIVA = self.display.intern_atom('_NET_ACTIVE_WINDOW')
+        self.ATOMO_NOME = self.display.intern_atom('_NET_WM_NAME')
+        self.ATOMO_PID = self.display.intern_atom('_NET_WM_PID')
+        self.ao_mudar = None
+        self.janela_atual = None
+        self.parado = False
+
+    def _propriedade(self, janela, atomo):
+        try:
+            propriedade = janela.get_full_property(atomo, self.X.AnyPropertyType)
+        except Exception:
+            return None
+        return propriedade.value if propriedade is not None else None
+
+    def _nome_processo(self, pid):
+        # /proc/{pid}/comm é truncado em 15 caracteres ('gnome-calculato');
+        # o psutil completa o nome pela linha de comando
+        try:
+            return psutil.Process(pid).name().lower()
+        except (psutil.Error, OSError):
+            return ''
+
+    def _ler_janela(self):
+        valor = self._propriedade(self.raiz, self.ATOMO_ATIVA)
+        if not valor:
+            return JANELA_DESCONHECIDA
+        janela = self.display.create_resource_object('window', valor[0])
+
+        # Acompanha mudanças de título da janela ativa
+        if self.janela_atual is None or self.janela_atual.id != janela.id:
+            try:
+                janela.change_attributes(event_mask=self.X.PropertyChangeMask)
+            except Exception:
+                pass
+            self.janela_atual = janela
+
+        titulo = self._propriedade(janela, self.ATOMO_NOME) or b''
+        if isinstance(titulo, bytes):
+            titulo = titulo.decode('utf-8', 'replace')
+
+        pids = self._propriedade(janela, self.ATOMO_PID)
+        pid = int(pids[0]) if pids else 0
+        processo = self._nome_processo(pid) if pid else ''
+
+        # WM_CLASS = (instância, classe); usa a classe (ex: 'Google-chrome')
+        try:
+            classe_wm = janela.get_wm_class()
+        except Exception:
+            classe_wm = None
+        classe = classe_wm[-1].lower() if classe_wm else ''
+        return InfoJanela(titulo=titulo, processo=processo, pid=pid, classe=classe)
+
+    def _executar(self):
+        self.raiz.change_attributes(event_mask=self.X.PropertyChangeMask)
+        self.ao_mudar(self._ler_janela())
+        while not self.parado:
+            evento = self.display.next_event()
+            if (evento.type == self.X.PropertyNotify and
+                    evento.atom in (self.ATOMO_ATIVA, self.ATOMO_NOME)):
+                self.ao_mudar(self._ler_janela())
+
+    def iniciar(self, ao_mudar):
+        self.ao_mudar = ao_mudar
+        threading.Thread(target=self._executar, daemon=True).start()
+
+    def parar(self):
+        self.parado = True
+
+
+def criar_backend_janela():
+    """
+    Escolhe o backend de rastreamento disponível na plataforma.
+
+    Returns:
+        Backend com iniciar(ao_mudar) e parar()
+    """
+    try:
+        if sys.platform == "win32":
+            return BackendJanelaWindows()
+        if os.environ.get('DISPLAY'):
+            return BackendJanelaX11()
+    except Exception:
+        # Sem suporte (ex: python-xlib ausente, Wayland) - janela desconhecida
+        pass
+    return BackendJanelaFalso()
+
+
+class RastreadorJanelaAtiva:
+    """
+    Mantém em memória a janela em primeiro plano (título, processo, PID e
+    classe da janela).
+
+    O backend atualiza self.atual quando o foco muda; no hook de teclado a
+    consulta é apenas a leitura de um atributo, sem chamadas ao Win32.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else criar_backend_janela()
+        self.atual = JANELA_DESCONHECIDA
+
+    def _atualizar(self, info):
+        # Troca atômica da tupla imutável
+        self.atual = info
+
+    def iniciar(self):
+        """
+        Inicia o backend de eventos de foco.
+        """
+        self.backend.iniciar(self._atualizar)
+
+    def parar(self):
+        """
+        Encerra o backend de eventos de foco.
+        """
+        self.backend.parar()
@@ -0,0 +1,161 @@
+# lancador.py - Lançamento dos comandos dos atalhos (resolvidos uma vez por configuração)
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+from collections import namedtuple
+
+from metricas import RegistroMetricas, agora_ns, formatar_duracao
+
+# Flag para criar nova janela de console no Windows
+FLAG_NOVA_JANELA = subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0
+
+# Caracteres que exigem o interpretador (pipes, redirecionamento, variáveis...)
+CARACTERES_SHELL = frozenset('|&;<>()$`%!^*?\n')
+
+# Lançamentos mais lentos que isso são reportados no console (milissegundos)
+LIMITE_LANCAMENTO_LENTO_MS = 250
+
+# Comando já interpretado: argv pronto para o Popen ou texto para o shell
+ComandoResolvido = namedtuple('ComandoResolvido', ['argv', 'usar_shell'])
+
+
+def _separar_argumentos(comando):
+    """
+    Divide o comando em argv respeitando aspas (regras do Windows ou POSIX).
+    """
+    if sys.platform == "win32":
+        # posix=False preserva barras invertidas; as aspas externas são removidas
+        return [
+            argumento[1:-1] if len(argumento) > 1 and argumento[0] == argumento[-1] == '"'
+            else argumento
+            for argumento in shlex.split(comando, posix=False)
+        ]
+    return shlex.split(comando)
+
+
+def resolver_comando(comando):
+    """
+    Interpreta um comando da configuração para lançamento sem shell.
+
+    - Caminho de arquivo existente: executado diretamente
+    - Programa + argumentos sem metacaracteres de shell: programa procurado
+      no PATH (shutil.which) e executado diretamente
+    - Demais casos (pipes, variáveis, comandos internos como 'start'): shell
+
+    Args:
+        comando (str): Comando configurado no atalho
+
+    Returns:
+        ComandoResolvido: argv e se o shell é necessário
+    """
+    comando = comando.strip()
+    if os.path.isfile(comando):
+        return ComandoResolvido(argv=(comando,), usar_shell=False)
+
+    if not comando or CARACTERES_SHELL.intersection(comando):
+        return ComandoResolvido(argv=comando, usar_shell=True)
+
+    try:
+        argumentos = _separar_argumentos(comando)
+    except ValueError:
+        # Aspas desbalanceadas: deixa o shell interpretar
+        return ComandoResolvido(argv=comando, usar_shell=True)
+
+    programa = shutil.which(argumentos[0]) if argumentos else None
+    if programa is None:
+        return ComandoResolvido(argv=comando, usar_shell=True)
+    return ComandoResolvido(argv=(programa, *argumentos[1:]), usar_shell=False)
+
+
+class Lancador:
+    """
+    Serviço de lançamento dos comandos dos atalhos.
+
+    Os comandos são resolvidos (PATH, existência do arquivo, separação dos
+    argumentos) a cada novo instantâneo da configuração, fora do executor;
+    lançar é apenas uma consulta em dicionário + Popen. A latência de cada
+    lançamento é registrada por comando, para encontrar atalhos lentos.
+    """
+
+    def __init__(self, observador_config=None):
+        self.resolvidos = {}
+        self.latencias = RegistroMetricas()
+        self.trava = threading.Lock()
+
+        if observador_config is not None:
+            self.preparar(observador_config.instantaneo)
+            observador_config.inscrever(self.preparar)
+
+    def preparar(self, instantaneo):
+        """
+        Resolve os comandos de todos os atalhos do instantâneo.
+
+        Args:
+            instantaneo (InstantaneoConfiguracao): Configuração publicada
+        """
+        resolvidos = {}
+        for atalho in instantaneo.atalhos:
+            comando = atalho.get('comando')
+            if isinstance(comando, str) and comando not in resolvidos:
+                resolvidos[comando] = resolver_comando(comando)
+
+        # Troca atômica do cache
+        self.resolvidos = resolvidos
+
+    def resolver(self, comando):
+        """
+        Retorna o comando resolvido (do cache, ou resolvendo na hora se o
+        comando não estiver na configuração atual).
+
+        Args:
+            comando (str): Comando do atalho
+
+        Returns:
+            ComandoResolvido: argv e se o shell é necessário
+        """
+        resolvido = self.resolvidos.get(comando)
+        if resolvido is None:
+            resolvido = resolver_comando(comando)
+        return resolvido
+
+    def lancar(self, comando):
+        """
+        Inicia o comando e registra a latência do lançamento.
+
+        Args:
+            comando (str): Comando do atalho
+
+        Raises:
+            OSError: Se o processo não puder ser criado
+        """
+        resolvido = self.resolver(comando)
+        inicio = agora_ns()
+        try:
+            if resolvido.usar_shell:
+                subprocess.Popen(resolvido.argv, shell=True)
+            else:
+                subprocess.Popen(resolvido.argv, creationflags=FLAG_NOVA_JANELA)
+        except OSError:
+            # Programa removido/movido desde a resolução: resolve de novo
+            # no próximo lançamento
+            self.resolvidos.pop(comando, None)
+            raise
+        finally:
+            duracao = agora_ns() - inicio
+            with self.trava:
+                self.latencias.registrar(comando, duracao)
+
+        if duracao > LIMITE_LANCAMENTO_LENTO_MS * 1_000_000:
+            print(f"🐢 Lançamento lento ({formatar_duracao(duracao / 1000)}): {comando}")
+
+    def resumo(self):
+        """
+        Returns:
+            dict: {comando: resumo das latências de lançamento}
+        """
+        with self.trava:
+            return self.latencias.resumo()
@@ -1,25 +1,44 @@
 # main.py (atalhos & power manager)
 
-import json
+import asyncio
 import os
 import sys
 import threading
 import time
 import subprocess
+import traceback
 import psutil
-import re
-import ctypes
 
-from pynput.keyboard import Key, KeyCode, Listener, Controller
+from pynput.keyboard import Key, Listener, Controller
 from pystray import Icon, MenuItem, Menu
 from PIL import Image
 
 from defaults import DEFAULT_CONFIG
+from agendador import AgendadorVarredura
+from backend_energia import PLANOS_ENERGIA_FIXOS, criar_backend_energia
+from catalogo_planos import (NOME_ARQUIVO_CATALOGO, RANKING_PADRAO, CatalogoPlanos,
+                             ler_ranking_planos, prioridades_por_ranking)
+from despacho_atalhos import IndiceAtalhos, chave_evento
+from eventos_processos import criar_fonte_eventos
+from executor_acoes import AcaoComando, AcaoTeclas, ExecutorAcoes, ExecutorNucleo
+from janela_ativa import RastreadorJanelaAtiva, eh_calculadora
+from lancador import Lancador
+from metricas import (SECAO_DESPACHO, SECAO_HOOK, SECAO_JANELA, SECAO_RECARGA,
+                      HistoricoCiclos, agora_ns, formatar_duracao, registro_metricas)
+from nucleo import Nucleo
+from servidor_status import PORTA_STATUS_PADRAO, ServidorStatus
+from observador_config import ObservadorConfiguracao, salvar_configuracao_atomica
+from politica_troca import POLITICA_PADRAO, HistereseTroca, ler_politica_troca
+from prioridades import RegistroPrioridades
+from processos import CorrespondenteProcessos, TabelaProcessos
+from resolvedor_planos import ResolvedorPlanos
+from teclas import MODIFICADORES_POR_TECLA
 
 # Configuração do diretório de config no %APPDATA%
 APPDATA = os.environ.get('APPDATA', os.path.expanduser('~\\AppData\\Roaming'))
 CONFIG_DIR = os.path.join(APPDATA, 'TurboAtalho')
 ARQUIVO_CONFIG = os.path.join(CONFIG_DIR, 'config.json')
+ARQUIVO_CATALOGO_PLANOS = os.path.join(CONFIG_DIR, NOME_ARQUIVO_CATALOGO)
 
 # Garante que o diretório existe
 os.makedirs(CONFIG_DIR, exist_ok=True)
@@ -27,91 +46,85 @@ os.makedirs(CONFIG_DIR, exist_ok=True)
 # Caminhos e configurações principais
 DIRETORIO_ATUAL = os.path.dirname(__file__)
 
-# Configurações de monitoramento e timing
-INTERVALO_MONITORAMENTO = 2    # Intervalo em segundos para verificar processos
-TEMPO_DUPLO_CLIQUE = 0.5    # Tempo máximo entre pressões para atalho duplo
-
 # Controlador do teclado para enviar teclas programaticamente
 controlador_teclado = Controller()
 
-# Mapeamento de prioridades para psutil (Windows)
-MAPA_PRIORIDADES = {
-    "Normal": psutil.NORMAL_PRIORITY_CLASS,
-    "Acima do normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
-    "Alta":   psutil.HIGH_PRIORITY_CLASS
-}
+# Shift+5 simulado para enviar '%' na Calculadora
+ACAO_PORCENTAGEM = AcaoTeclas((
+    ('press', Key.shift),
+    ('press', '5'),
+    ('release', '5'),
+    ('release', Key.shift),
+))
+
+# Mapeamento de prioridades para psutil (classes no Windows, nice nos demais)
+if sys.platform == "win32":
+    MAPA_PRIORIDADES = {
+        "Normal": psutil.NORMAL_PRIORITY_CLASS,
+        "Acima do normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+        "Alta":   psutil.HIGH_PRIORITY_CLASS
+    }
+else:
+    MAPA_PRIORIDADES = {
+        "Normal": 0,
+        "Acima do normal": -5,
+        "Alta":   -10
+    }
 
-# GUIDs dos planos de energia fixos (apenas os 3 básicos que funcionam sempre)
-PLANOS_ENERGIA_FIXOS = {
-    "Alto desempenho":      "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
-    "Equilibrado":          "381b4222-f694-41f0-9685-ff5bb260df2e",
-    "Economia de energia":  "a1841308-3541-4fab-bc81-f71556f20b4a"
-}
+# Releitura do plano ativo no sistema (segundos); com notificações do
+# sistema a releitura periódica é só uma rede de segurança. Backends cuja
+# leitura inicia um processo (powercfg /getactivescheme) releem raramente
+INTERVALO_VERIFICACAO_PLANO = 5.0
+INTERVALO_VERIFICACAO_PLANO_NOTIFICADO = 60.0
+INTERVALO_VERIFICACAO_PLANO_CUSTOSO = 120.0
 
-# Flag para criar nova janela de console no Windows
-FLAG_NOVA_JANELA = subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0
+# Espera mínima até uma pendência da histerese já vencida (segundos), para
+# que um prazo no passado não vire um laço sem espera
+INTERVALO_MINIMO_PENDENCIA = 0.05
 
 
-def obter_titulo_janela_ativa():
-    """
-    Obtém o título da janela atualmente em foco no Windows.
 
-    Returns:
-        str: Título da janela ativa
+def garantir_arquivo_configuracao():
     """
-    try:
-        user32 = ctypes.WinDLL('user32', use_last_error=True)
-        hwnd = user32.GetForegroundWindow()
-        tamanho = user32.GetWindowTextLengthW(hwnd)
-        buffer = ctypes.create_unicode_buffer(tamanho + 1)
-        user32.GetWindowTextW(hwnd, buffer, tamanho + 1)
-        return buffer.value
-    except Exception:
-        # Se falhar, retorna string vazia
-        return ""
+    Cria o arquivo de configuração com os valores padrão se não existir.
+    """
+    if not os.path.exists(ARQUIVO_CONFIG):
+        salvar_configuracao_atomica(ARQUIVO_CONFIG, DEFAULT_CONFIG)
 
 
-def carregar_configuracoes():
+def injetar_teclas(acao):
     """
-    Carrega as configurações do arquivo JSON ou cria com padrões se não existir.
+    Envia uma sequência de teclas simuladas.
 
-    Returns:
-        dict: Configurações carregadas
+    Args:
+        acao (AcaoTeclas): Sequência de ('press' | 'release', tecla)
     """
-    if not os.path.exists(ARQUIVO_CONFIG):
-        # Cria arquivo de configuração com valores padrão
-        with open(ARQUIVO_CONFIG, 'w', encoding='utf-8') as arquivo:
-            json.dump(DEFAULT_CONFIG, arquivo, indent=4, ensure_ascii=False)
-        return DEFAULT_CONFIG.copy()
-
-    try:
-        with open(ARQUIVO_CONFIG, 'r', encoding='utf-8') as arquivo:
-            return json.load(arquivo)
-    except (json.JSONDecodeError, FileNotFoundError):
-        # Se arquivo corrompido, retorna configurações padrão
-        return DEFAULT_CONFIG.copy()
+    for tipo, tecla in acao.sequencia:
+        if tipo == 'press':
+            controlador_teclado.press(tecla)
+        else:
+            controlador_teclado.release(tecla)
 
 
-def executar_comando(comando):
+def criar_executor_acoes(lancador, nucleo=None):
     """
-    Executa um comando no sistema.
-
-    - Se for arquivo executável (.exe): abre em nova janela de console
-    - Caso contrário: executa no shell atual
+    Cria o executor que roda comandos e injeções de teclas fora do hook.
 
     Args:
-        comando (str): Comando ou caminho do executável a ser executado
+        lancador (Lancador): Serviço que inicia os comandos dos atalhos
+        nucleo (Nucleo): Se informado, as ações rodam no núcleo asyncio
+            em vez de um pool de threads próprio
+
+    Returns:
+        ExecutorAcoes: Executor ainda não iniciado
     """
-    try:
-        if os.path.isfile(comando) or comando.lower().endswith('.exe'):
-            # Executável - abre em nova janela
-            subprocess.Popen([comando], creationflags=FLAG_NOVA_JANELA)
-        else:
-            # Comando shell - executa normalmente
-            subprocess.Popen(comando, shell=True)
-    except Exception as erro:
-        # Se falhar, continua silenciosamente (aplicação em background)
-        pass
+    executores = {
+        AcaoComando: lambda acao: lancador.lancar(acao.comando),
+        AcaoTeclas: injetar_teclas,
+    }
+    if nucleo is not None:
+        return ExecutorNucleo(executores, nucleo)
+    return ExecutorAcoes(executores)
 
 
 class GerenciadorAtalhos:
@@ -122,122 +135,329 @@ class GerenciadorAtalhos:
     duplo-pressionamento das teclas configuradas.
     """
 
-    def __init__(self):
-        configuracoes = carregar_configuracoes()
+    def __init__(self, observador_config, executor_acoes, rastreador_janela, nucleo=None):
+        # Ações são apenas enfileiradas aqui; o executor roda fora do hook
+        self.executor_acoes = executor_acoes
 
-        # Configurações de atalhos
-        self.atalhos_configurados = configuracoes["atalhos"]
-        self.atalho_calculadora_ativo = configuracoes.get(
-            "enable_calc_percent", True)
+        # Expirações dos atalhos pendentes são agendadas no núcleo (sem
+        # núcleo, cada uma usa um threading.Timer)
+        self.nucleo = nucleo
 
-        # Controle de modificação do arquivo
-        self.timestamp_config = os.path.getmtime(ARQUIVO_CONFIG)
+        # Janela em primeiro plano mantida em cache (leitura sem Win32)
+        self.rastreador_janela = rastreador_janela
 
-        # Histórico de teclas pressionadas (para detectar duplo-clique)
-        self.historico_teclas = {}
+        # Autômatos compilados dos atalhos (multi-pressionamento, combinações
+        # e sequências), indexados pelo aplicativo em primeiro plano; cada
+        # um guarda também o estado da sequência em andamento
+        self.indice = IndiceAtalhos()
+        self.atalho_calculadora_ativo = True
 
-    def recarregar_se_necessario(self):
+        # Modificadores (ctrl, alt, shift, cmd) pressionados no momento
+        self.modificadores_pressionados = frozenset()
+        self.listener = None
+
+        # Relógio das janelas de tempo (substituível em benchmarks/replay)
+        self.relogio = time.monotonic
+
+        # Recompila a cada novo instantâneo publicado pelo observador
+        self._aplicar_configuracao(observador_config.instantaneo)
+        observador_config.inscrever(self._aplicar_configuracao)
+
+    def _aplicar_configuracao(self, instantaneo):
         """
-        Verifica se o arquivo de configuração foi modificado e recarrega se necessário.
+        Compila os atalhos do instantâneo e troca o autômato de uma só vez.
+
+        Executado no núcleo (ou na thread do observador); o hook apenas lê
+        os atributos.
+        Teclas inválidas são reportadas uma única vez, no carregamento.
+
+        Args:
+            instantaneo (InstantaneoConfiguracao): Configuração publicada
         """
-        try:
-            timestamp_atual = os.path.getmtime(ARQUIVO_CONFIG)
-            if timestamp_atual != self.timestamp_config:
-                # Arquivo foi modificado - recarrega configurações
-                configuracoes = carregar_configuracoes()
-                self.atalhos_configurados = configuracoes["atalhos"]
-                self.atalho_calculadora_ativo = configuracoes.get(
-                    "enable_calc_percent", True)
-                self.timestamp_config = timestamp_atual
-        except OSError:
-            # Se arquivo não existir ou erro de acesso, mantém configurações atuais
-            pass
+        inicio = agora_ns()
+        indice = IndiceAtalhos()
+        for erro in indice.compilar(instantaneo.atalhos):
+            print(f"⚠️ Atalho ignorado: {erro}")
+
+        self.indice = indice
+        self.atalho_calculadora_ativo = instantaneo.enable_calc_percent
+        registro_metricas.registrar(SECAO_RECARGA, agora_ns() - inicio)
 
     def ao_pressionar_tecla(self, tecla):
         """
         Handler chamado quando uma tecla é pressionada.
 
+        Args:
+            tecla: Objeto Key ou KeyCode da tecla pressionada
+        """
+        inicio = agora_ns()
+        try:
+            self._processar_tecla(tecla)
+        finally:
+            registro_metricas.registrar(SECAO_HOOK, agora_ns() - inicio)
+
+    def _processar_tecla(self, tecla):
+        """
+        Corpo do handler de tecla pressionada (medido por ao_pressionar_tecla).
+
         Args:
             tecla: Objeto Key ou KeyCode da tecla pressionada
         """
         # Atalho especial: Shift direito na Calculadora envia '%'
-        if (self.atalho_calculadora_ativo and
-            tecla == Key.shift_r and
-                obter_titulo_janela_ativa() == "Calculadora"):
-
-            # Simula Shift+5 para enviar '%'
-            controlador_teclado.press(Key.shift)
-            controlador_teclado.press('5')
-            controlador_teclado.release('5')
-            controlador_teclado.release(Key.shift)
+        if self.atalho_calculadora_ativo and tecla == Key.shift_r:
+            inicio = agora_ns()
+            na_calculadora = eh_calculadora(self.rastreador_janela.atual)
+            registro_metricas.registrar(SECAO_JANELA, agora_ns() - inicio)
+
+            if na_calculadora:
+                # Simula Shift+5 para enviar '%'
+                self.executor_acoes.enfileirar(ACAO_PORCENTAGEM)
+                return
+
+        # Verifica atalhos configuráveis (relógio monotônico para as janelas)
+        tempo_atual = self.relogio()
+
+        modificadores = self.modificadores_pressionados
+        if modificadores and self.listener is not None:
+            # Remove o efeito dos modificadores (ex: Ctrl+X chega como '\x18')
+            tecla = self.listener.canonical(tecla)
+
+        # Autômato do aplicativo em foco + um passo, independente do número
+        # de atalhos e de perfis
+        inicio = agora_ns()
+        automato = self.indice.automato_para(self.rastreador_janela.atual)
+        comandos, prazo_pendente = automato.processar(
+            chave_evento(tecla, modificadores), tempo_atual)
+        registro_metricas.registrar(SECAO_DESPACHO, agora_ns() - inicio)
+
+        # Atalho completo - enfileira os comandos
+        for comando in comandos:
+            self.executor_acoes.enfileirar(AcaoComando(comando))
+
+        # Atalho ambíguo (ex: duplo e triplo na mesma tecla) aguarda a janela
+        if prazo_pendente is not None:
+            self._agendar_expiracao(automato, prazo_pendente)
+
+        # Registra o modificador depois da busca, para que a própria tecla
+        # modificadora (ex: Key.ctrl_l) possa ser usada como atalho
+        modificador = MODIFICADORES_POR_TECLA.get(getattr(tecla, 'name', None))
+        if modificador:
+            self.modificadores_pressionados = modificadores | {modificador}
+
+    def _agendar_expiracao(self, automato, prazo):
+        """
+        Agenda o disparo do atalho pendente quando sua janela expirar.
+
+        Args:
+            automato (AutomatoAtalhos): Autômato com o disparo pendente
+            prazo (float): Momento (relógio monotônico) de expiração
+        """
+        def expirar():
+            for comando in automato.expirar(self.relogio()):
+                self.executor_acoes.enfileirar(AcaoComando(comando))
+
+        atraso = max(0.0, prazo - self.relogio()) + 0.001
+        if self.nucleo is not None:
+            self.nucleo.agendar(atraso, expirar)
             return
 
-        # Verifica atalhos configuráveis (duplo-pressionamento)
-        self.recarregar_se_necessario()
-        tempo_atual = time.time()
-
-        for atalho in self.atalhos_configurados:
-            # Converte string da configuração para objeto tecla
-            try:
-                tecla_configurada = eval(atalho['tecla'])
-            except (NameError, SyntaxError):
-                # Se eval falhar, usa como string literal
-                tecla_configurada = atalho['tecla']
-
-            # Verifica se a tecla pressionada corresponde à configurada
-            tecla_corresponde = (
-                tecla == tecla_configurada or
-                (isinstance(tecla, KeyCode) and
-                 getattr(tecla, 'char', None) == tecla_configurada)
-            )
-
-            if not tecla_corresponde:
-                continue
+        temporizador = threading.Timer(atraso, expirar)
+        temporizador.daemon = True
+        temporizador.start()
 
-            # Verifica duplo-pressionamento
-            chave_atalho = atalho['tecla']
-            tempo_anterior = self.historico_teclas.get(chave_atalho)
+    def ao_soltar_tecla(self, tecla):
+        """
+        Handler chamado quando uma tecla é solta (atualiza os modificadores).
 
-            if tempo_anterior and (tempo_atual - tempo_anterior) < TEMPO_DUPLO_CLIQUE:
-                # Duplo-pressionamento detectado - executa comando
-                executar_comando(atalho['comando'])
-                # Reset para evitar triplo
-                self.historico_teclas[chave_atalho] = None
-            else:
-                # Primeira pressão - salva timestamp
-                self.historico_teclas[chave_atalho] = tempo_atual
+        Args:
+            tecla: Objeto Key ou KeyCode da tecla solta
+        """
+        modificador = MODIFICADORES_POR_TECLA.get(getattr(tecla, 'name', None))
+        if modificador:
+            self.modificadores_pressionados = (
+                self.modificadores_pressionados - {modificador})
 
     def iniciar_monitoramento(self):
         """
         Inicia o listener de teclado em thread separada.
         """
-        Listener(on_press=self.ao_pressionar_tecla).start()
+        self.listener = Listener(
+            on_press=self.ao_pressionar_tecla,
+            on_release=self.ao_soltar_tecla)
+        self.listener.start()
+
+    def parar_monitoramento(self):
+        """
+        Remove o hook de teclado.
+        """
+        if self.listener is not None:
+            self.listener.stop()
 
 
 class GerenciadorPlanoEnergia:
     """
     Classe para gerenciar planos de energia considerando prioridades e múltiplos processos.
 
-    Hierarquia de prioridade (do maior para menor):
-    1. Alto desempenho
-    2. Equilibrado  
-    3. Economia de energia
+    Os planos disponíveis vêm do catálogo (enumerado pelo backend, inclusive
+    planos personalizados). Precedência do plano necessário:
+
+    1. Com monitores ativos: o power_on mais bem colocado no ranking
+       ("ranking_planos" no config.json; padrão: Alto desempenho,
+       Equilibrado, Economia de energia), mantido por um heap de máximo
+       com contagem (resolvedor_planos.py)
+    2. Sem monitores ativos: o power_off do último monitor que parou (se
+       vários pararam juntos, o power_off mais bem colocado no ranking)
+    3. Nenhum monitor parou ainda: o plano em uso não é alterado
+
+    plano_atual é o plano realmente ativo no sistema: lido na inicialização
+    e acompanhado (notificação do backend ou releitura periódica). Uma
+    troca só é feita quando o plano real difere do desejado. Se outro
+    programa ou o usuário trocar o plano, a troca é reportada e respeitada
+    até o plano desejado mudar (não há disputa a cada ciclo).
+
+    Inícios e fins dos monitores passam pela histerese (politica_troca.py):
+    confirmação do início, tolerância da parada e permanência mínima do
+    plano, para que processos de vida curta não alternem o plano.
     """
 
-    PRIORIDADE_PLANOS = {
-        "Alto desempenho": 3,
-        "Equilibrado": 2,
-        "Economia de energia": 1
-    }
-
-    def __init__(self):
-        self.plano_atual = None
+    def __init__(self, backend=None, relogio=time.monotonic, politica=POLITICA_PADRAO,
+                 arquivo_catalogo=None):
+        """
+        Args:
+            backend (BackendEnergia): Mecanismo de troca de plano (padrão:
+                criar_backend_energia(); substituível em benchmarks)
+            relogio (callable): Relógio monotônico das releituras e da
+                histerese
+            politica (PoliticaTroca): Janelas da histerese
+            arquivo_catalogo (str): planos.json compartilhado com o
+                configurador (None: catálogo só em memória)
+        """
         self.processos_ativos = {}  # {nome_processo: config_processo}
-        
-        # Debug: mostra planos disponíveis
-        print("🔧 GerenciadorPlanoEnergia inicializado com planos fixos:")
-        for nome, guid in PLANOS_ENERGIA_FIXOS.items():
-            print(f"  {nome} → {guid}")
+        self.trocas_plano = 0
+        self.backend = (backend if backend is not None
+                        else criar_backend_energia(PLANOS_ENERGIA_FIXOS))
+        print(f"🔧 GerenciadorPlanoEnergia inicializado ({self.backend.nome})")
+
+        # Planos disponíveis (enumerados uma vez aqui; de novo quando o
+        # sistema notifica uma troca ou aparece um plano desconhecido)
+        self.catalogo = CatalogoPlanos(self.backend, arquivo_catalogo)
+        self.catalogo.atualizar()
+        self.ranking = RANKING_PADRAO
+        self.prioridades_planos = prioridades_por_ranking(RANKING_PADRAO)
+
+        # power_on pedidos pelos monitores ativos e o power_off a aplicar
+        # quando o último deles parar
+        self.resolvedor = ResolvedorPlanos(self.prioridades_planos)
+        self.plano_repouso = None
+
+        # Estado real do sistema (None se o backend não consegue ler)
+        self.plano_atual = self.backend.ler_ativo()
+        self.plano_desejado = None
+        self.sobrescrito = False
+        self.sobrescritas_externas = 0
+        print(f"   Plano ativo no sistema: {self.plano_atual or 'desconhecido'}")
+
+        # Releitura periódica, adiantada quando o backend notifica uma troca
+        self.relogio = relogio
+        self.alteracao_notificada = False
+        self.ao_notificar = None
+        if self.backend.observar(self._notificar_alteracao):
+            self.intervalo_verificacao = INTERVALO_VERIFICACAO_PLANO_NOTIFICADO
+        elif self.backend.leitura_custosa:
+            self.intervalo_verificacao = INTERVALO_VERIFICACAO_PLANO_CUSTOSO
+        else:
+            self.intervalo_verificacao = INTERVALO_VERIFICACAO_PLANO
+        self.proxima_verificacao = relogio() + self.intervalo_verificacao
+
+        # Inícios/fins pendentes e permanência mínima do plano
+        self.histerese = HistereseTroca(politica, relogio)
+
+    def definir_ranking(self, ranking):
+        """
+        Define a ordem de preferência dos planos (recarga da configuração).
+
+        Args:
+            ranking (tuple): Nomes dos planos, do mais prioritário para o menos
+
+        Returns:
+            bool: True se o ranking mudou
+        """
+        alterado = ranking != self.ranking
+        self.ranking = ranking
+        self.prioridades_planos = prioridades_por_ranking(ranking)
+        if alterado:
+            self.resolvedor.definir_prioridades(self.prioridades_planos)
+        return alterado
+
+    def _ativar_monitor(self, nome_processo, config_processo):
+        anterior = self.processos_ativos.get(nome_processo)
+        if anterior is not None:
+            self.resolvedor.remover(anterior['power_on'])
+        self.processos_ativos[nome_processo] = config_processo
+        self.resolvedor.adicionar(config_processo['power_on'])
+
+    def _desativar_monitores(self, nomes_processos):
+        """
+        Tira os monitores dos ativos e registra o power_off a aplicar se
+        eram os últimos (entre os que pararam juntos, o mais bem colocado).
+
+        Returns:
+            bool: True se algum monitor estava ativo
+        """
+        planos_parada = []
+        for nome_processo in nomes_processos:
+            config_processo = self.processos_ativos.pop(nome_processo, None)
+            if config_processo is None:
+                continue
+            print(f"🔴 Processo PARADO: {nome_processo}")
+            self.resolvedor.remover(config_processo['power_on'])
+            planos_parada.append(config_processo['power_off'])
+
+        if planos_parada:
+            self.plano_repouso = max(
+                planos_parada, key=lambda plano: self.prioridades_planos.get(plano, 0))
+        return bool(planos_parada)
+
+    def _notificar_alteracao(self):
+        # Thread do sistema: apenas marca e acorda o laço de monitoramento
+        self.alteracao_notificada = True
+        if self.ao_notificar is not None:
+            self.ao_notificar()
+
+    def verificar_plano_ativo(self):
+        """
+        Relê o plano ativo quando notificado ou a cada intervalo_verificacao
+        e reporta trocas feitas fora do TurboAtalho.
+
+        Returns:
+            bool: True se o plano foi alterado externamente
+        """
+        agora = self.relogio()
+        notificado = self.alteracao_notificada
+        if not notificado and agora < self.proxima_verificacao:
+            return False
+        self.alteracao_notificada = False
+        self.proxima_verificacao = agora + self.intervalo_verificacao
+
+        plano_real = self.backend.ler_ativo()
+        if (plano_real is not None and plano_real != self.plano_atual and
+                plano_real not in self.catalogo.planos):
+            # Plano criado ou importado depois da enumeração: relê o catálogo
+            if self.catalogo.atualizar():
+                plano_real = self.backend.ler_ativo()
+        elif notificado:
+            self.catalogo.atualizar()
+        if plano_real is None or plano_real == self.plano_atual:
+            return False
+
+        print(f"👀 Plano alterado externamente: {self.plano_atual or 'desconhecido'} → {plano_real}")
+        self.plano_atual = plano_real
+        self.sobrescrito = self.plano_desejado is not None and plano_real != self.plano_desejado
+        if self.sobrescrito:
+            self.sobrescritas_externas += 1
+            print(f"   Mantendo a escolha externa até o plano necessário mudar "
+                  f"(desejado: {self.plano_desejado})")
+        return True
 
     def adicionar_processo_ativo(self, nome_processo, config_processo):
         """
@@ -249,8 +469,12 @@ class GerenciadorPlanoEnergia:
         """
         print(f"🟢 Processo INICIADO: {nome_processo}")
         print(f"   Configuração: {config_processo}")
-        
-        self.processos_ativos[nome_processo] = config_processo
+
+        # Aguardando confirmação (ou reinício dentro da tolerância de parada)
+        if not self.histerese.iniciar(nome_processo, config_processo):
+            return
+
+        self._ativar_monitor(nome_processo, config_processo)
         self._aplicar_plano_necessario()
 
     def remover_processo_ativo(self, nome_processo):
@@ -260,33 +484,87 @@ class GerenciadorPlanoEnergia:
         Args:
             nome_processo (str): Nome do processo a remover
         """
-        if nome_processo in self.processos_ativos:
-            print(f"🔴 Processo PARADO: {nome_processo}")
-            del self.processos_ativos[nome_processo]
+        # Parada dentro da tolerância (ou início ainda não confirmado)
+        if not self.histerese.parar(nome_processo):
+            return
+
+        self._desativar_monitores((nome_processo,))
         self._aplicar_plano_necessario()
 
-    def _obter_plano_maior_prioridade(self):
+    def processar_pendencias(self):
         """
-        Determina qual plano de energia deve ser usado baseado nos processos ativos.
+        Aplica os inícios confirmados e as paradas cuja tolerância venceu,
+        e a troca adiada quando a permanência mínima termina. Chamado a
+        cada ciclo; recalcula o plano no máximo uma vez.
+        """
+        confirmados, parados = self.histerese.vencidos()
+        self._desativar_monitores(parados)
+        for nome_processo, config_processo in confirmados.items():
+            print(f"🟢 Processo CONFIRMADO: {nome_processo}")
+            self._ativar_monitor(nome_processo, config_processo)
+
+        if (confirmados or parados or
+                self.histerese.troca_adiada and self.histerese.troca_permitida()):
+            self._aplicar_plano_necessario()
 
+    def segundos_ate_pendencia(self):
+        """
         Returns:
-            str: Nome do plano de energia com maior prioridade, ou "Equilibrado" se nenhum processo ativo
+            float: Segundos até a próxima pendência da histerese, ou None
         """
-        if not self.processos_ativos:
-            return "Equilibrado"  # Plano padrão quando nenhum processo monitorado está ativo
+        prazo = self.histerese.proximo_prazo()
+        if prazo is None:
+            return None
+        return max(0.0, prazo - self.relogio())
 
-        maior_prioridade = 0
-        plano_necessario = "Equilibrado"
+    def reconciliar(self, ativos, removidos, recalcular=False):
+        """
+        Aplica várias mudanças de uma vez (recarga da configuração) e
+        recalcula o plano uma única vez no final. Os processos já foram
+        observados, então não passam pela confirmação/tolerância da
+        histerese (a permanência mínima continua valendo).
+
+        Args:
+            ativos (dict): {nome_processo: config_processo} ativos novos ou
+                com configuração alterada
+            removidos (iterable): Nomes que deixaram de estar ativos
+            recalcular (bool): Recalcula o plano mesmo sem mudanças (ranking
+                alterado)
+        """
+        removidos = list(removidos)
+        for nome_processo in removidos:
+            self.histerese.esquecer(nome_processo)
+        alterado = self._desativar_monitores(removidos)
+        for nome_processo, config_processo in ativos.items():
+            self.histerese.esquecer(nome_processo)
+            if self.processos_ativos.get(nome_processo) != config_processo:
+                print(f"🟢 Processo ATIVO: {nome_processo}")
+                self._ativar_monitor(nome_processo, config_processo)
+                alterado = True
+
+        if alterado or recalcular:
+            self._aplicar_plano_necessario()
 
-        for config_processo in self.processos_ativos.values():
-            plano_on = config_processo['power_on']
-            prioridade = self.PRIORIDADE_PLANOS.get(plano_on, 0)
+    def _obter_plano_maior_prioridade(self):
+        """
+        Determina qual plano de energia deve ser usado (precedência na
+        docstring da classe). O(log n) amortizado pelo resolvedor.
 
-            if prioridade > maior_prioridade:
-                maior_prioridade = prioridade
-                plano_necessario = plano_on
+        Returns:
+            str: Nome do plano necessário, ou None se o plano em uso deve
+                ser mantido (nenhum monitor ativo nem parado)
+        """
+        plano_necessario = self.resolvedor.melhor()
+        if plano_necessario is not None:
+            origem = "power_on"
+        else:
+            plano_necessario = self.plano_repouso
+            origem = "power_off"
+            if plano_necessario is None:
+                return None
 
-        print(f"🔍 Plano necessário calculado: {plano_necessario} (prioridade {maior_prioridade})")
+        print(f"🔍 Plano necessário calculado: {plano_necessario} ({origem}, "
+              f"prioridade {self.prioridades_planos.get(plano_necessario, 0)})")
         return plano_necessario
 
     def _aplicar_plano_necessario(self):
@@ -294,50 +572,62 @@ class GerenciadorPlanoEnergia:
         Aplica o plano de energia necessário baseado nos processos ativos.
         """
         plano_necessario = self._obter_plano_maior_prioridade()
+        if plano_necessario is None:
+            print("ℹ️ Nenhum monitor ativo ou parado; mantendo o plano em uso")
+            return
+
+        # Plano que não estava no catálogo (criado depois da enumeração)
+        if self.catalogo.planos and plano_necessario not in self.catalogo.planos:
+            self.catalogo.atualizar()
+
+        # Plano trocado por fora enquanto o desejado não mudou: respeita
+        if self.sobrescrito and plano_necessario == self.plano_desejado:
+            print(f"ℹ️ Plano {self.plano_atual} escolhido externamente; mantendo")
+            return
+        self.plano_desejado = plano_necessario
+        self.sobrescrito = False
 
-        # Só muda o plano se for diferente do atual
+        # Só muda o plano se o estado real for diferente do desejado
         if self.plano_atual != plano_necessario:
+            # Plano atual aplicado há pouco: a troca fica para o fim da
+            # permanência mínima (com o plano necessário daquele momento)
+            if not self.histerese.troca_permitida():
+                self.histerese.adiar(plano_necessario)
+                return
+
             print(f"⚡ Mudando plano: {self.plano_atual or 'desconhecido'} → {plano_necessario}")
-            sucesso = self._definir_plano_energia(plano_necessario)
+            sucesso = self.backend.ativar(plano_necessario)
             if sucesso:
                 self.plano_atual = plano_necessario
+                self.trocas_plano += 1
+                self.histerese.registrar_troca()
                 print(f"✅ Plano alterado com sucesso para: {plano_necessario}")
             else:
                 print(f"❌ Falha ao alterar para: {plano_necessario}")
         else:
+            self.histerese.troca_adiada = False
             print(f"ℹ️ Plano já está correto: {plano_necessario}")
 
-    def _definir_plano_energia(self, nome_plano):
+    def resumo(self):
         """
-        Define o plano de energia do sistema usando GUIDs fixos.
-
-        Args:
-            nome_plano (str): Nome do plano de energia a ser aplicado
-            
         Returns:
-            bool: True se sucesso, False se falhou
+            dict: Plano real e desejado, trocas, sobrescritas externas,
+            pendências da histerese, planos do catálogo, ranking e o resumo
+            do backend (latência das trocas)
         """
-        # Usa apenas os planos fixos - sem detecção dinâmica
-        guid_plano = PLANOS_ENERGIA_FIXOS.get(nome_plano)
-
-        if not guid_plano:
-            print(f"❌ Plano '{nome_plano}' não está nos planos fixos suportados")
-            return False
-
-        try:
-            print(f"🔧 Executando: powercfg -setactive {guid_plano}")
-            subprocess.run(
-                ["powercfg", "-setactive", guid_plano],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Erro ao executar powercfg: {e}")
-            print(f"   stdout: {e.stdout}")
-            print(f"   stderr: {e.stderr}")
-            return False
+        return {
+            'plano_atual': self.plano_atual,
+            'plano_desejado': self.plano_desejado,
+            'sobrescrito': self.sobrescrito,
+            'trocas_plano': self.trocas_plano,
+            'sobrescritas_externas': self.sobrescritas_externas,
+            'histerese': self.histerese.resumo(),
+            'planos': list(self.catalogo.planos),
+            'planos_pedidos': dict(self.resolvedor.contagem),
+            'plano_repouso': self.plano_repouso,
+            'ranking': list(self.ranking),
+            'backend': self.backend.resumo(),
+        }
 
 
 class GerenciadorEnergia:
@@ -346,81 +636,289 @@ class GerenciadorEnergia:
     os planos de energia e prioridades baseado nos processos em execução.
     """
 
-    def __init__(self):
-        configuracoes = carregar_configuracoes()
-
-        # Configurações de monitoramento
-        self.processos_monitorados = configuracoes["monitores"]
-        self.timestamp_config = os.path.getmtime(ARQUIVO_CONFIG)
+    def __init__(self, observador_config, fonte_eventos=None, gerenciador_plano=None,
+                 listar_pids=None, abrir_processo=None):
+        """
+        Args:
+            observador_config (ObservadorConfiguracao): Fonte dos instantâneos
+            fonte_eventos: Fonte de início/fim de processos (padrão:
+                criar_fonte_eventos())
+            gerenciador_plano (GerenciadorPlanoEnergia): Padrão: um novo
+            listar_pids, abrir_processo (callable): Provedor da tabela de
+                processos (padrão: psutil; substituíveis em benchmarks)
+        """
+        # Configurações de monitoramento (instantâneo publicado pelo observador)
+        self.observador_config = observador_config
+        self.instantaneo_config = observador_config.instantaneo
+        self.processos_monitorados = self.instantaneo_config.monitores
+
+        # Regras dos monitores compiladas em um único correspondente + cache
+        # incremental da tabela de processos: cada ciclo consulta apenas PIDs
+        # novos. Regras que não compilam não derrubam o daemon: começa sem
+        # monitores e a próxima configuração válida os carrega
+        try:
+            self.correspondente_processos = CorrespondenteProcessos(self.processos_monitorados)
+        except ValueError as erro:
+            print(f"⚠️ Monitores ignorados: {erro}")
+            self.processos_monitorados = ()
+            self.correspondente_processos = CorrespondenteProcessos(())
+        self.tabela_processos = TabelaProcessos(
+            self.correspondente_processos, listar_pids, abrir_processo)
+
+        # Início/fim de processos por eventos do sistema (polling como fallback);
+        # uma nova configuração também acorda o laço de monitoramento
+        self.fonte_eventos = (fonte_eventos if fonte_eventos is not None
+                              else criar_fonte_eventos())
+        observador_config.inscrever(lambda instantaneo: self.fonte_eventos.despertar())
+
+        # Intervalo entre varreduras adaptado às latências desejadas por
+        # monitor, à atividade recente, à ociosidade e à bateria
+        self.agendador = AgendadorVarredura(self.processos_monitorados)
 
         # Gerenciador de planos de energia
-        self.gerenciador_plano = GerenciadorPlanoEnergia()
+        self.gerenciador_plano = (gerenciador_plano if gerenciador_plano is not None
+                                  else GerenciadorPlanoEnergia())
+        # Troca de plano notificada pelo sistema acorda o laço para releitura
+        self.gerenciador_plano.ao_notificar = self.fonte_eventos.despertar
+        self.gerenciador_plano.histerese.configurar(
+            ler_politica_troca(self.instantaneo_config.dados))
+        self.gerenciador_plano.definir_ranking(ler_ranking_planos(self.instantaneo_config.dados))
+
+        # Custo de cada ciclo (buffer circular exposto no endpoint de status)
+        self.historico_ciclos = HistoricoCiclos()
+        self.erros_reportados = set()
+
+        # Prioridade aplicada por PID (novas instâncias, filhos e desvios)
+        self.registro_prioridades = RegistroPrioridades()
 
         # Inicializa estado dos processos verificando se já estão rodando
         self.estado_processos = {}
         
         print("🔍 Inicializando monitoramento de processos...")
         print(f"   Processos configurados: {len(self.processos_monitorados)}")
-        
+
+        varredura = self.tabela_processos.atualizar()
+        ativos = {}
         for processo in self.processos_monitorados:
             nome_processo = processo['process'].lower()
-            processos_ativos = [
-                p for p in psutil.process_iter(['name'])
-                if (p.info['name'] and
-                    p.info['name'].lower().startswith(nome_processo))
-            ]
+            processo_ativo = bool(varredura.pids_por_monitor[nome_processo])
 
-            self.estado_processos[nome_processo] = bool(processos_ativos)
+            self.estado_processos[nome_processo] = processo_ativo
             
-            print(f"   {nome_processo}: {'🟢 ATIVO' if processos_ativos else '⚫ PARADO'}")
+            print(f"   {nome_processo}: {'🟢 ATIVO' if processo_ativo else '⚫ PARADO'}")
 
             # Se processo já está ativo, adiciona ao gerenciador
-            if processos_ativos:
-                self.gerenciador_plano.adicionar_processo_ativo(
-                    nome_processo, processo)
+            if processo_ativo:
+                ativos[nome_processo] = processo
+
+        # Plano calculado uma única vez para todos os já ativos
+        self.gerenciador_plano.reconciliar(ativos, ())
+
+    def _sincronizar_prioridades(self, varredura, pids_novos=()):
+        """
+        Garante a prioridade configurada em todas as instâncias de cada
+        monitor ativo (e nos descendentes, com "filhos": true). O livro-razão
+        só emite nice() para PIDs novos, prioridade alterada ou desvio.
+
+        Args:
+            varredura (ResultadoVarredura): PIDs por monitor do ciclo
+            pids_novos (iterable): PIDs que surgiram neste ciclo
+        """
+        niveis = list(MAPA_PRIORIDADES)
+        alvos = {}
+        for config_processo in self.processos_monitorados:
+            pids = varredura.pids_por_monitor[config_processo['process'].lower()]
+            if not pids:
+                continue
+            rotulo = config_processo['priority']
+            if rotulo not in MAPA_PRIORIDADES:
+                rotulo = "Normal"
+            alvo = (MAPA_PRIORIDADES[rotulo], rotulo, config_processo.get('filhos') is True)
+            for pid in pids:
+                # Processo casado com vários monitores: vale a maior prioridade
+                atual = alvos.get(pid)
+                if atual is None or niveis.index(rotulo) > niveis.index(atual[1]):
+                    alvos[pid] = alvo
+
+        self.registro_prioridades.sincronizar(
+            alvos, self.tabela_processos.entradas, pids_novos)
 
     def recarregar_se_necessario(self):
         """
         Verifica se as configurações foram modificadas e recarrega se necessário.
+
+        Compara apenas a identidade do instantâneo publicado (sem syscalls).
+        A recarga é incremental: apenas monitores adicionados, removidos ou
+        alterados são tocados, as correspondências vêm do cache da tabela
+        (sem nova varredura) e o plano é recalculado uma única vez. Uma
+        prioridade alterada é reaplicada pelo livro-razão no mesmo ciclo.
         """
+        instantaneo = self.observador_config.instantaneo
+        if instantaneo is self.instantaneo_config:
+            return
+
+        print("🔄 Configurações modificadas, recarregando...")
+
+        # Correspondente montado antes de qualquer mudança de estado: se as
+        # regras não compilarem, os monitores anteriores continuam valendo
         try:
-            timestamp_atual = os.path.getmtime(ARQUIVO_CONFIG)
-            if timestamp_atual != self.timestamp_config:
-                print("🔄 Configurações modificadas, recarregando...")
-                # Recarrega configurações
-                configuracoes = carregar_configuracoes()
-                self.processos_monitorados = configuracoes["monitores"]
-                self.timestamp_config = timestamp_atual
-
-                # Reinicializa estado dos processos
-                old_estado = self.estado_processos.copy()
-                self.estado_processos = {
-                    processo['process'].lower(): False
-                    for processo in self.processos_monitorados
-                }
-
-                # Limpa processos ativos no gerenciador para reprocessar
-                self.gerenciador_plano.processos_ativos.clear()
-
-                # Reprocessa processos que estavam ativos
-                for config_processo in self.processos_monitorados:
-                    nome_processo = config_processo['process'].lower()
-                    if old_estado.get(nome_processo, False):
-                        # Verifica se ainda está ativo
-                        processos_encontrados = [
-                            processo for processo in psutil.process_iter(['name'])
-                            if (processo.info['name'] and
-                                processo.info['name'].lower().startswith(nome_processo))
-                        ]
-
-                        if processos_encontrados:
-                            self.estado_processos[nome_processo] = True
-                            self.gerenciador_plano.adicionar_processo_ativo(
-                                nome_processo, config_processo)
-
-        except OSError:
-            # Mantém configurações atuais se houver erro
-            pass
+            correspondente = CorrespondenteProcessos(instantaneo.monitores)
+        except ValueError as erro:
+            print(f"⚠️ Monitores ignorados (mantendo os anteriores): {erro}")
+            self.instantaneo_config = instantaneo
+            return
+
+        anteriores = {processo['process'].lower(): processo
+                      for processo in self.processos_monitorados}
+        atuais = {processo['process'].lower(): processo
+                  for processo in instantaneo.monitores}
+
+        # Recarrega configurações
+        self.instantaneo_config = instantaneo
+        self.processos_monitorados = instantaneo.monitores
+        self.correspondente_processos = correspondente
+        self.tabela_processos.definir_correspondente(self.correspondente_processos)
+        self.agendador.configurar(self.processos_monitorados)
+        self.gerenciador_plano.histerese.configurar(ler_politica_troca(instantaneo.dados))
+        ranking_alterado = self.gerenciador_plano.definir_ranking(
+            ler_ranking_planos(instantaneo.dados))
+
+        removidos = [nome for nome in anteriores if nome not in atuais]
+        for nome_processo in removidos:
+            self.estado_processos.pop(nome_processo, None)
+
+        # Adicionados ou alterados: estado recalculado a partir do cache
+        varredura = self.tabela_processos.resultado()
+        ativos = {}
+        for nome_processo, config_processo in atuais.items():
+            anterior = anteriores.get(nome_processo)
+            if anterior == config_processo:
+                continue
+
+            pids_encontrados = varredura.pids_por_monitor[nome_processo]
+            estava_ativo = self.estado_processos.get(nome_processo, False)
+            if pids_encontrados:
+                ativos[nome_processo] = config_processo
+            elif estava_ativo:
+                removidos.append(nome_processo)
+            self.estado_processos[nome_processo] = bool(pids_encontrados)
+
+        print(f"   {len(atuais)} monitores: {len(ativos)} ativos reavaliados, "
+              f"{len(removidos)} removidos/parados")
+        self.gerenciador_plano.reconciliar(ativos, removidos, recalcular=ranking_alterado)
+        self.fonte_eventos.configurar(
+            self.correspondente_processos, frozenset(varredura.processos))
+
+    def _contadores_custo(self):
+        # Contadores acumulados; o custo de um ciclo é a diferença
+        return {
+            'chamadas_psutil': (self.tabela_processos.chamadas_psutil +
+                                self.registro_prioridades.chamadas_sistema),
+            'trocas_plano': self.gerenciador_plano.trocas_plano,
+            'ajustes_prioridade': self.registro_prioridades.ajustes,
+        }
+
+    def executar_ciclo(self):
+        """
+        Um ciclo de monitoramento: recarga, varredura do cache, releitura
+        do plano ativo, início/fim de cada monitor (com as pendências da
+        histerese), prioridades por PID e reconfiguração da fonte de
+        eventos. Cada etapa é medida no histórico de ciclos.
+        """
+        historico = self.historico_ciclos
+
+        historico.etapa('recarga')
+        self.recarregar_se_necessario()
+
+        # Um ciclo do cache para todos os monitores (PIDs por monitor)
+        historico.etapa('varredura')
+        varredura = self.tabela_processos.atualizar(
+            self.fonte_eventos.coletar_pids_alterados(),
+            revalidar=not self.fonte_eventos.reporta_alteracoes)
+        ultimo_ciclo = self.tabela_processos.ultimo_ciclo
+        historico.contar('processos_listados', ultimo_ciclo['acertos'] + ultimo_ciclo['novos'])
+        historico.contar('processos_novos', ultimo_ciclo['novos'])
+
+        # Plano real do sistema (trocas feitas por outros programas)
+        historico.etapa('plano')
+        self.gerenciador_plano.verificar_plano_ativo()
+
+        historico.etapa('monitores')
+        monitores_alterados = []
+        for config_processo in self.processos_monitorados:
+            nome_processo = config_processo['process'].lower()
+
+            # Processos que casaram com a regra do monitor
+            pids_encontrados = varredura.pids_por_monitor[nome_processo]
+            processo_ativo = bool(pids_encontrados)
+
+            # Processo foi iniciado
+            if processo_ativo and not self.estado_processos.get(nome_processo, False):
+                # Adiciona processo ao gerenciador (que vai calcular o plano necessário)
+                self.gerenciador_plano.adicionar_processo_ativo(
+                    nome_processo, config_processo)
+
+                self.estado_processos[nome_processo] = True
+                monitores_alterados.append(nome_processo)
+
+            # Processo foi encerrado
+            elif not processo_ativo and self.estado_processos.get(nome_processo, False):
+                # Remove processo do gerenciador (que vai recalcular o plano necessário)
+                self.gerenciador_plano.remover_processo_ativo(
+                    nome_processo)
+
+                self.estado_processos[nome_processo] = False
+                monitores_alterados.append(nome_processo)
+
+        # Inícios confirmados e paradas vencidas (depois das transições
+        # deste ciclo, para que um auxiliar que já terminou seja descartado)
+        self.gerenciador_plano.processar_pendencias()
+
+        # Toda instância (inclusive as que surgiram depois da primeira
+        # detecção) recebe a prioridade do monitor
+        historico.etapa('prioridades')
+        self._sincronizar_prioridades(varredura, self.tabela_processos.pids_novos)
+
+        historico.etapa('agendador')
+        self.agendador.registrar_ciclo(monitores_alterados)
+
+        # A fonte filtra os eventos pelos nomes e PIDs monitorados
+        historico.etapa('fonte')
+        self.fonte_eventos.configurar(
+            self.correspondente_processos, frozenset(varredura.processos))
+
+    def ciclo_medido(self):
+        """
+        Executa um ciclo registrando seu custo em historico_ciclos. Erros são
+        contidos (o monitoramento continua) e registrados com a etapa.
+
+        Returns:
+            dict: Registro do ciclo (ver HistoricoCiclos)
+        """
+        self.historico_ciclos.iniciar_ciclo()
+        contadores_antes = self._contadores_custo()
+        erro = None
+        try:
+            self.executar_ciclo()
+        except Exception as e:
+            # Em caso de erro geral, continua monitoramento; o rastreamento
+            # completo aparece só na primeira ocorrência de cada erro
+            erro = e
+            assinatura = (self.historico_ciclos.etapa_atual, type(e).__name__)
+            print(f"⚠️ Erro no monitoramento ({assinatura[0]}): {e!r}")
+            if assinatura not in self.erros_reportados:
+                self.erros_reportados.add(assinatura)
+                traceback.print_exc()
+
+        for nome, valor in self._contadores_custo().items():
+            self.historico_ciclos.contar(nome, valor - contadores_antes[nome])
+        registro = self.historico_ciclos.finalizar_ciclo(erro)
+        if registro['estourou']:
+            etapa = registro['etapa_mais_longa']
+            print(f"🐢 Ciclo de monitoramento lento "
+                  f"({formatar_duracao(registro['parede_ms'] * 1000)}): "
+                  f"{etapa} levou {formatar_duracao(registro['etapas_ms'][etapa] * 1000)}")
+        return registro
 
     def monitorar_processos(self):
         """
@@ -428,61 +926,63 @@ class GerenciadorEnergia:
 
         Executa continuamente verificando se os processos configurados
         estão ativos e ajusta planos de energia/prioridades conforme necessário.
+        A tabela de processos é enumerada uma única vez por ciclo, e cada
+        ciclo é disparado pela fonte de eventos (ou pelo intervalo de polling).
+        O custo de cada ciclo fica em historico_ciclos (endpoint de status).
         """
         print("🚀 Iniciando loop de monitoramento...")
-        
+        self.fonte_eventos.iniciar()
+        print(f"   Fonte de eventos: {type(self.fonte_eventos).__name__}")
+
         while True:
-            try:
-                self.recarregar_se_necessario()
-
-                for config_processo in self.processos_monitorados:
-                    nome_processo = config_processo['process'].lower()
-
-                    # Busca processos que começam com o nome configurado
-                    processos_encontrados = [
-                        processo for processo in psutil.process_iter(['name'])
-                        if (processo.info['name'] and
-                            processo.info['name'].lower().startswith(nome_processo))
-                    ]
-
-                    processo_ativo = bool(processos_encontrados)
-
-                    # Processo foi iniciado
-                    if processo_ativo and not self.estado_processos.get(nome_processo, False):
-                        # Adiciona processo ao gerenciador (que vai calcular o plano necessário)
-                        self.gerenciador_plano.adicionar_processo_ativo(
-                            nome_processo, config_processo)
-
-                        # Ajusta prioridade dos processos encontrados
-                        for processo in processos_encontrados:
-                            try:
-                                prioridade = MAPA_PRIORIDADES.get(
-                                    config_processo['priority'],
-                                    psutil.NORMAL_PRIORITY_CLASS
-                                )
-                                processo.nice(prioridade)
-                                print(f"🔧 Prioridade ajustada para {processo.info['name']}: {config_processo['priority']}")
-                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                # Processo pode ter terminado ou sem permissão
-                                continue
-
-                        self.estado_processos[nome_processo] = True
-
-                    # Processo foi encerrado
-                    elif not processo_ativo and self.estado_processos.get(nome_processo, False):
-                        # Remove processo do gerenciador (que vai recalcular o plano necessário)
-                        self.gerenciador_plano.remover_processo_ativo(
-                            nome_processo)
-
-                        self.estado_processos[nome_processo] = False
-
-            except Exception as e:
-                # Em caso de erro geral, continua monitoramento
-                print(f"⚠️ Erro no monitoramento: {e}")
-                pass
-
-            # Aguarda próxima verificação
-            time.sleep(INTERVALO_MONITORAMENTO)
+            self.ciclo_medido()
+
+            # Sem eventos de início, o intervalo de polling vem do agendador
+            # (antecipado pela próxima pendência da histerese)
+            if not self.fonte_eventos.orientada_a_eventos:
+                intervalo = self.agendador.proximo_intervalo()
+                pendencia = self.gerenciador_plano.segundos_ate_pendencia()
+                if pendencia is not None:
+                    intervalo = max(INTERVALO_MINIMO_PENDENCIA, min(intervalo, pendencia))
+                self.fonte_eventos.intervalo = intervalo
+
+            # Aguarda evento de processo, nova configuração ou o intervalo
+            self.fonte_eventos.aguardar()
+
+    async def monitorar_processos_async(self):
+        """
+        Mesmo laço de monitorar_processos, como tarefa do núcleo asyncio.
+
+        A espera entre ciclos não ocupa thread: a fonte de eventos acorda o
+        loop de forma thread-safe. A próxima pendência da histerese
+        (confirmação, tolerância, permanência) agenda um despertar no
+        próprio loop. Cancelar a tarefa (encerramento do núcleo) fecha a
+        fonte de eventos.
+        """
+        print("🚀 Iniciando loop de monitoramento (núcleo)...")
+        loop = asyncio.get_running_loop()
+        self.fonte_eventos.iniciar(loop)
+        print(f"   Fonte de eventos: {type(self.fonte_eventos).__name__}")
+
+        despertador = None
+        try:
+            while True:
+                self.ciclo_medido()
+
+                if not self.fonte_eventos.orientada_a_eventos:
+                    self.fonte_eventos.intervalo = self.agendador.proximo_intervalo()
+
+                if despertador is not None:
+                    despertador.cancel()
+                pendencia = self.gerenciador_plano.segundos_ate_pendencia()
+                despertador = (None if pendencia is None else loop.call_later(
+                    max(INTERVALO_MINIMO_PENDENCIA, pendencia), self.fonte_eventos.despertar))
+
+                await self.fonte_eventos.aguardar_async()
+        finally:
+            if despertador is not None:
+                despertador.cancel()
+            self.fonte_eventos.fechar()
 
 
 def abrir_configurador(icone, item):
@@ -501,6 +1001,17 @@ def abrir_configurador(icone, item):
         pass
 
 
+def mostrar_estatisticas(icone, item):
+    """
+    Mostra as latências medidas (p50/p99/máximo) em uma notificação.
+    """
+    try:
+        icone.notify(registro_metricas.texto_resumo(), "Latência do TurboAtalho")
+    except Exception:
+        # Notificações podem não ser suportadas pelo backend do pystray
+        print(registro_metricas.texto_resumo())
+
+
 def criar_icone_system_tray():
     """
     Cria e executa o ícone na bandeja do sistema (system tray).
@@ -514,6 +1025,7 @@ def criar_icone_system_tray():
         # Cria menu de contexto
         menu_contexto = Menu(
             MenuItem('Opções', abrir_configurador),
+            MenuItem('Estatísticas', mostrar_estatisticas),
             MenuItem('Sair', lambda icone, item: icone.stop())
         )
 
@@ -527,18 +1039,57 @@ def criar_icone_system_tray():
 
 if __name__ == "__main__":
     print("🚀 Iniciando TurboAtalho")
+
+    # Núcleo asyncio: dono da configuração, do monitoramento de processos,
+    # dos planos de energia, das expirações e da execução das ações
+    nucleo = Nucleo()
+    nucleo.iniciar()
+
+    # Observador único do config.json, compartilhado pelos gerenciadores
+    garantir_arquivo_configuracao()
+    observador_config = ObservadorConfiguracao(ARQUIVO_CONFIG, DEFAULT_CONFIG)
+    observador_config.iniciar(nucleo)
+
+    # Comandos dos atalhos resolvidos a cada nova configuração
+    lancador = Lancador(observador_config)
+
+    # Endpoint local de status (latências do hook, das ações e dos lançamentos)
+    servidor_status = ServidorStatus(
+        {'latencias': registro_metricas.resumo, 'lancamentos': lancador.resumo},
+        observador_config.instantaneo.dados.get("porta_status", PORTA_STATUS_PADRAO))
+    servidor_status.iniciar()
     
-    # Inicia gerenciador de energia em thread separada
-    gerenciador_energia = GerenciadorEnergia()
-    thread_energia = threading.Thread(
-        target=gerenciador_energia.monitorar_processos,
-        daemon=True
-    )
-    thread_energia.start()
-
-    # Inicia gerenciador de atalhos
-    gerenciador_atalhos = GerenciadorAtalhos()
+    # Gerenciador de energia como tarefa do núcleo
+    gerenciador_energia = GerenciadorEnergia(
+        observador_config,
+        gerenciador_plano=GerenciadorPlanoEnergia(arquivo_catalogo=ARQUIVO_CATALOGO_PLANOS))
+    servidor_status.provedores['processos'] = gerenciador_energia.tabela_processos.resumo
+    servidor_status.provedores['agendador'] = gerenciador_energia.agendador.resumo
+    servidor_status.provedores['ciclos'] = gerenciador_energia.historico_ciclos.resumo
+    servidor_status.provedores['prioridades'] = gerenciador_energia.registro_prioridades.resumo
+    servidor_status.provedores['energia'] = gerenciador_energia.gerenciador_plano.resumo
+    nucleo.criar_tarefa(gerenciador_energia.monitorar_processos_async())
+
+    # Ações e expirações rodam no núcleo; o hook só entrega o trabalho
+    executor_acoes = criar_executor_acoes(lancador, nucleo)
+    executor_acoes.iniciar()
+    rastreador_janela = RastreadorJanelaAtiva()
+    rastreador_janela.iniciar()
+    gerenciador_atalhos = GerenciadorAtalhos(
+        observador_config, executor_acoes, rastreador_janela, nucleo)
     gerenciador_atalhos.iniciar_monitoramento()
 
-    # Cria interface de system tray (bloqueia thread principal)
-    criar_icone_system_tray()
\ No newline at end of file
+    try:
+        # Cria interface de system tray (bloqueia thread principal até "Sair")
+        criar_icone_system_tray()
+    finally:
+        # Encerramento ordenado: primeiro as fontes de trabalho externas,
+        # depois o núcleo (cancela o monitoramento e fecha a fonte de eventos)
+        print("👋 Encerrando TurboAtalho")
+        gerenciador_atalhos.parar_monitoramento()
+        executor_acoes.parar()
+        rastreador_janela.parar()
+        observador_config.parar()
+        servidor_status.parar()
+        nucleo.parar()
+        gerenciador_energia.gerenciador_plano.backend.fechar()
\ No newline at end of file
@@ -0,0 +1,274 @@
+# metricas.py - Histogramas de latência de baixo custo para o caminho crítico
+
+import threading
+import time
+from collections import deque
+
+# Faixas do histograma: a faixa i conta durações em [2^(i-1), 2^i) ns
+NUMERO_FAIXAS = 64
+
+# Seções instrumentadas no hook de teclado e no executor
+SECAO_HOOK = 'hook'
+SECAO_DESPACHO = 'despacho'
+SECAO_RECARGA = 'recarga'
+SECAO_JANELA = 'janela'
+SECAO_ACAO = 'acao'
+
+# Ciclos guardados no histórico do monitor de processos
+TAMANHO_HISTORICO_CICLOS = 256
+
+# Ciclos do monitor de processos acima disso são sinalizados (milissegundos)
+ORCAMENTO_CICLO_MS = 50
+
+
+class Histograma:
+    """
+    Histograma de tamanho fixo com faixas em potências de 2 (nanossegundos).
+
+    Registrar é O(1) e não aloca estruturas nem usa trava: cada seção tem um
+    único escritor na prática (a thread do hook ou o executor), e sob o GIL
+    uma eventual disputa pode perder no máximo uma contagem.
+    """
+
+    def __init__(self):
+        self.faixas = [0] * NUMERO_FAIXAS
+        self.contagem = 0
+        self.soma_ns = 0
+        self.maximo_ns = 0
+
+    def registrar(self, duracao_ns):
+        """
+        Registra uma duração.
+
+        Args:
+            duracao_ns (int): Duração em nanossegundos (perf_counter_ns)
+        """
+        self.faixas[min(duracao_ns.bit_length(), NUMERO_FAIXAS - 1)] += 1
+        self.contagem += 1
+        self.soma_ns += duracao_ns
+        if duracao_ns > self.maximo_ns:
+            self.maximo_ns = duracao_ns
+
+    def percentil(self, fracao):
+        """
+        Estima um percentil pelo limite superior da faixa correspondente.
+
+        Args:
+            fracao (float): Percentil entre 0 e 1 (ex: 0.99)
+
+        Returns:
+            int: Duração estimada em nanossegundos (0 se vazio)
+        """
+        faixas = list(self.faixas)
+        total = sum(faixas)
+        if not total:
+            return 0
+
+        alvo = fracao * total
+        acumulado = 0
+        for indice, quantidade in enumerate(faixas):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min(1 << indice, self.maximo_ns)
+        return self.maximo_ns
+
+    def resumo(self):
+        """
+        Returns:
+            dict: contagem, p50, p99, máximo e média (microssegundos)
+        """
+        contagem = self.contagem
+        return {
+            'contagem': contagem,
+            'p50_us': self.percentil(0.50) / 1000,
+            'p99_us': self.percentil(0.99) / 1000,
+            'max_us': self.maximo_ns / 1000,
+            'media_us': (self.soma_ns / contagem / 1000) if contagem else 0.0,
+        }
+
+
+class RegistroMetricas:
+    """
+    Conjunto de histogramas nomeados, consultável em tempo de execução.
+    """
+
+    def __init__(self):
+        self.histogramas = {}
+
+    def histograma(self, nome):
+        """
+        Retorna (criando se necessário) o histograma de uma seção.
+
+        Args:
+            nome (str): Nome da seção (ex: SECAO_HOOK)
+
+        Returns:
+            Histograma: Histograma da seção
+        """
+        histograma = self.histogramas.get(nome)
+        if histograma is None:
+            histograma = self.histogramas.setdefault(nome, Histograma())
+        return histograma
+
+    def registrar(self, nome, duracao_ns):
+        """
+        Registra uma duração na seção indicada.
+
+        Args:
+            nome (str): Nome da seção
+            duracao_ns (int): Duração em nanossegundos
+        """
+        self.histograma(nome).registrar(duracao_ns)
+
+    def resumo(self):
+        """
+        Returns:
+            dict: {seção: resumo do histograma}
+        """
+        return {nome: histograma.resumo()
+                for nome, histograma in list(self.histogramas.items())}
+
+    def texto_resumo(self):
+        """
+        Resumo compacto em texto (uma linha por seção), para o menu da bandeja.
+
+        Returns:
+            str: Ex: "hook: p50 3µs · p99 41µs · max 1.2ms (n=1520)"
+        """
+        linhas = []
+        for nome, dados in self.resumo().items():
+            linhas.append(
+                f"{nome}: p50 {formatar_duracao(dados['p50_us'])} · "
+                f"p99 {formatar_duracao(dados['p99_us'])} · "
+                f"max {formatar_duracao(dados['max_us'])} (n={dados['contagem']})")
+        return "\n".join(linhas) or "Sem medições ainda"
+
+
+class HistoricoCiclos:
+    """
+    Custo de cada ciclo do monitor de processos em um buffer circular de
+    tamanho fixo: tempo de parede e de CPU, duração de cada etapa,
+    contadores (processos listados, chamadas ao psutil, trocas de plano,
+    ajustes de prioridade) e erros. Ciclos acima do orçamento são
+    sinalizados junto com a etapa mais longa.
+
+    Um único escritor (a thread de monitoramento); a trava protege apenas a
+    leitura concorrente pelo endpoint de status.
+    """
+
+    def __init__(self, capacidade=TAMANHO_HISTORICO_CICLOS, orcamento_ms=ORCAMENTO_CICLO_MS):
+        self.orcamento_ms = orcamento_ms
+        self.registros = deque(maxlen=capacidade)
+        self.histograma = Histograma()
+        self.trava = threading.Lock()
+        self.total = 0
+        self.estourados = 0
+        self.erros = 0
+        self._inicio_ns = 0
+        self._inicio_cpu_ns = 0
+        self._etapas = {}
+        self.etapa_atual = None
+        self._inicio_etapa_ns = 0
+        self._contadores = {}
+
+    def iniciar_ciclo(self):
+        """
+        Começa a medir um ciclo.
+        """
+        self._inicio_ns = self._inicio_etapa_ns = agora_ns()
+        self._inicio_cpu_ns = time.thread_time_ns()
+        self._etapas = {}
+        self.etapa_atual = None
+        self._contadores = {}
+
+    def etapa(self, nome):
+        """
+        Encerra a etapa em andamento (se houver) e inicia outra.
+
+        Args:
+            nome (str): Nome da etapa (ex: 'varredura')
+        """
+        agora = agora_ns()
+        if self.etapa_atual is not None:
+            self._etapas[self.etapa_atual] = (
+                self._etapas.get(self.etapa_atual, 0) + agora - self._inicio_etapa_ns)
+        self.etapa_atual = nome
+        self._inicio_etapa_ns = agora
+
+    def contar(self, nome, quantidade=1):
+        """
+        Soma um contador do ciclo em andamento.
+        """
+        self._contadores[nome] = self._contadores.get(nome, 0) + quantidade
+
+    def finalizar_ciclo(self, erro=None):
+        """
+        Fecha o ciclo e o guarda no histórico.
+
+        Args:
+            erro (Exception): Erro que interrompeu o ciclo, se houver
+
+        Returns:
+            dict: Registro do ciclo
+        """
+        etapa_interrompida = self.etapa_atual
+        self.etapa(None)
+        parede_ns = agora_ns() - self._inicio_ns
+        etapa_mais_longa = max(self._etapas, key=self._etapas.get, default=None)
+        registro = {
+            'instante': time.time(),
+            'parede_ms': parede_ns / 1e6,
+            'cpu_ms': (time.thread_time_ns() - self._inicio_cpu_ns) / 1e6,
+            'etapas_ms': {nome: duracao / 1e6 for nome, duracao in self._etapas.items()},
+            'etapa_mais_longa': etapa_mais_longa,
+            'contadores': self._contadores,
+            'estourou': parede_ns > self.orcamento_ms * 1_000_000,
+            'erro': None if erro is None else f"{etapa_interrompida}: {erro!r}",
+        }
+
+        with self.trava:
+            self.registros.append(registro)
+            self.histograma.registrar(parede_ns)
+            self.total += 1
+            self.estourados += registro['estourou']
+            self.erros += erro is not None
+        return registro
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Totais, distribuição do tempo de parede e os últimos ciclos
+        """
+        with self.trava:
+            return {
+                'orcamento_ms': self.orcamento_ms,
+                'ciclos': self.total,
+                'estourados': self.estourados,
+                'erros': self.erros,
+                'parede': self.histograma.resumo(),
+                'ultimos': list(self.registros),
+            }
+
+
+def formatar_duracao(microssegundos):
+    """
+    Formata uma duração em µs/ms/s conforme a grandeza.
+
+    Args:
+        microssegundos (float): Duração em microssegundos
+
+    Returns:
+        str: Duração formatada
+    """
+    if microssegundos < 1000:
+        return f"{microssegundos:.0f}µs"
+    if microssegundos < 1_000_000:
+        return f"{microssegundos / 1000:.1f}ms"
+    return f"{microssegundos / 1_000_000:.2f}s"
+
+
+# Registro global usado pelo daemon
+registro_metricas = RegistroMetricas()
+
+# Atalho para o relógio usado nas medições
+agora_ns = time.perf_counter_ns
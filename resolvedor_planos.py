@@ -0,0 +1,86 @@
+# resolvedor_planos.py - Plano necessário mantido por um heap de máximo com contagem
+
+# Cada monitor ativo pede o seu power_on. O resolvedor conta os pedidos por
+# plano e mantém um heap de máximo pela prioridade do ranking, então um
+# início ou fim custa O(log n) (n = planos distintos pedidos) em vez de
+# percorrer todos os monitores ativos a cada mudança.
+#
+# Entradas de planos que deixaram de ser pedidos saem do heap de forma
+# preguiçosa (quando chegam ao topo) ou numa compactação quando o heap passa
+# do dobro dos planos vivos. Com prioridades iguais (planos fora do
+# ranking) vence o pedido mais antigo.
+
+import heapq
+import itertools
+
+
+class ResolvedorPlanos:
+    """
+    Contagem de pedidos por plano + heap de máximo pela prioridade.
+    """
+
+    def __init__(self, prioridades):
+        """
+        Args:
+            prioridades (dict): {nome do plano: prioridade} (maior vence;
+                planos ausentes valem 0)
+        """
+        self.prioridades = prioridades
+        self.contagem = {}  # {nome do plano: monitores ativos que o pedem}
+        self.entradas = {}  # {nome do plano: entrada viva no heap}
+        self.heap = []
+        self.ordem = itertools.count()
+
+    def _empilhar(self, nome_plano, ordem):
+        entrada = (-self.prioridades.get(nome_plano, 0), ordem, nome_plano)
+        self.entradas[nome_plano] = entrada
+        heapq.heappush(self.heap, entrada)
+
+    def adicionar(self, nome_plano):
+        """
+        Registra um pedido do plano (monitor passou a contar).
+        """
+        quantidade = self.contagem.get(nome_plano, 0)
+        self.contagem[nome_plano] = quantidade + 1
+        if not quantidade:
+            self._empilhar(nome_plano, next(self.ordem))
+
+    def remover(self, nome_plano):
+        """
+        Retira um pedido do plano (monitor deixou de contar).
+        """
+        quantidade = self.contagem.get(nome_plano, 0)
+        if quantidade > 1:
+            self.contagem[nome_plano] = quantidade - 1
+            return
+        if quantidade:
+            del self.contagem[nome_plano]
+            del self.entradas[nome_plano]
+            # Entradas mortas não saem do meio do heap; compacta quando
+            # passam a ser maioria (custo amortizado constante)
+            if len(self.heap) > 2 * len(self.entradas) + 8:
+                self.heap = list(self.entradas.values())
+                heapq.heapify(self.heap)
+
+    def melhor(self):
+        """
+        Returns:
+            str: Plano pedido de maior prioridade, ou None sem pedidos
+        """
+        heap = self.heap
+        while heap and self.entradas.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def definir_prioridades(self, prioridades):
+        """
+        Novo ranking: reconstrói o heap (O(n)) mantendo a ordem dos pedidos.
+        """
+        self.prioridades = prioridades
+        self.entradas = {nome_plano: (-prioridades.get(nome_plano, 0), ordem, nome_plano)
+                         for nome_plano, (_, ordem, _) in self.entradas.items()}
+        self.heap = list(self.entradas.values())
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.contagem)
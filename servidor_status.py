@@ -0,0 +1,87 @@
+# servidor_status.py - Endpoint HTTP local (somente 127.0.0.1) com o status do daemon
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Porta padrão do endpoint; "porta_status": 0 no config.json desativa
+PORTA_STATUS_PADRAO = 47800
+
+
+class ServidorStatus:
+    """
+    Servidor HTTP mínimo que responde GET /status com um JSON montado a
+    partir de provedores registrados ({nome: função sem argumentos}).
+    """
+
+    def __init__(self, provedores, porta=PORTA_STATUS_PADRAO):
+        self.provedores = provedores
+        self.porta = porta
+        self.servidor = None
+
+    def coletar(self):
+        """
+        Returns:
+            dict: {nome do provedor: dados retornados}
+        """
+        status = {}
+        for nome, provedor in self.provedores.items():
+            try:
+                status[nome] = provedor()
+            except Exception as erro:
+                status[nome] = {'erro': str(erro)}
+        return status
+
+    def iniciar(self):
+        """
+        Inicia o servidor em thread separada.
+
+        Returns:
+            bool: False se a porta estiver ocupada ou desativada
+        """
+        if not self.porta:
+            return False
+
+        servidor_status = self
+        # Host aceitos: bloqueia DNS rebinding (página externa resolvendo o
+        # próprio domínio para 127.0.0.1 e lendo o status pelo navegador)
+        hosts_permitidos = {f'127.0.0.1:{self.porta}', f'localhost:{self.porta}'}
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if (self.headers.get('Host') or '').lower() not in hosts_permitidos:
+                    self.send_error(403)
+                    return
+                if self.path.rstrip('/') not in ('', '/status'):
+                    self.send_error(404)
+                    return
+                corpo = json.dumps(servidor_status.coletar(),
+                                   ensure_ascii=False, indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *argumentos):
+                # Sem log por requisição (aplicação em background)
+                pass
+
+        try:
+            self.servidor = ThreadingHTTPServer(('127.0.0.1', self.porta), Manipulador)
+        except OSError as erro:
+            print(f"⚠️ Endpoint de status indisponível na porta {self.porta}: {erro}")
+            return False
+
+        self.servidor.daemon_threads = True
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        print(f"📊 Status disponível em http://127.0.0.1:{self.porta}/status")
+        return True
+
+    def parar(self):
+        """
+        Encerra o servidor.
+        """
+        if self.servidor is not None:
+            self.servidor.shutdown()
+            self.servidor.server_close()
@@ -0,0 +1,219 @@
+# teclas.py - Gramática e interpretação das teclas configuradas nos atalhos
+
+from collections import namedtuple
+from functools import lru_cache
+
+# Gramática aceita no campo "tecla" do config.json:
+#
+#   especificacao := (modificador '+')* tecla
+#   modificador   := ctrl | alt | shift | cmd        (sem diferenciar maiúsculas)
+#   tecla         := 'Key.' nome_especial            (ex: Key.num_lock, Key.f5)
+#                  | 'vk:' codigo                    (decimal ou 0x..; teclas sem caractere)
+#                  | caractere único                 (ex: a, %, 5)
+#
+# Exemplos: "Key.home", "a", "vk:0xB3", "ctrl+alt+x", "ctrl+Key.f5"
+
+# Nomes válidos após 'Key.' (mesmos membros do enum Key do pynput)
+NOMES_TECLAS_ESPECIAIS = frozenset([
+    'alt', 'alt_l', 'alt_r', 'alt_gr', 'backspace', 'caps_lock',
+    'cmd', 'cmd_l', 'cmd_r', 'ctrl', 'ctrl_l', 'ctrl_r', 'delete',
+    'down', 'end', 'enter', 'esc', 'home', 'left', 'page_down', 'page_up',
+    'right', 'shift', 'shift_l', 'shift_r', 'space', 'tab', 'up',
+    'media_play_pause', 'media_volume_mute', 'media_volume_down',
+    'media_volume_up', 'media_previous', 'media_next',
+    'insert', 'menu', 'num_lock', 'pause', 'print_screen', 'scroll_lock',
+] + [f'f{numero}' for numero in range(1, 25)])
+
+# Teclas especiais que contam como modificadores e o nome normalizado
+MODIFICADORES_POR_TECLA = {
+    'ctrl': 'ctrl', 'ctrl_l': 'ctrl', 'ctrl_r': 'ctrl',
+    'alt': 'alt', 'alt_l': 'alt', 'alt_r': 'alt', 'alt_gr': 'alt',
+    'shift': 'shift', 'shift_l': 'shift', 'shift_r': 'shift',
+    'cmd': 'cmd', 'cmd_l': 'cmd', 'cmd_r': 'cmd',
+}
+
+MODIFICADORES = frozenset(MODIFICADORES_POR_TECLA.values())
+
+# Quantidade máxima de especificações distintas mantidas em cache
+TAMANHO_CACHE_TECLAS = 1024
+
+# Conversão de keysyms do Tk (interface) para nomes do enum Key
+KEYSYMS_TK_PARA_TECLA = {
+    'prior': 'page_up', 'next': 'page_down', 'return': 'enter',
+    'escape': 'esc', 'control_l': 'ctrl_l', 'control_r': 'ctrl_r',
+    'super_l': 'cmd_l', 'super_r': 'cmd_r', 'win_l': 'cmd_l',
+    'win_r': 'cmd_r', 'app': 'menu', 'print': 'print_screen',
+    'iso_level3_shift': 'alt_gr',
+}
+
+# Bits de event.state do Tk para Control e Alt (Windows usa 0x20000 para Alt)
+ESTADO_TK_CONTROL = 0x0004
+ESTADO_TK_ALT = 0x0008 | 0x20000
+
+EspecificacaoTecla = namedtuple(
+    'EspecificacaoTecla', ['modificadores', 'identidade'])
+
+
+class ErroEspecificacaoTecla(ValueError):
+    """
+    Especificação de tecla inválida no config.json ou na interface.
+    """
+
+
+def identidade_tecla(tecla):
+    """
+    Normaliza uma tecla recebida do pynput em uma identidade hashable.
+
+    - Teclas especiais (enum Key): ('key', nome)
+    - Teclas com caractere (KeyCode): ('char', caractere)
+    - Teclas apenas com código virtual: ('vk', código)
+
+    Args:
+        tecla: Objeto Key ou KeyCode recebido pelo Listener
+
+    Returns:
+        tuple: Identidade normalizada da tecla
+    """
+    # Membros do enum Key possuem 'name'; KeyCode não
+    nome = getattr(tecla, 'name', None)
+    if nome is not None:
+        return ('key', nome)
+
+    caractere = getattr(tecla, 'char', None)
+    if caractere is not None:
+        return ('char', caractere)
+
+    return ('vk', getattr(tecla, 'vk', None))
+
+
+def _interpretar_tecla_base(texto):
+    """
+    Interpreta a parte final da especificação (sem modificadores).
+    """
+    if texto.startswith('Key.'):
+        nome = texto[4:]
+        if nome not in NOMES_TECLAS_ESPECIAIS:
+            raise ErroEspecificacaoTecla(f"Tecla especial desconhecida: '{texto}'")
+        return ('key', nome)
+
+    if texto[:3].lower() == 'vk:':
+        try:
+            codigo = int(texto[3:], 0)
+        except ValueError:
+            raise ErroEspecificacaoTecla(
+                f"Código virtual inválido: '{texto}'") from None
+        if not 0 < codigo < 256:
+            raise ErroEspecificacaoTecla(
+                f"Código virtual fora do intervalo 1-255: '{texto}'")
+        return ('vk', codigo)
+
+    if len(texto) == 1:
+        return ('char', texto)
+
+    raise ErroEspecificacaoTecla(f"Tecla não reconhecida: '{texto}'")
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_TECLAS)
+def interpretar_tecla(texto):
+    """
+    Interpreta uma especificação de tecla conforme a gramática acima.
+
+    O resultado é memorizado em cache limitado; especificações inválidas
+    não entram no cache e geram ErroEspecificacaoTecla.
+
+    Args:
+        texto (str): Especificação (ex: "Key.home", "ctrl+alt+x", "vk:173")
+
+    Returns:
+        EspecificacaoTecla: Modificadores (frozenset) e identidade da tecla
+
+    Raises:
+        ErroEspecificacaoTecla: Se a especificação for inválida
+    """
+    if not isinstance(texto, str) or not texto:
+        raise ErroEspecificacaoTecla("Tecla vazia")
+
+    # O próprio '+' pode ser a tecla final (ex: "+" ou "ctrl++")
+    if texto == '+':
+        partes = ['+']
+    elif texto.endswith('++'):
+        partes = texto[:-2].split('+') + ['+']
+    else:
+        partes = texto.split('+')
+
+    *textos_modificadores, texto_tecla = partes
+    modificadores = set()
+    for texto_modificador in textos_modificadores:
+        nome = texto_modificador.strip().lower()
+        if nome.startswith('key.'):
+            nome = MODIFICADORES_POR_TECLA.get(nome[4:], nome)
+        if nome not in MODIFICADORES:
+            raise ErroEspecificacaoTecla(
+                f"Modificador desconhecido '{texto_modificador}' em '{texto}'")
+        modificadores.add(nome)
+
+    identidade = _interpretar_tecla_base(texto_tecla)
+
+    if identidade[0] == 'char' and modificadores:
+        caractere = identidade[1]
+        if modificadores == {'shift'}:
+            # Shift+caractere chega do teclado como o caractere resultante
+            if not caractere.isalpha():
+                raise ErroEspecificacaoTecla(
+                    f"Use o caractere resultante em vez de '{texto}'")
+            return EspecificacaoTecla(frozenset(), ('char', caractere.upper()))
+        # Com Ctrl/Alt/Cmd o listener entrega a tecla canônica (minúscula)
+        identidade = ('char', caractere.lower())
+
+    return EspecificacaoTecla(frozenset(modificadores), identidade)
+
+
+def validar_tecla(texto):
+    """
+    Valida uma especificação de tecla sem lançar exceção.
+
+    Args:
+        texto (str): Especificação a validar
+
+    Returns:
+        str: Mensagem de erro, ou None se a especificação for válida
+    """
+    try:
+        interpretar_tecla(texto)
+    except ErroEspecificacaoTecla as erro:
+        return str(erro)
+    return None
+
+
+def tecla_de_evento_tk(evento):
+    """
+    Converte um evento <KeyPress> do Tk na especificação usada no config.json.
+
+    Args:
+        evento: Evento de teclado do Tkinter
+
+    Returns:
+        str: Especificação de tecla (ex: "a", "Key.num_lock", "ctrl+x")
+    """
+    keysym = evento.keysym.lower()
+    nome_especial = KEYSYMS_TK_PARA_TECLA.get(keysym, keysym)
+
+    modificadores = []
+    if nome_especial not in MODIFICADORES_POR_TECLA:
+        if evento.state & ESTADO_TK_CONTROL:
+            modificadores.append('ctrl')
+        if evento.state & ESTADO_TK_ALT:
+            modificadores.append('alt')
+
+    if modificadores:
+        # Com Ctrl/Alt o Tk entrega caractere de controle; usa o keysym
+        if len(keysym) == 1:
+            texto_tecla = keysym
+        else:
+            texto_tecla = f"Key.{nome_especial}"
+        return '+'.join(modificadores + [texto_tecla])
+
+    if evento.char and len(evento.char) == 1 and evento.char.isprintable():
+        return evento.char
+
+    return f"Key.{nome_especial}"
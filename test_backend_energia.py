@@ -0,0 +1,102 @@
+# test_backend_energia.py - BackendSysfs sobre uma árvore sysfs falsa em diretório temporário
+
+import os
+import tempfile
+import unittest
+
+from backend_energia import BackendSysfs
+
+CAMINHO_FIRMWARE = os.path.join('sys', 'firmware', 'acpi', 'platform_profile')
+CAMINHO_CPUFREQ = os.path.join('sys', 'devices', 'system', 'cpu', 'cpufreq')
+
+
+class TesteBackendSysfs(unittest.TestCase):
+    """
+    enumerar/ler_ativo/ativar nos dois mecanismos (platform_profile do
+    firmware e EPP do cpufreq), com a raiz apontando para um temporário.
+    """
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.raiz = self.diretorio.name
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def escrever(self, caminho, conteudo):
+        caminho = os.path.join(self.raiz, caminho)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'w') as arquivo:
+            arquivo.write(conteudo + '\n')
+
+    def ler(self, caminho):
+        with open(os.path.join(self.raiz, caminho)) as arquivo:
+            return arquivo.read().strip()
+
+    def criar_firmware(self, escolhas, atual='balanced'):
+        self.escrever(CAMINHO_FIRMWARE, atual)
+        self.escrever(CAMINHO_FIRMWARE + '_choices', escolhas)
+
+    def criar_epp(self, politicas=4, atual='balance_performance'):
+        for indice in range(politicas):
+            politica = os.path.join(CAMINHO_CPUFREQ, f'policy{indice}')
+            self.escrever(os.path.join(politica, 'energy_performance_preference'), atual)
+            self.escrever(os.path.join(politica, 'energy_performance_available_preferences'),
+                          'default performance balance_performance balance_power power')
+
+    def test_firmware_enumera_le_e_ativa(self):
+        self.criar_firmware('low-power balanced performance quiet')
+        backend = BackendSysfs(self.raiz)
+
+        self.assertEqual(backend.enumerar(), {
+            'Economia de energia': 'low-power',
+            'Equilibrado': 'balanced',
+            'Alto desempenho': 'performance',
+            'quiet': 'quiet',
+        })
+        self.assertEqual(backend.ler_ativo(), 'Equilibrado')
+
+        self.assertTrue(backend.ativar('Alto desempenho'))
+        self.assertEqual(self.ler(CAMINHO_FIRMWARE), 'performance')
+        self.assertEqual(backend.ler_ativo(), 'Alto desempenho')
+
+        # Perfis sem plano equivalente usam o próprio nome
+        self.assertTrue(backend.ativar('quiet'))
+        self.assertEqual(backend.ler_ativo(), 'quiet')
+        self.assertEqual((backend.trocas, backend.falhas), (2, 0))
+
+    def test_epp_escreve_todas_as_politicas(self):
+        self.criar_epp(politicas=4)
+        backend = BackendSysfs(self.raiz)
+
+        planos = backend.enumerar()
+        self.assertNotIn('default', planos.values())
+        self.assertEqual(planos['Economia de energia'], 'power')
+        self.assertEqual(planos['balance_power'], 'balance_power')
+        self.assertEqual(backend.ler_ativo(), 'Equilibrado')
+
+        self.assertTrue(backend.ativar('Economia de energia'))
+        for indice in range(4):
+            self.assertEqual(self.ler(os.path.join(
+                CAMINHO_CPUFREQ, f'policy{indice}', 'energy_performance_preference')), 'power')
+        self.assertEqual(backend.ler_ativo(), 'Economia de energia')
+
+    def test_perfil_indisponivel_e_rejeitado(self):
+        # Firmware sem o perfil de desempenho
+        self.criar_firmware('low-power balanced')
+        backend = BackendSysfs(self.raiz)
+
+        self.assertNotIn('Alto desempenho', backend.enumerar())
+        self.assertFalse(backend.ativar('Alto desempenho'))
+        self.assertFalse(backend.ativar('Plano inexistente'))
+        self.assertEqual(self.ler(CAMINHO_FIRMWARE), 'balanced')
+        self.assertEqual(backend.ler_ativo(), 'Equilibrado')
+        self.assertEqual((backend.trocas, backend.falhas), (0, 2))
+
+    def test_sem_sysfs_falha_na_criacao(self):
+        with self.assertRaises(OSError):
+            BackendSysfs(self.raiz)
+
+
+if __name__ == "__main__":
+    unittest.main()
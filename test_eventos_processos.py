@@ -0,0 +1,107 @@
+# test_eventos_processos.py - Fontes de eventos do Linux com processos reais
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+import unittest
+
+from eventos_processos import FonteNetlink, FontePidfd
+from processos import CorrespondenteProcessos
+
+# Tempo de vida do processo iniciado em cada teste (segundos)
+DURACAO_PROCESSO = 0.5
+
+# Intervalo máximo das fontes nos testes: acordar por tempo em vez de por
+# evento faz a asserção falhar sem travar a suíte
+INTERVALO_TESTE = 5.0
+
+SLEEP = shutil.which('sleep')
+
+
+def iniciar_sleep():
+    return subprocess.Popen([SLEEP, str(DURACAO_PROCESSO)])
+
+
+@unittest.skipUnless(sys.platform.startswith('linux') and SLEEP, "requer Linux e 'sleep'")
+class TesteFonteNetlink(unittest.TestCase):
+    """
+    Proc connector: início (exec) e fim (exit) de um 'sleep' real acordam a
+    fonte sem esperar o intervalo de segurança.
+    """
+
+    def setUp(self):
+        try:
+            self.fonte = FonteNetlink(intervalo=INTERVALO_TESTE)
+        except OSError as erro:
+            self.skipTest(f"proc connector indisponível (requer CAP_NET_ADMIN): {erro}")
+        self.fonte.iniciar()
+        self.correspondente = CorrespondenteProcessos([{'process': 'sleep'}])
+
+    def tearDown(self):
+        self.fonte.fechar()
+
+    def test_inicio_e_fim_acordam_a_fonte(self):
+        self.fonte.configurar(self.correspondente, frozenset())
+        inicio = time.monotonic()
+        processo = iniciar_sleep()
+        try:
+            self.assertTrue(self.fonte.aguardar(), "início não acordou a fonte")
+            self.assertLess(time.monotonic() - inicio, DURACAO_PROCESSO)
+            self.assertIn(processo.pid, self.fonte.coletar_pids_alterados())
+
+            self.fonte.configurar(self.correspondente, frozenset([processo.pid]))
+            self.assertTrue(self.fonte.aguardar(), "fim não acordou a fonte")
+            self.assertEqual(processo.wait(1), 0)
+            self.assertLess(time.monotonic() - inicio, DURACAO_PROCESSO + 1.0)
+        finally:
+            processo.kill()
+            processo.wait()
+
+    def test_processo_irrelevante_nao_acorda(self):
+        outro = CorrespondenteProcessos([{'process': 'nao-existe-turbo'}])
+        self.fonte.configurar(outro, frozenset())
+        self.fonte.intervalo = DURACAO_PROCESSO * 2
+        processo = iniciar_sleep()
+        try:
+            self.assertFalse(self.fonte.aguardar())
+        finally:
+            processo.wait()
+
+
+@unittest.skipUnless(hasattr(os, 'pidfd_open') and SLEEP, "requer os.pidfd_open e 'sleep'")
+class TesteFontePidfd(unittest.TestCase):
+    """
+    pidfd: o início é visto pela varredura do intervalo; o fim do PID
+    observado acorda a fonte assim que o processo termina.
+    """
+
+    def setUp(self):
+        self.fonte = FontePidfd(intervalo=DURACAO_PROCESSO / 5)
+        self.fonte.iniciar()
+        self.correspondente = CorrespondenteProcessos([{'process': 'sleep'}])
+
+    def tearDown(self):
+        self.fonte.fechar()
+
+    def test_inicio_por_intervalo_e_fim_por_evento(self):
+        self.fonte.configurar(self.correspondente, frozenset())
+        processo = iniciar_sleep()
+        try:
+            # Início: sem evento, a fonte acorda no intervalo de varredura
+            inicio = time.monotonic()
+            self.assertFalse(self.fonte.aguardar())
+            self.assertLess(time.monotonic() - inicio, DURACAO_PROCESSO)
+
+            self.fonte.intervalo = INTERVALO_TESTE
+            self.fonte.configurar(self.correspondente, frozenset([processo.pid]))
+            self.assertTrue(self.fonte.aguardar(), "fim não acordou a fonte")
+            self.assertEqual(processo.wait(1), 0)
+        finally:
+            processo.kill()
+            processo.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+# test_gerenciador_atalhos.py - Pior caso do callback do hook com o executor do daemon
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from benchmark_atalhos import LIMITE_CALLBACK_MS, TEMPO_ACAO_LENTA
+from benchmark_reproducao import KeyCodeFalso, instalar_modulos_falsos
+from executor_acoes import ExecutorNucleo
+from janela_ativa import BackendJanelaFalso, InfoJanela, RastreadorJanelaAtiva
+from nucleo import Nucleo
+from observador_config import ObservadorConfiguracao
+
+# Teclas pressionadas no teste (cada par é um duplo-pressionamento)
+EVENTOS = 2_000
+
+# Medições do pior caso: com uma única CPU o escalonador pode tirar a thread
+# do callback por alguns ms; um callback que bloqueia de fato na ação lenta
+# excede o limite em todas as tentativas
+TENTATIVAS = 3
+
+
+class LancadorLento:
+    """
+    Lançador cujo Popen demora TEMPO_ACAO_LENTA (disco lento / antivírus).
+    """
+
+    def __init__(self):
+        self.lancados = 0
+
+    def lancar(self, comando):
+        time.sleep(TEMPO_ACAO_LENTA)
+        self.lancados += 1
+
+
+class TestePiorCasoCallback(unittest.TestCase):
+    """
+    Dirige ao_pressionar_tecla/ao_soltar_tecla (os callbacks do Listener)
+    com o núcleo e o ExecutorNucleo montados como no daemon, enquanto as
+    ações são lentas e a fila de pendentes enche.
+    """
+
+    def setUp(self):
+        # Mesmo substituto de pynput/pystray/PIL do benchmark_reproducao.py
+        if 'main_atalhos' not in sys.modules:
+            instalar_modulos_falsos()
+        self.diretorio = tempfile.TemporaryDirectory()
+        os.environ.setdefault('APPDATA', self.diretorio.name)
+        import main_atalhos
+        self.main_atalhos = main_atalhos
+
+        caminho = os.path.join(self.diretorio.name, 'config.json')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump({'atalhos': [{'tecla': 'a', 'comando': 'lento.exe'}],
+                       'monitores': [], 'enable_calc_percent': True}, arquivo)
+        observador = ObservadorConfiguracao(caminho, main_atalhos.DEFAULT_CONFIG)
+
+        self.nucleo = Nucleo()
+        self.nucleo.iniciar()
+        self.lancador = LancadorLento()
+        self.executor = main_atalhos.criar_executor_acoes(self.lancador, self.nucleo)
+        self.executor.iniciar()
+        self.backend_janela = BackendJanelaFalso()
+        rastreador = RastreadorJanelaAtiva(self.backend_janela)
+        rastreador.iniciar()
+        self.gerenciador = main_atalhos.GerenciadorAtalhos(
+            observador, self.executor, rastreador, self.nucleo)
+
+        # Relógio das janelas controlado pelo teste
+        self.tempo = 0.0
+        self.gerenciador.relogio = lambda: self.tempo
+
+    def tearDown(self):
+        self.executor.parar()
+        self.nucleo.parar()
+        self.diretorio.cleanup()
+
+    def test_callback_nao_bloqueia_com_acoes_lentas(self):
+        self.assertIsInstance(self.executor, ExecutorNucleo)
+        tecla = KeyCodeFalso(char='a')
+
+        piores = []
+        for tentativa in range(TENTATIVAS):
+            pior_caso = 0
+            for indice in range(EVENTOS):
+                self.tempo = (tentativa * EVENTOS + indice) * 0.3
+                inicio = time.perf_counter_ns()
+                self.gerenciador.ao_pressionar_tecla(tecla)
+                self.gerenciador.ao_soltar_tecla(tecla)
+                pior_caso = max(pior_caso, time.perf_counter_ns() - inicio)
+            piores.append(pior_caso / 1e6)
+            if piores[-1] < LIMITE_CALLBACK_MS:
+                break
+
+        self.assertLess(min(piores), LIMITE_CALLBACK_MS, piores)
+        # As ações lentas encheram o limite de pendentes: o excedente foi
+        # descartado em vez de bloquear o callback
+        self.assertGreater(self.executor.acoes_descartadas, 0)
+
+        self.executor.parar()
+        self.assertGreater(self.lancador.lancados, 0)
+        self.assertEqual(self.executor.pendentes, 0)
+
+    def test_porcentagem_somente_na_calculadora(self):
+        Key = self.main_atalhos.Key
+        controlador = self.main_atalhos.controlador_teclado
+        injetadas = controlador.injetadas
+
+        # Fora da Calculadora o Shift direito não injeta nada
+        self.backend_janela.definir_janela(InfoJanela(
+            titulo='Bloco de Notas', processo='notepad.exe', pid=100))
+        self.gerenciador.ao_pressionar_tecla(Key.shift_r)
+        self.gerenciador.ao_soltar_tecla(Key.shift_r)
+
+        # Foco na Calculadora (nome completo do processo no Linux)
+        self.backend_janela.definir_janela(InfoJanela(
+            titulo='Calculator', processo='gnome-calculator', pid=200))
+        self.gerenciador.ao_pressionar_tecla(Key.shift_r)
+        self.gerenciador.ao_soltar_tecla(Key.shift_r)
+
+        self.executor.parar()
+        self.assertEqual(controlador.injetadas - injetadas,
+                         len(self.main_atalhos.ACAO_PORCENTAGEM.sequencia))
+
+
+if __name__ == "__main__":
+    unittest.main()
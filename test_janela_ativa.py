@@ -0,0 +1,68 @@
+# test_janela_ativa.py - RastreadorJanelaAtiva dirigido pelo BackendJanelaFalso
+
+import unittest
+
+from janela_ativa import (JANELA_DESCONHECIDA, BackendJanelaFalso, InfoJanela,
+                          RastreadorJanelaAtiva, eh_calculadora)
+
+NOTEPAD = InfoJanela(titulo='Sem título - Bloco de Notas', processo='notepad.exe',
+                     pid=100, classe='notepad')
+CALCULADORA_WINDOWS = InfoJanela(titulo='Calculadora', processo='calculatorapp.exe',
+                                 pid=200, classe='applicationframewindow')
+CALCULADORA_GNOME = InfoJanela(titulo='Calculator', processo='gnome-calculator',
+                               pid=300, classe='gnome-calculator')
+
+
+class TesteRastreadorJanelaAtiva(unittest.TestCase):
+    """
+    Cada mudança de foco do backend chega ao rastreador (self.atual) e à
+    detecção da Calculadora usada pelo atalho de porcentagem.
+    """
+
+    def setUp(self):
+        self.backend = BackendJanelaFalso()
+        self.rastreador = RastreadorJanelaAtiva(self.backend)
+
+    def test_estado_inicial_e_mudancas_de_foco(self):
+        self.assertEqual(self.rastreador.atual, JANELA_DESCONHECIDA)
+
+        # iniciar() entrega a janela atual do backend imediatamente
+        self.backend.info = NOTEPAD
+        self.rastreador.iniciar()
+        self.assertEqual(self.rastreador.atual, NOTEPAD)
+
+        recebidas = []
+        atualizar = self.backend.ao_mudar
+        self.backend.ao_mudar = lambda info: (recebidas.append(info), atualizar(info))
+        for janela in (CALCULADORA_WINDOWS, NOTEPAD, CALCULADORA_GNOME):
+            self.backend.definir_janela(janela)
+            self.assertEqual(self.rastreador.atual, janela)
+        self.assertEqual(recebidas, [CALCULADORA_WINDOWS, NOTEPAD, CALCULADORA_GNOME])
+
+    def test_parar_ignora_mudancas_seguintes(self):
+        self.rastreador.iniciar()
+        self.backend.definir_janela(NOTEPAD)
+        self.rastreador.parar()
+        self.backend.definir_janela(CALCULADORA_WINDOWS)
+        self.assertEqual(self.rastreador.atual, NOTEPAD)
+
+    def test_deteccao_da_calculadora(self):
+        self.rastreador.iniciar()
+        casos = [
+            (NOTEPAD, False),
+            (CALCULADORA_WINDOWS, True),
+            # Nome completo (o comm do Linux cortaria em 'gnome-calculato')
+            (CALCULADORA_GNOME, True),
+            (CALCULADORA_GNOME._replace(processo='gnome-calculato', titulo=''), False),
+            # Processo não identificado: reconhecida pelo título
+            (InfoJanela(titulo='Rechner', processo='', pid=0), True),
+            (JANELA_DESCONHECIDA, False),
+        ]
+        for janela, esperado in casos:
+            with self.subTest(janela=janela):
+                self.backend.definir_janela(janela)
+                self.assertEqual(eh_calculadora(self.rastreador.atual), esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()